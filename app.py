@@ -1,36 +1,61 @@
 # app.py
 import streamlit as st
 import os
-import asyncio
 import logging
+import threading
 import time
-from src.preprocessing.gdrive_manager import GoogleDriveManager
+import uuid
 from src.main_flow import MainFlow
+from src.state.job_queue import JobQueue, ACTIVE_STATUSES
+from src.monitoring.metrics import start_exporters
+from src.storage.report_sync import ReportSync
+from src.preprocessing.preflight import format_eta
+from src.monitoring.logging_setup import configure_logging
+from src.monitoring.events import get_bus
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-    handlers=[
-        logging.FileHandler("qc_bot.log", mode='a', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+# Must be the first Streamlit command: the cached resources below may write to the page
+st.set_page_config(
+    page_title="QC Report Generator", 
+    page_icon="📊", 
+    layout="wide"
 )
+
+# Configure logging (queued, rotated; once per process)
+configure_logging("config/config.json")
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
-# Initialize MainFlow
-main_flow = MainFlow("config/config.json")
+# Shared across reruns and sessions: built once per process, not on every script run
+@st.cache_resource
+def get_main_flow():
+    return MainFlow("config/config.json")
 
-# Streamlit UI
-st.set_page_config(
-    page_title="QC Report Generator", 
-    page_icon="📊", 
-    layout="wide"
-)
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(os.path.join(get_main_flow().paths["STATE"], "qc_bot.db"))
+
+main_flow = get_main_flow()
+job_queue = get_job_queue()
+
+@st.cache_resource
+def start_embedded_workers(count: int):
+    """Run queue workers inside the app process (once per process, not per rerun).
+
+    Extra capacity can be added with `python -m src.cli worker` on this or other hosts.
+    """
+    from src.jobs.worker import Worker
+    workers = []
+    for _ in range(count):
+        worker = Worker("config/config.json")
+        threading.Thread(target=worker.run_forever, name=f"worker-{worker.worker_id}", daemon=True).start()
+        workers.append(worker)
+    return workers
+
+start_embedded_workers(main_flow.config.get("EMBEDDED_WORKERS", 1))
+start_exporters(main_flow.config.get("METRICS"))
 
 # Custom CSS
 st.markdown("""
@@ -67,11 +92,23 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+def current_user() -> str:
+    """Who is using the app: the name entered in the sidebar, kept in the URL (?user=...).
+
+    Jobs and fair-share scheduling are keyed on it, so it must survive reloads and be
+    the same in every tab; a per-session id would hide a user's jobs after a reload.
+    """
+    name = st.sidebar.text_input(
+        "Your name",
+        value=st.query_params.get("user", ""),
+        help="Your jobs are listed under this name (bookmark the page to keep it)"
+    ).strip()
+    if name and st.query_params.get("user") != name:
+        st.query_params["user"] = name
+    return name
+
 # Initialize session state
-if 'processing' not in st.session_state:
-    st.session_state.processing = False
-if 'reports_generated' not in st.session_state:
-    st.session_state.reports_generated = False
+st.session_state.user_id = current_user()
 if 'video_type' not in st.session_state:
     st.session_state.video_type = "conceptual"
 
@@ -79,6 +116,18 @@ if 'video_type' not in st.session_state:
 st.title("📊 QC Report Generator")
 st.subheader("Automated Quality Control for Recordings")
 
+def render_plan(plan: dict, started_at: float = None):
+    """Preflight summary: accepted/rejected videos, audio length, ETA and projected LLM cost."""
+    eta = plan["eta_seconds"]
+    remaining = f" (~{format_eta(eta - (time.time() - started_at))} left)" if started_at else ""
+    cost = f" · ~{plan['tokens'] / 1000:.0f}k tokens (~{plan['cost']:.2f} {plan.get('currency', '')})" if "tokens" in plan else ""
+    st.caption(
+        f"🧭 {plan['accepted']}/{plan['videos']} video(s) · {plan['audio_seconds'] / 60:.0f} min of audio · "
+        f"ETA {format_eta(eta)}{remaining}{cost}"
+    )
+    for rejected in plan["rejected"]:
+        st.warning(f"⚠️ Skipping {rejected['name']}: {rejected['reason']}")
+
 # Configuration Section
 with st.expander("⚙️ Configuration", expanded=True):
     st.session_state.video_type = st.radio(
@@ -91,11 +140,18 @@ with st.expander("⚙️ Configuration", expanded=True):
         }[x]
     )
     
-    drive_url = st.text_input(
-        "Google Drive Videos Folder URL:",
-        placeholder="https://drive.google.com/drive/folders/1KSdVSVs_yN6FHvzH0i0CW2wNI0tCPhGt",
-        help="URL of the folder containing videos"
-    )
+    if main_flow.storage.name == "local":
+        drive_url = st.text_input(
+            "Videos Folder Path:",
+            placeholder="videos/module-1",
+            help=f"Folder containing videos (relative to {main_flow.storage.root})"
+        )
+    else:
+        drive_url = st.text_input(
+            "Google Drive Videos Folder URL:",
+            placeholder="https://drive.google.com/drive/folders/1KSdVSVs_yN6FHvzH0i0CW2wNI0tCPhGt",
+            help="URL of the folder containing videos (subfolders are included)"
+        )
     
     mentor_files = {}
     if st.session_state.video_type in ["conceptual", "both"]:
@@ -110,183 +166,241 @@ with st.expander("⚙️ Configuration", expanded=True):
             type=["ipynb"]
         )
     
-    if st.button("Generate Reports", disabled=st.session_state.processing):
+    token_budget = st.number_input(
+        "Token budget for this run (0 = unlimited):",
+        min_value=0, value=int(main_flow.usage_settings["RUN_TOKEN_BUDGET"] or 0), step=10000,
+        help="Reports whose projected tokens no longer fit are skipped; their transcripts are kept"
+    )
+
+    check_col, generate_col = st.columns([1, 4])
+    with check_col:
+        check_clicked = st.button("Check folder")
+    with generate_col:
+        generate_clicked = st.button("Generate Reports")
+
+    if check_clicked:
         if not drive_url:
-            st.error("Please enter a Google Drive URL")
+            st.error("Please enter a videos folder")
         else:
-            st.session_state.processing = True
-            st.session_state.reports_generated = False
-
-# Processing
-if st.session_state.processing:
-    status_area = st.empty()
-    progress_bar = st.progress(0)
-
-    # Step 1: Process mentor materials
-    status_area.info("⏳ Step 1/4: Processing mentor materials...")
-    try:
-        main_flow.process_mentor_materials(mentor_files)
-    except Exception as e:
-        status_area.error(f"❌ Error in step 1: {str(e)}")
-        st.session_state.processing = False
-        st.stop()
-    progress_bar.progress(25)
-    time.sleep(1)
-
-    # Step 2: Download and process videos
-    status_area.info("⏳ Step 2/4: Downloading and processing videos...")
-    from src.preprocessing.download_manager import GoogleDriveDownloader
-    download_manager = GoogleDriveDownloader(main_flow.paths["VIDEOS"], main_flow.drive_folders)
-    gdrive = download_manager.gdrive
-    video_files = download_manager.list_all_videos(drive_url)
-    total_videos = len(video_files)
-
-    # Get all transcript files in Drive Transcripts folder
-    transcript_drive_files = gdrive.list_txt_files(main_flow.drive_folders["TRANSCRIPTS"])
-    transcript_names = {os.path.splitext(f['name'])[0] for f in transcript_drive_files}
-
-    processed_videos = []
-    report_files = []
-
-    for idx, video in enumerate(video_files, 1):
-        base_name = os.path.splitext(video['name'])[0]
-        video_report_start = time.time()
-        if base_name in transcript_names:
-            status_area.info(f"✅ Transcript for video {idx}/{total_videos} ({video['name']}) already exists in Drive. Generating report...")
-            processed_videos.append(base_name)
-            # Download transcript if not local
-            transcript_file = f"{base_name}.txt"
-            local_transcript_path = os.path.join(main_flow.paths["TRANSCRIPTS"], transcript_file)
-            if not os.path.exists(local_transcript_path):
-                file_info = next((f for f in transcript_drive_files if f['name'] == transcript_file), None)
-                if file_info:
-                    gdrive.download_file(file_info["id"], local_transcript_path)
-            # Generate report immediately
-            from src.report_generation.openai_client import OpenAIClient
-            from src.report_generation.report_generator import ReportGenerator
-            with open("config/checklist.txt", "r") as f:
-                checklist = f.read()
-            openai_client = OpenAIClient("config/config.json")
-            client = openai_client.get_client()
-            deployment = openai_client.get_deployment()
-            report_generator = ReportGenerator(client, deployment, checklist)
-            report_generator.generate_reports(
-                main_flow.paths["TRANSCRIPTS"],
-                main_flow.paths["MENTOR_MATERIALS"],
-                main_flow.paths["REPORTS"],
-                main_flow.drive_folders["REPORTS"],
-                only_base_names=[base_name]
-            )
-            video_report_end = time.time()
-            minutes, seconds = divmod(int(video_report_end - video_report_start), 60)
-            st.success(f"✅ Report generated for {base_name} ({minutes}m {seconds}s)")
-            report_file = f"report_{base_name}.txt"
-            report_path = os.path.join(main_flow.paths["REPORTS"], report_file)
-            if os.path.exists(report_path):
-                with st.expander(f"📝 {base_name}"):
-                    with open(report_path, "r", encoding="utf-8") as f:
-                        report_content = f.read()
-                    st.markdown(report_content)
-                    st.download_button(
-                        label=f"Download {report_file}",
-                        data=report_content,
-                        file_name=report_file,
-                        mime="text/plain",
-                        key=f"dl_{report_file}"
-                    )
-            continue
-
-        status_area.info(f"🎬 Processing video {idx}/{total_videos}: {video['name']}")
-        st.write(f"- Downloading video...")
-        local_video_path = os.path.join(main_flow.paths["VIDEOS"], video['name'])
-        gdrive.download_file(video['id'], local_video_path)
-        st.write(f"- Converting to audio...")
-        audio_path = os.path.join(main_flow.paths["AUDIOS"], f"{base_name}.wav")
-        from src.preprocessing.video_processor import VideoProcessor
-        video_processor = VideoProcessor()
-        if video_processor.convert_mp4_to_wav(local_video_path, audio_path):
-            st.write(f"- Uploading audio to Drive...")
-            download_manager.upload_to_drive(audio_path, "AUDIOS", "audio/wav")
-            st.write(f"- Deleting video from Drive and local...")
-            try:
-                download_manager.delete_drive_file(video['id'])
-            except Exception:
-                pass
-            try:
-                os.remove(local_video_path)
-            except Exception:
-                pass
-            st.write(f"- Generating transcript...")
-            from src.preprocessing.transcript_generator import TranscriptGenerator
-            transcript_generator = TranscriptGenerator(model_size="base.en", compute_type="int8")
-            transcript_path = os.path.join(main_flow.paths["TRANSCRIPTS"], f"{base_name}.txt")
-            if transcript_generator.transcribe_audio(audio_path, transcript_path):
-                st.write(f"- Uploading transcript to Drive...")
-                download_manager.upload_to_drive(transcript_path, "TRANSCRIPTS", "text/plain")
-                st.write(f"- Deleting audio from Drive and local...")
-                audio_drive_id = gdrive.find_file_by_name(main_flow.drive_folders["AUDIOS"], f"{base_name}.wav")
-                if audio_drive_id:
-                    try:
-                        download_manager.delete_drive_file(audio_drive_id)
-                    except Exception:
-                        pass
+            with st.spinner("Probing videos (headers only)..."):
                 try:
-                    os.remove(audio_path)
-                except Exception:
-                    pass
-                processed_videos.append(base_name)
-                # Generate report immediately
-                from src.report_generation.openai_client import OpenAIClient
-                from src.report_generation.report_generator import ReportGenerator
-                with open("config/checklist.txt", "r") as f:
-                    checklist = f.read()
-                openai_client = OpenAIClient("config/config.json")
-                client = openai_client.get_client()
-                deployment = openai_client.get_deployment()
-                report_generator = ReportGenerator(client, deployment, checklist)
-                report_generator.generate_reports(
-                    main_flow.paths["TRANSCRIPTS"],
-                    main_flow.paths["MENTOR_MATERIALS"],
-                    main_flow.paths["REPORTS"],
-                    main_flow.drive_folders["REPORTS"],
-                    only_base_names=[base_name]
-                )
-                video_report_end = time.time()
-                minutes, seconds = divmod(int(video_report_end - video_report_start), 60)
-                st.success(f"✅ Report generated for {base_name} ({minutes}m {seconds}s)")
-                report_file = f"report_{base_name}.txt"
-                report_path = os.path.join(main_flow.paths["REPORTS"], report_file)
-                if os.path.exists(report_path):
-                    with st.expander(f"📝 {base_name}"):
-                        with open(report_path, "r", encoding="utf-8") as f:
-                            report_content = f.read()
-                        st.markdown(report_content)
-                        st.download_button(
-                            label=f"Download {report_file}",
-                            data=report_content,
-                            file_name=report_file,
-                            mime="text/plain",
-                            key=f"dl_{report_file}"
-                        )
-            else:
-                st.write(f"❌ Failed to generate transcript for {video['name']}")
+                    plan = main_flow.plan_folder(drive_url)
+                except Exception as e:
+                    plan = None
+                    st.error(f"❌ Could not check folder: {e}")
+            if plan:
+                render_plan(plan)
+
+    if generate_clicked:
+        if not drive_url:
+            st.error("Please enter a videos folder")
+        elif not st.session_state.user_id:
+            st.error("Please enter your name in the sidebar")
         else:
-            st.write(f"❌ Failed to convert video: {video['name']}")
-        progress_bar.progress(25 + int(50 * idx / total_videos))
-        time.sleep(1)
-
-    progress_bar.progress(100)
-    time.sleep(1)
-
-    st.session_state.processing = False
-    st.session_state.reports_generated = True
-    st.balloons()
-
-# Sync reports from Google Drive
-def sync_reports_from_drive(main_flow):
-    gdrive = GoogleDriveManager()
-    report_drive_files = gdrive.list_txt_files(main_flow.drive_folders["REPORTS"])
-    for file in report_drive_files:
-        local_path = os.path.join(main_flow.paths["REPORTS"], file["name"])
-        if not os.path.exists(local_path):
-            gdrive.download_file(file["id"], local_path)
+            # Stage uploads where any worker can read them, then hand the job to the queue
+            job_id = uuid.uuid4().hex
+            upload_dir = os.path.join(main_flow.paths["STATE"], "uploads", job_id)
+            staged_files = {}
+            for file_type, file_data in mentor_files.items():
+                if not file_data:
+                    continue
+                os.makedirs(upload_dir, exist_ok=True)
+                staged_path = os.path.abspath(os.path.join(upload_dir, file_data.name))
+                with open(staged_path, "wb") as f:
+                    f.write(file_data.getbuffer())
+                staged_files[file_type] = staged_path
+            job_queue.submit(
+                drive_url,
+                st.session_state.video_type,
+                staged_files,
+                user=st.session_state.user_id,
+                job_id=job_id,
+                token_budget=int(token_budget) or None
+            )
+            st.success(f"✅ Job queued ({job_id[:8]})")
+
+def render_run_summary(results: list):
+    """Per-video stage timings (seconds), audio length and LLM tokens for one job."""
+    rows = []
+    for result in results:
+        stages = result.get("stages") or {}
+        row = {"video": result["base_name"], "total (s)": round(result["elapsed"], 1)}
+        drive_seconds = sum(v for k, v in stages.items() if k.startswith("drive."))
+        row["drive (s)"] = round(drive_seconds, 1)
+        for key, label in [
+            ("ffmpeg", "ffmpeg (s)"),
+            ("audio_seconds", "audio (s)"),
+            ("transcribe_wait", "slot wait (s)"),
+            ("transcribe", "transcribe (s)"),
+            ("transcribe_rtf", "RTF"),
+            ("llm", "LLM (s)"),
+            ("prompt_tokens", "prompt tokens"),
+            ("completion_tokens", "completion tokens")
+        ]:
+            row[label] = round(stages.get(key, 0.0), 2)
+        rows.append(row)
+    if rows:
+        st.dataframe(rows, use_container_width=True)
+
+def render_report(result: dict):
+    report_path = result.get("report_path")
+    if not report_path or not os.path.exists(report_path):
+        return
+    report_file = os.path.basename(report_path)
+    with st.expander(f"📝 {result['base_name']}"):
+        with open(report_path, "r", encoding="utf-8") as f:
+            report_content = f.read()
+        st.markdown(report_content)
+        st.download_button(
+            label=f"Download {report_file}",
+            data=report_content,
+            file_name=report_file,
+            mime="text/plain",
+            key=f"dl_{report_file}"
+        )
+
+def render_live_events(events: dict):
+    """Per-video progress from the in-process bus: bytes moved, audio transcribed, report as it streams."""
+    for video, kinds in sorted(events.items()):
+        parts = []
+        for kind, icon in [("download", "⬇️"), ("upload", "⬆️")]:
+            event = kinds.get(kind)
+            if event:
+                total = f"/{event['total'] / 2**20:.0f}" if event.get("total") else ""
+                parts.append(f"{icon} {event['done'] / 2**20:.0f}{total} MB")
+        for kind, label in [("transcribe", "transcribed"), ("refine", "refined")]:
+            event = kinds.get(kind)
+            if event:
+                parts.append(f"🎙️ {format_eta(event['seconds'])} of {format_eta(event['total'])} {label}")
+        st.caption(f"**{video or 'job'}** · " + " · ".join(parts) if parts else f"**{video or 'job'}**")
+        report = kinds.get("report")
+        if report:
+            st.code(report["text"][-1500:], language="json")
+
+# Live progress of jobs run by this process's embedded workers (refreshed every second)
+@st.fragment(run_every=1)
+def render_live_progress():
+    if not st.session_state.user_id:
+        return
+    bus = get_bus()
+    for job in job_queue.list_jobs(user=st.session_state.user_id, statuses=["running"], limit=5):
+        events = bus.snapshot(job["id"])
+        if events:
+            st.markdown(f"**⏳ Live** — {job['folder_url']}")
+            render_live_events(events)
+
+render_live_progress()
+
+# Job status: polls the queue without blocking the rest of the page
+@st.fragment(run_every=3)
+def render_jobs():
+    if not st.session_state.user_id:
+        return
+    jobs = job_queue.list_jobs(user=st.session_state.user_id, limit=10)
+    if not jobs:
+        return
+    st.subheader("Jobs")
+    for job in jobs:
+        label = {
+            "queued": "🕒 Queued",
+            "running": "⏳ Running",
+            "succeeded": "✅ Done",
+            "failed": "❌ Failed",
+            "cancelled": "🚫 Cancelled"
+        }.get(job["status"], job["status"])
+        st.markdown(f"**{label}** — {job['folder_url']}")
+        if job["plan"]:
+            render_plan(job["plan"], started_at=job["started_at"] if job["status"] == "running" else None)
+        if job["status"] in ACTIVE_STATUSES:
+            st.progress(job["progress"], text=job["message"])
+            if st.button("Cancel", key=f"cancel_{job['id']}"):
+                job_queue.cancel(job["id"])
+        if job["error"]:
+            st.error(f"❌ {job['error']}")
+        if job["results"]:
+            with st.expander("⏱️ Run summary"):
+                render_run_summary(job["results"])
+                usage = main_flow.usage.totals(run_id=job["id"])
+                if usage["calls"]:
+                    budget = f" of {job['token_budget']} budgeted" if job["token_budget"] else ""
+                    st.caption(f"💰 {usage['total_tokens']} LLM tokens{budget} · "
+                               f"{usage['cost']:.4f} {main_flow.usage_settings['CURRENCY']}")
+        for result in job["results"]:
+            minutes, seconds = divmod(int(result["elapsed"]), 60)
+            if result["status"] == "reported":
+                st.success(f"✅ Report generated for {result['base_name']} ({minutes}m {seconds}s)")
+                render_report(result)
+            elif result["status"] == "rejected":
+                continue
+            elif result["status"] == "over_budget":
+                st.warning(f"💰 Skipped report for {result['video']}: run token budget used up")
+            else:
+                st.write(f"❌ Failed to process {result['video']}")
+
+render_jobs()
+
+# Sync reports from storage in the background (new or changed reports only)
+@st.cache_resource
+def get_report_sync():
+    return ReportSync(
+        main_flow.storage,
+        main_flow.paths["REPORTS"],
+        os.path.join(main_flow.paths["STATE"], "qc_bot.db"),
+        report_index=main_flow.report_index
+    )
+
+report_sync = get_report_sync()
+report_sync.trigger()
+
+
+# Report index: filter and aggregate structured reports
+with st.expander("🔎 Report Index", expanded=False):
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+    with filter_col1:
+        item_filter = st.text_input("Checklist item (e.g. 3b):", key="index_item").strip().lower()
+    with filter_col2:
+        status_filter = st.selectbox(
+            "Status:", ["any", "fail", "pass", "na"],
+            format_func=lambda x: {"any": "Any", "fail": "❌ Fail", "pass": "✅ Pass", "na": "N/A"}[x],
+            key="index_status"
+        )
+    with filter_col3:
+        days_filter = st.number_input("Generated in last N days (0 = all):", min_value=0, value=30, key="index_days")
+
+    sync_col1, sync_col2 = st.columns([3, 1])
+    with sync_col1:
+        if report_sync.running:
+            st.caption("🔄 Syncing reports from storage...")
+        elif report_sync.last_result.get("error"):
+            st.caption(f"⚠️ Last sync failed: {report_sync.last_result['error']}")
+        elif report_sync.last_result:
+            st.caption(
+                f"Last sync {time.strftime('%H:%M:%S', time.localtime(report_sync.last_result['finished_at']))}: "
+                f"{report_sync.last_result['fetched']} new/changed of {report_sync.last_result['listed']} listed"
+            )
+    with sync_col2:
+        if st.button("Sync now", disabled=report_sync.running):
+            report_sync.trigger(force=True)
+
+    since = time.time() - days_filter * 86400 if days_filter else None
+    st.markdown("**Checklist item summary**")
+    st.dataframe(main_flow.report_index.item_summary(since=since), use_container_width=True)
+
+    if item_filter:
+        rows = main_flow.report_index.query_items(
+            item_id=item_filter,
+            status=None if status_filter == "any" else status_filter,
+            since=since
+        )
+        st.markdown(f"**{len(rows)} report(s) matching item {item_filter}**")
+        st.dataframe(
+            [{
+                "recording": r["base_name"],
+                "status": r["status"],
+                "justification": r["justification"],
+                "evidence": r["evidence"],
+                "timestamps": ", ".join(r["timestamps"]),
+                "generated": time.strftime("%Y-%m-%d %H:%M", time.localtime(r["generated_at"]))
+            } for r in rows],
+            use_container_width=True
+        )
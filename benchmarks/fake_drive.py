@@ -0,0 +1,169 @@
+# benchmarks/fake_drive.py
+import os
+import time
+import hashlib
+import logging
+import mimetypes
+import threading
+
+logger = logging.getLogger(__name__)
+
+class _NoPool:
+    def log_stats(self):
+        pass
+
+class FakeDriveManager:
+    """Filesystem-backed stand-in for GoogleDriveManager.
+
+    Each Drive folder id is a directory under `root`; a file's id is
+    "<folder_id>/<name>". Every call sleeps `latency` seconds and transfers
+    are throttled to `bandwidth` bytes/s (None = unthrottled) so benchmark
+    runs approximate a remote Drive without touching the network.
+    """
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, root: str, latency: float = 0.05, bandwidth: float = None):
+        self.root = root
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.pool = _NoPool()
+        self.calls = {}
+        self.app_properties = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _call(self, method: str):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _path(self, file_id: str) -> str:
+        return os.path.join(self.root, *file_id.split("/"))
+
+    def _copy(self, source: str, destination: str):
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b""):
+                start = time.perf_counter()
+                dst.write(chunk)
+                if self.bandwidth:
+                    remaining = len(chunk) / self.bandwidth - (time.perf_counter() - start)
+                    if remaining > 0:
+                        time.sleep(remaining)
+
+    def _describe(self, folder_id: str, name: str) -> dict:
+        path = os.path.join(self.root, folder_id, name)
+        with open(path, "rb") as f:
+            md5 = hashlib.md5(f.read()).hexdigest()
+        stat = os.stat(path)
+        return {
+            "id": f"{folder_id}/{name}",
+            "name": name,
+            "mimeType": mimetypes.guess_type(name)[0] or "application/octet-stream",
+            "md5Checksum": md5,
+            "size": str(stat.st_size),
+            "modifiedTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(stat.st_mtime))
+        }
+
+    def add_file(self, folder_id: str, local_path: str, name: str = None) -> str:
+        """Seed the fake Drive (no latency)."""
+        folder = os.path.join(self.root, folder_id)
+        os.makedirs(folder, exist_ok=True)
+        name = name or os.path.basename(local_path)
+        with open(local_path, "rb") as src, open(os.path.join(folder, name), "wb") as dst:
+            dst.write(src.read())
+        return f"{folder_id}/{name}"
+
+    def get_folder_id(self, url):
+        if 'folders/' in url:
+            return url.split('folders/')[-1].split('?')[0]
+        return url
+
+    def list_files(self, folder_id, file_type='video/mp4', modified_after=None):
+        self._call("list_files")
+        folder = os.path.join(self.root, folder_id)
+        if not os.path.isdir(folder):
+            return []
+        files = [self._describe(folder_id, name) for name in sorted(os.listdir(folder))
+                 if os.path.isfile(os.path.join(folder, name))]
+        if modified_after:
+            files = [f for f in files if f["modifiedTime"] > modified_after]
+        if file_type and file_type.endswith("/*"):
+            return [f for f in files if f["mimeType"].startswith(file_type[:-1])]
+        return [f for f in files if not file_type or f["mimeType"] == file_type]
+
+    def list_folders(self, folder_id):
+        self._call("list_folders")
+        folder = os.path.join(self.root, folder_id)
+        if not os.path.isdir(folder):
+            return []
+        return [
+            {"id": f"{folder_id}/{name}", "name": name}
+            for name in sorted(os.listdir(folder))
+            if os.path.isdir(os.path.join(folder, name))
+        ]
+
+    def get_metadata(self, file_id):
+        self._call("get_metadata")
+        folder_id, name = file_id.rsplit("/", 1)
+        return self._describe(folder_id, name)
+
+    def iter_download(self, file_id, chunk_size=CHUNK_SIZE):
+        self._call("iter_download")
+        with open(self._path(file_id), "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                if self.bandwidth:
+                    time.sleep(len(chunk) / self.bandwidth)
+                yield chunk
+
+    def upload_stream(self, stream, name, drive_folder_id, mime_type):
+        self._call("upload_stream")
+        folder = os.path.join(self.root, drive_folder_id)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, name), "wb") as f:
+            for chunk in iter(lambda: stream.read(self.CHUNK_SIZE), b""):
+                if self.bandwidth:
+                    time.sleep(len(chunk) / self.bandwidth)
+                f.write(chunk)
+        return f"{drive_folder_id}/{name}"
+
+    def list_txt_files(self, folder_id):
+        return self.list_files(folder_id, "text/plain")
+
+    def download_file(self, file_id, destination):
+        self._call("download_file")
+        self._copy(self._path(file_id), destination)
+        return destination
+
+    def upload_file(self, local_path, drive_folder_id, mime_type, app_properties=None):
+        self._call("upload_file")
+        folder = os.path.join(self.root, drive_folder_id)
+        os.makedirs(folder, exist_ok=True)
+        self._copy(local_path, os.path.join(folder, os.path.basename(local_path)))
+        file_id = f"{drive_folder_id}/{os.path.basename(local_path)}"
+        self.app_properties[file_id] = dict(app_properties or {})
+        return file_id
+
+    def find_file_by_property(self, folder_id, key, value):
+        self._call("find_file_by_property")
+        for file_id, properties in self.app_properties.items():
+            if file_id.rsplit("/", 1)[0] == folder_id and properties.get(key) == value and os.path.exists(self._path(file_id)):
+                return {"id": file_id, "name": file_id.rsplit("/", 1)[1]}
+        return None
+
+    def delete_file(self, file_id):
+        self._call("delete_file")
+        try:
+            os.remove(self._path(file_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def find_file_by_name(self, folder_id, filename):
+        self._call("find_file_by_name")
+        path = os.path.join(self.root, folder_id, filename)
+        return f"{folder_id}/{filename}" if os.path.exists(path) else None
+
+    def remove_duplicates_by_name(self, folder_id):
+        # Names are unique within a fake folder
+        self._call("list_files")
@@ -0,0 +1,124 @@
+# benchmarks/fake_openai.py
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHECKLIST_ITEMS = ["1a", "1b", "1c", "1d", "2a", "2b", "2c", "2d", "2e",
+                   "3a", "3b", "3c", "3d", "3e", "4a", "5a", "5b", "5c", "6a", "6b", "7a", "7b", "8a"]
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def fake_report(prompt: str) -> dict:
+    """Deterministic schema-conforming report; fails 3b when the transcript has fillers.
+
+    Fillers are counted in the text, or read from the summary line a compact
+    transcript carries instead of the fillers themselves.
+    """
+    fillers = len(re.findall(r"\b(umm|uh|hmm|ah)\b", prompt, flags=re.IGNORECASE))
+    summary = re.search(r"Filler words \(removed from the text below\): (\d+) total", prompt)
+    if summary:
+        fillers += int(summary.group(1))
+    items, wrong, improve = [], [], []
+    for item_id in CHECKLIST_ITEMS:
+        failed = item_id == "3b" and fillers > 3
+        items.append({
+            "id": item_id,
+            "status": "fail" if failed else "pass",
+            "justification": f"{fillers} filler words detected" if failed else "Meets criteria",
+            "evidence": "umm" if failed else "",
+            "timestamps": ["0:05"] if failed else []
+        })
+        if failed:
+            wrong.append({"id": item_id, "description": "Frequent fillers", "evidence": "umm",
+                          "timestamps": ["0:05"], "impact": "Distracting"})
+            improve.append({"id": item_id, "solution": "Pause instead of filler",
+                            "implementation": "Rehearse transitions", "expected_outcome": "Cleaner delivery"})
+    return {"items": items, "what_went_wrong": wrong, "how_to_improve": improve}
+
+class FakeChatCompletionsServer:
+    """Local chat-completions endpoint (OpenAI/Azure OpenAI path layout) with
+    configurable first-byte latency and completion token throughput."""
+
+    def __init__(self, latency: float = 0.5, tokens_per_second: float = 200.0, port: int = 0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                server.requests += 1
+                prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+                content = json.dumps(fake_report(prompt))
+                prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+                if body.get("stream"):
+                    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+                    self.stream(body, content, prompt_tokens, completion_tokens, include_usage)
+                    return
+                time.sleep(server.latency + completion_tokens / server.tokens_per_second)
+                payload = json.dumps({
+                    "id": f"chatcmpl-fake-{server.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content}
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens
+                    }
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def stream(self, body, content, prompt_tokens, completion_tokens, include_usage):
+                """Server-sent events in the chat.completion.chunk layout, paced at tokens_per_second."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                base = {"id": f"chatcmpl-fake-{server.requests}", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": body.get("model", "fake")}
+
+                def send(payload):
+                    self.wfile.write(f"data: {json.dumps(dict(base, **payload))}\n\n".encode())
+                    self.wfile.flush()
+
+                time.sleep(server.latency)
+                # Azure's first chunk carries only prompt filter results
+                send({"choices": [], "prompt_filter_results": []})
+                piece = 4 * 8  # ~8 tokens per chunk
+                for i in range(0, len(content), piece):
+                    time.sleep(8 / server.tokens_per_second)
+                    send({"choices": [{"index": 0, "delta": {"content": content[i:i + piece]}, "finish_reason": None}]})
+                send({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if include_usage:
+                    send({"choices": [], "usage": {"prompt_tokens": prompt_tokens,
+                                                   "completion_tokens": completion_tokens,
+                                                   "total_tokens": prompt_tokens + completion_tokens}})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.port = self.httpd.server_address[1]
+        self.endpoint = f"http://127.0.0.1:{self.port}/"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="fake-openai", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
@@ -0,0 +1,97 @@
+# benchmarks/fixtures.py
+import os
+import math
+import wave
+import array
+import random
+import subprocess
+
+FILLERS = ["umm", "uh", "so", "basically"]
+WORDS = ("today we look at how a pandas dataframe groups rows by key and then "
+         "aggregates each group with a function so that the result has one row per key").split()
+
+def make_video(path: str, seconds: float, with_audio: bool = True) -> str:
+    """Small synthetic MP4 (test pattern + sine tone) generated with ffmpeg."""
+    command = ["ffmpeg", "-y", "-loglevel", "error",
+               "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=10:duration={seconds}"]
+    if with_audio:
+        command += ["-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=16000:duration={seconds}",
+                    "-c:a", "aac", "-shortest"]
+    command += ["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path]
+    subprocess.run(command, check=True)
+    return path
+
+def make_wav(path: str, seconds: float, frequency: float = 440.0) -> str:
+    """16 kHz mono 16-bit WAV of a quiet sine tone, written a second at a time (any length, little memory)."""
+    second = array.array("h", (int(3000 * math.sin(2 * math.pi * frequency * i / 16000)) for i in range(16000)))
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        for _ in range(int(seconds)):
+            wav.writeframes(second.tobytes())
+    return path
+
+def make_transcript(path: str, seconds: float, filler_rate: float = 0.05, seed: int = 0) -> str:
+    """Synthetic transcript in the TSV layout TranscriptGenerator writes (~2.5 words/s)."""
+    rng = random.Random(seed)
+    t = 0.0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("start_time\tend_time\tspeaker\ttranscript\n")
+        while t < seconds:
+            words = []
+            for _ in range(rng.randint(4, 16)):
+                words.append(rng.choice(FILLERS) if rng.random() < filler_rate else rng.choice(WORDS))
+            end = t + len(words) / 2.5
+            f.write(f"{t:.2f}\t{end:.2f}\tSPEAKER\t{' '.join(words)}\n")
+            t = end + rng.uniform(0.2, 2.0)
+    return path
+
+class FakeTranscriber:
+    """Writes a synthetic transcript for the audio's duration at a fixed real-time factor.
+
+    Used for end-to-end runs: the synthetic fixtures have no speech for Whisper to recognise.
+    """
+
+    def __init__(self, real_time_factor: float = 0.0):
+        self.real_time_factor = real_time_factor
+
+    def transcribe_audio(self, audio_file_path: str, output_text_file: str):
+        import time
+        seconds = max(os.path.getsize(audio_file_path) - 44, 0) / (16000 * 2)
+        time.sleep(seconds * self.real_time_factor)
+        make_transcript(output_text_file, seconds)
+        return True
+
+class ScriptedWhisperModel:
+    """Stand-in for faster_whisper.WhisperModel that decodes like it but recognises nothing.
+
+    The input is loaded the way faster-whisper loads it (a file path is decoded
+    whole, an array is used as given), then 5 s segments of placeholder words
+    are produced lazily, every one scored as low confidence. Seconds of audio
+    passed to each call are kept in `windows`, so a benchmark can check what the
+    pipeline asked the model to decode.
+    """
+    windows = []
+
+    def __init__(self, model_size: str, compute_type: str = "int8"):
+        self.model_size = model_size
+
+    def transcribe(self, audio, word_timestamps: bool = True, beam_size: int = 5, initial_prompt: str = None):
+        from types import SimpleNamespace
+        if isinstance(audio, str):
+            from src.preprocessing.transcript_generator import read_window
+            audio = read_window(audio, 0, float("inf"))
+        seconds = len(audio) / 16000
+        ScriptedWhisperModel.windows.append((self.model_size, seconds))
+
+        def segments():
+            start = 0.0
+            while start < seconds:
+                end = min(seconds, start + 5.0)
+                words = [SimpleNamespace(start=t / 2, end=t / 2 + 0.4, word=" word", probability=0.3)
+                         for t in range(int(start * 2), int(end * 2)) if t / 2 + 0.4 <= end]
+                yield SimpleNamespace(start=start, end=end, words=words, text="word " * len(words),
+                                      avg_logprob=-2.0, compression_ratio=1.0, no_speech_prob=0.0)
+                start = end
+        return segments(), SimpleNamespace(duration=seconds)
@@ -0,0 +1,80 @@
+# benchmarks/import_time.py
+"""Cold-start cost of the modules every Streamlit rerun / CLI call imports.
+
+    python -m benchmarks.import_time --repeat 5 --output import_time.json
+
+Each measurement runs in a fresh interpreter with `-X importtime`; the
+cumulative import time of the target module is reported (median, ms), along
+with the heaviest third-party packages it pulled in.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["src.main_flow", "src.cli", "src.jobs.worker", "src.storage.report_sync"]
+
+def parse_importtime(stderr: str) -> dict:
+    """Map module name -> cumulative microseconds from -X importtime output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if cumulative_us.isdigit():
+            cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+def measure(statement: str, module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Heaviest top-level packages to list")
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for module in args.modules:
+        try:
+            runs = [measure(f"import {module}", module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            results[module] = {"error": str(e).splitlines()[-1]}
+            print(f"{module:<28} failed: {results[module]['error']}", file=sys.stderr)
+            continue
+        totals = [run.get(module, 0) / 1000 for run in runs]
+        top_level = {}
+        for name, micros in runs[-1].items():
+            if "." not in name and name != module.split(".")[0]:
+                top_level[name] = micros / 1000
+        heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        results[module] = {
+            "median_ms": round(statistics.median(totals), 2),
+            "min_ms": round(min(totals), 2),
+            "heaviest": {name: round(ms, 2) for name, ms in heaviest}
+        }
+        print(f"{module:<28} {results[module]['median_ms']:>9.1f} ms  "
+              f"({', '.join(f'{n} {ms:.0f}ms' for n, ms in heaviest)})", file=sys.stderr)
+
+    text = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+# benchmarks/peak_rss.py
+"""Peak memory of each pipeline stage on a synthetic multi-hour recording.
+
+    python -m benchmarks.peak_rss                       # 3 h inputs, exit 1 over the ceilings
+    python -m benchmarks.peak_rss --hours 2 --max-rss-mb 768 --output rss.json
+    python -m benchmarks.peak_rss --whisper-model base.en   # also transcribe (slow: real decoding)
+
+Each stage runs in its own Python process, so one stage's peak cannot hide
+another's. A process reports its peak RSS after importing what the stage needs
+(baseline) and after running it (peak); the run fails if any stage's peak is
+over --max-rss-mb or it grew by more than --max-growth-mb over its baseline.
+The growth check is the one that catches a stage holding a whole recording:
+an hour of 16 kHz float32 audio alone is ~230 MB.
+
+The refine_spans stage runs two-tier transcription with a scripted model that
+scores every segment as low confidence (refinement forced on for the whole
+file), and also fails if any window handed to the refine model is longer than
+REFINE.MAX_SPAN_SECONDS plus padding, merge gap and one segment.
+
+Stages whose packages are not installed are reported as skipped. The same
+stages run as tests in tests/test_peak_rss.py.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixtures import make_transcript, make_wav
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["render", "report", "audio_windows", "refine_spans", "transcribe"]
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def load_config() -> dict:
+    with open(os.path.join(REPO_ROOT, "config", "config.json")) as f:
+        return json.load(f)
+
+def stage_render(workdir: str, args):
+    from src.report_generation.transcript_renderer import render_transcript_file
+    settings = load_config().get("REPORT", {}).get("TRANSCRIPT")
+    yield
+    render_transcript_file(os.path.join(workdir, "long.txt"), settings)
+
+def stage_report(workdir: str, args):
+    from benchmarks.fake_openai import FakeChatCompletionsServer
+    from benchmarks.run_benchmarks import make_workspace
+    from src.report_generation.openai_client import OpenAIClient
+    from src.report_generation.report_generator import ReportGenerator
+    os.environ.setdefault("AZURE_OPENAI_KEY", "benchmark")
+    server = FakeChatCompletionsServer(latency=0.0, tokens_per_second=1e6).start()
+    try:
+        config_path = make_workspace(workspace_root(workdir), "report", server.endpoint)
+        report = load_config().get("REPORT", {})
+        with open(os.path.join(os.path.dirname(config_path), "checklist.txt")) as f:
+            checklist = f.read()
+        client = OpenAIClient(config_path)
+        generator = ReportGenerator(client.get_client(), client.get_deployment(), checklist,
+                                    transcript_settings=report.get("TRANSCRIPT"),
+                                    stream=report.get("STREAM", False),
+                                    max_material_chars=report.get("MAX_MATERIAL_CHARS"))
+        yield
+        generator.generate_reports(os.path.join(workdir, "transcripts"), os.path.join(workdir, "materials"),
+                                   os.path.join(workdir, "reports"), "")
+    finally:
+        server.stop()
+
+def stage_audio_windows(workdir: str, args):
+    from src.preprocessing.transcript_generator import read_window, wav_duration
+    window = load_config().get("TRANSCRIPTION", {}).get("WINDOW_SECONDS", 600)
+    path = os.path.join(workdir, "long.wav")
+    yield
+    # The reads TranscriptGenerator makes for a long file, without the model
+    duration, start = wav_duration(path), 0.0
+    while start < duration:
+        read_window(path, start, min(duration, start + window))
+        start += window
+
+def stage_refine_spans(workdir: str, args):
+    from benchmarks.fixtures import ScriptedWhisperModel
+    from src.preprocessing import transcript_generator
+    settings = load_config().get("TRANSCRIPTION", {})
+    refine = dict(transcript_generator.REFINE_DEFAULTS, **settings.get("REFINE", {}))
+    refine.update(ENABLED=True, MAX_REFINED_FRACTION=1.0)
+    transcript_generator.WhisperModel = ScriptedWhisperModel
+    generator = transcript_generator.TranscriptGenerator(
+        "fast", beam_size=1, refine=refine, window_seconds=settings.get("WINDOW_SECONDS", 600)
+    )
+    yield
+    generator.transcribe_audio(os.path.join(workdir, "long.wav"), os.path.join(workdir, "refined.txt"))
+    refine_windows = [seconds for model, seconds in ScriptedWhisperModel.windows if model == refine["MODEL"]]
+    return {
+        "refine_windows": len(refine_windows),
+        "max_refine_window_seconds": round(max(refine_windows, default=0.0), 1),
+        "max_allowed_window_seconds": (refine["MAX_SPAN_SECONDS"] + 2 * refine["PADDING_SECONDS"]
+                                       + refine["MERGE_GAP_SECONDS"] + 5.0)
+    }
+
+def stage_transcribe(workdir: str, args):
+    if not args.whisper_model:
+        raise ImportError("needs --whisper-model")
+    from src.preprocessing.transcript_generator import TranscriptGenerator
+    settings = load_config().get("TRANSCRIPTION", {})
+    generator = TranscriptGenerator(args.whisper_model, settings.get("COMPUTE_TYPE", "int8"),
+                                    beam_size=settings.get("BEAM_SIZE", 5),
+                                    window_seconds=settings.get("WINDOW_SECONDS", 600))
+    yield
+    generator.transcribe_audio(os.path.join(workdir, "long.wav"), os.path.join(workdir, "whisper.txt"))
+
+def workspace_root(workdir: str) -> str:
+    root = os.path.join(workdir, "workspaces")
+    os.makedirs(root, exist_ok=True)
+    return root
+
+def run_stage(name: str, workdir: str, args) -> dict:
+    """Run one stage in this process: the stage generator sets up, yields, then does the measured work."""
+    stage = globals()[f"stage_{name}"](workdir, args)
+    try:
+        next(stage)
+    except ImportError as e:
+        return {"stage": name, "skipped": str(e)}
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        next(stage)
+        extra = {}
+    except StopIteration as finished:
+        # A stage may return checks of its own alongside the memory figures
+        extra = finished.value or {}
+    return {
+        "stage": name,
+        "seconds": round(time.perf_counter() - start, 2),
+        "baseline_mb": round(baseline, 1),
+        "peak_mb": round(peak_rss_mb(), 1),
+        "growth_mb": round(peak_rss_mb() - baseline, 1),
+        **extra
+    }
+
+def make_inputs(workdir: str, seconds: float, material_mb: float):
+    """One long recording's WAV and transcript, and an oversized mentor material for it."""
+    logger.info(f"Writing {seconds / 3600:.1f} h of synthetic inputs to {workdir}")
+    make_wav(os.path.join(workdir, "long.wav"), seconds)
+    make_transcript(os.path.join(workdir, "long.txt"), seconds, filler_rate=0.05)
+    for name in ["transcripts", "materials", "reports"]:
+        os.makedirs(os.path.join(workdir, name))
+    shutil.copyfile(os.path.join(workdir, "long.txt"), os.path.join(workdir, "transcripts", "long_slides.txt"))
+    line = "Slide text: groupby splits rows by key, then aggregates each group.\n"
+    with open(os.path.join(workdir, "materials", "long_slides.txt"), "w", encoding="utf-8") as f:
+        for _ in range(int(material_mb * 1024 * 1024 / len(line))):
+            f.write(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3.0, help="Length of the synthetic recording")
+    parser.add_argument("--material-mb", type=float, default=20.0, help="Size of the synthetic mentor material")
+    parser.add_argument("--max-rss-mb", type=float, default=1024.0, help="Ceiling for any stage's peak RSS")
+    parser.add_argument("--max-growth-mb", type=float, default=256.0,
+                        help="Ceiling for a stage's RSS growth over its imports")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--whisper-model", help="Also run the transcribe stage with this model")
+    parser.add_argument("--output")
+    # Internal: run a single stage against an existing workdir and print its result
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.stage:
+        print(json.dumps(run_stage(args.stage, args.workdir, args)))
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix="qc_rss_")
+    results = []
+    try:
+        make_inputs(workdir, args.hours * 3600, args.material_mb)
+        for name in args.stages:
+            command = [sys.executable, "-m", "benchmarks.peak_rss", "--stage", name, "--workdir", workdir]
+            if args.whisper_model:
+                command += ["--whisper-model", args.whisper_model]
+            completed = subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+            if completed.returncode != 0:
+                results.append({"stage": name, "error": f"exit code {completed.returncode}"})
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            if "skipped" in result:
+                logger.info(f"{name}: skipped ({result['skipped']})")
+            else:
+                logger.info(f"{name}: peak {result['peak_mb']} MB (+{result['growth_mb']} MB) "
+                            f"in {result['seconds']}s")
+            results.append(result)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = {
+        "hours": args.hours,
+        "max_rss_mb": args.max_rss_mb,
+        "max_growth_mb": args.max_growth_mb,
+        "stages": results
+    }
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    regressions = []
+    for result in results:
+        if "error" in result:
+            regressions.append(f"{result['stage']}: {result['error']}")
+        elif "skipped" not in result:
+            if result["peak_mb"] > args.max_rss_mb:
+                regressions.append(f"{result['stage']}: peak {result['peak_mb']} MB > {args.max_rss_mb} MB")
+            if result["growth_mb"] > args.max_growth_mb:
+                regressions.append(f"{result['stage']}: grew {result['growth_mb']} MB > {args.max_growth_mb} MB")
+            if result.get("max_refine_window_seconds", 0) > result.get("max_allowed_window_seconds", float("inf")):
+                regressions.append(f"{result['stage']}: refined a {result['max_refine_window_seconds']}s window "
+                                   f"(limit {result['max_allowed_window_seconds']}s)")
+    for regression in regressions:
+        logger.error(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
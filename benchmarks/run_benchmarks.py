@@ -0,0 +1,205 @@
+# benchmarks/run_benchmarks.py
+"""Reproducible benchmarks against local stand-ins for Google Drive and Azure OpenAI.
+
+    python -m benchmarks.run_benchmarks --videos 3 --duration 60 --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json   # exit 1 on regression
+
+Requires ffmpeg on PATH and the packages in requirements.txt.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_drive import FakeDriveManager
+from benchmarks.fake_openai import FakeChatCompletionsServer
+from benchmarks.fixtures import FakeTranscriber, make_transcript, make_video
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FOLDER = "source_videos"
+
+def timed(results: dict, name: str, fn, **extra):
+    start = time.perf_counter()
+    value = fn()
+    results[name] = {"seconds": round(time.perf_counter() - start, 4), **extra}
+    logger.info(f"{name}: {results[name]['seconds']}s")
+    return value
+
+def make_workspace(root: str, name: str, endpoint: str) -> str:
+    """Fresh config + local dirs so each scenario starts from an empty state."""
+    workspace = os.path.join(root, name)
+    config_dir = os.path.join(workspace, "config")
+    os.makedirs(config_dir)
+    with open(os.path.join(REPO_ROOT, "config", "config.json")) as f:
+        config = json.load(f)
+    config["PATHS"] = {key: os.path.join(workspace, value) for key, value in config["PATHS"].items()}
+    config["AZURE_OPENAI_ENDPOINT"] = endpoint
+    # The scratch manager is process-wide, so every scenario shares the first workspace's root
+    config["SCRATCH"] = dict(config.get("SCRATCH", {}), ROOT=os.path.join(workspace, "scratch"))
+    config.pop("METRICS", None)
+    shutil.copyfile(os.path.join(REPO_ROOT, "config", "checklist.txt"), os.path.join(config_dir, "checklist.txt"))
+    config_path = os.path.join(config_dir, "config.json")
+    with open(config_path, "w") as f:
+        json.dump(config, f, indent=2)
+    return config_path
+
+def make_flow(config_path: str, drive: FakeDriveManager, args):
+    from src.main_flow import MainFlow
+    from src.storage.drive_storage import DriveStorage
+    with open(config_path) as f:
+        folders = json.load(f)["STORAGE"]["DRIVE_FOLDERS"]
+    flow = MainFlow(config_path, storage=DriveStorage(folders, gdrive=drive))
+    if args.transcriber == "fake":
+        flow._transcript_generator = FakeTranscriber(args.fake_rtf)
+    return flow
+
+def seed_drive(drive: FakeDriveManager, fixtures: list):
+    for path in fixtures:
+        drive.add_file(SOURCE_FOLDER, path)
+
+def bench_stages(results: dict, root: str, fixtures: list, server, args):
+    from src.preprocessing.video_processor import VideoProcessor
+    from src.report_generation.openai_client import OpenAIClient
+    from src.report_generation.report_generator import ReportGenerator
+
+    drive = FakeDriveManager(os.path.join(root, "stage_drive"), args.drive_latency, args.drive_bandwidth)
+    seed_drive(drive, fixtures[:1])
+    video_id = drive.list_files(SOURCE_FOLDER)[0]["id"]
+    video_path = os.path.join(root, "stage_video.mp4")
+    audio_path = os.path.join(root, "stage_audio.wav")
+    transcript_path = os.path.join(root, "stage_transcript.txt")
+
+    size = os.path.getsize(fixtures[0])
+    timed(results, "stage.drive_download", lambda: drive.download_file(video_id, video_path), bytes=size)
+    timed(results, "stage.ffmpeg", lambda: VideoProcessor.convert_mp4_to_wav(video_path, audio_path),
+          audio_seconds=args.duration)
+
+    if args.transcriber == "whisper":
+        from src.preprocessing.transcript_generator import TranscriptGenerator
+        generator = timed(results, "stage.whisper_load", lambda: TranscriptGenerator(args.whisper_model, "int8"))
+        timed(results, "stage.transcribe", lambda: generator.transcribe_audio(audio_path, transcript_path),
+              audio_seconds=args.duration)
+        if args.whisper_refine:
+            # Greedy fast pass over everything, refine model only on low-confidence spans
+            two_tier = TranscriptGenerator(args.whisper_model, "int8", beam_size=1,
+                                           refine={"ENABLED": True, "MODEL": args.whisper_refine})
+            timed(results, "stage.transcribe_two_tier", lambda: two_tier.transcribe_audio(audio_path, transcript_path),
+                  audio_seconds=args.duration)
+    make_transcript(transcript_path, args.duration)
+
+    config_path = make_workspace(root, "stage_workspace", server.endpoint)
+    openai_client = OpenAIClient(config_path)
+    with open(os.path.join(os.path.dirname(config_path), "checklist.txt")) as f:
+        checklist = f.read()
+    generator = ReportGenerator(openai_client.get_client(), openai_client.get_deployment(), checklist)
+    with open(transcript_path, encoding="utf-8") as f:
+        transcript = f.read()
+    timed(results, "stage.quality_check", lambda: generator.quality_check(transcript, "", ""),
+          transcript_chars=len(transcript))
+
+def bench_end_to_end(results: dict, root: str, fixtures: list, server, args):
+    count = {"videos": len(fixtures)}
+
+    # process_drive_url: download -> audio -> transcript for every video
+    drive = FakeDriveManager(os.path.join(root, "e2e_drive"), args.drive_latency, args.drive_bandwidth)
+    seed_drive(drive, fixtures)
+    flow = make_flow(make_workspace(root, "e2e_process", server.endpoint), drive, args)
+    timed(results, "e2e.process_drive_url", lambda: asyncio.run(flow.process_drive_url(SOURCE_FOLDER)), **count)
+
+    # generate_quality_reports over the transcripts the previous run uploaded
+    flow = make_flow(make_workspace(root, "e2e_reports", server.endpoint), drive, args)
+    timed(results, "e2e.generate_quality_reports", flow.generate_quality_reports, **count)
+
+    # Full job, as a worker runs it
+    drive = FakeDriveManager(os.path.join(root, "e2e_job_drive"), args.drive_latency, args.drive_bandwidth)
+    seed_drive(drive, fixtures)
+    flow = make_flow(make_workspace(root, "e2e_job", server.endpoint), drive, args)
+    job_results = timed(results, "e2e.run_job", lambda: flow.run_job(SOURCE_FOLDER), **count)
+    results["e2e.run_job"]["reported"] = sum(1 for r in job_results if r["status"] == "reported")
+    results["e2e.run_job"]["drive_calls"] = dict(drive.calls)
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, entry in baseline.get("results", {}).items():
+        current = results.get(name)
+        if current and entry.get("seconds") and current["seconds"] > entry["seconds"] * (1 + tolerance):
+            regressions.append(f"{name}: {current['seconds']}s vs baseline {entry['seconds']}s")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds per synthetic video")
+    parser.add_argument("--drive-latency", type=float, default=0.05, help="Seconds added to every Drive call")
+    parser.add_argument("--drive-bandwidth", type=float, default=20e6, help="Drive bytes/s (0 = unthrottled)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--llm-tps", type=float, default=200.0, help="Completion tokens per second")
+    parser.add_argument("--transcriber", choices=["fake", "whisper"], default="fake",
+                        help="fake writes synthetic transcripts (the fixtures contain no speech)")
+    parser.add_argument("--fake-rtf", type=float, default=0.0, help="Real-time factor simulated by the fake transcriber")
+    parser.add_argument("--whisper-model", default="base.en")
+    parser.add_argument("--whisper-refine", help="Also time two-tier transcription with this refine model")
+    parser.add_argument("--skip-e2e", action="store_true")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary workspace")
+    args = parser.parse_args(argv)
+    args.drive_bandwidth = args.drive_bandwidth or None
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    os.environ.setdefault("AZURE_OPENAI_KEY", "benchmark")
+
+    root = tempfile.mkdtemp(prefix="qc_bench_")
+    server = FakeChatCompletionsServer(args.llm_latency, args.llm_tps).start()
+    results = {}
+    try:
+        fixture_dir = os.path.join(root, "fixtures")
+        os.makedirs(fixture_dir)
+        fixtures = [make_video(os.path.join(fixture_dir, f"bench_{i:02d}.mp4"), args.duration)
+                    for i in range(args.videos)]
+        bench_stages(results, root, fixtures, server, args)
+        if not args.skip_e2e:
+            bench_end_to_end(results, root, fixtures, server, args)
+    finally:
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    output = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args)
+        },
+        "results": results
+    }
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# benchmarks/transcript_compression.py
+"""Prompt size and report agreement: raw TSV transcripts vs the compact rendering.
+
+    python -m benchmarks.transcript_compression --output compression.json
+    python -m benchmarks.transcript_compression --quality            # fake LLM, exit 1 on regression
+    python -m benchmarks.transcript_compression --quality --config config/config.json   # real deployment
+
+For a fixed set of synthetic transcripts (seeded: same fixtures every run) this
+reports characters and tokens of both renderings. Tokens are counted with
+tiktoken when it is installed, otherwise estimated at 4 characters per token.
+With --quality each transcript is quality-checked in both forms; the run fails
+if the compact form's checklist statuses agree with the raw form's on fewer
+than --min-agreement of the items, or if it reports fewer failed items overall.
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixtures import make_transcript
+from src.report_generation.transcript_renderer import estimate_tokens, render_transcript
+
+logger = logging.getLogger(__name__)
+
+# (seconds, filler rate): a short clean clip up to a long, hesitant lecture
+FIXTURES = [(300, 0.0), (900, 0.02), (1800, 0.05), (3600, 0.08)]
+
+def token_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        return estimate_tokens, "chars/4"
+    encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text)), "tiktoken:o200k_base"
+
+def make_generator(config_path: str):
+    from src.report_generation.openai_client import OpenAIClient
+    from src.report_generation.report_generator import ReportGenerator
+    openai_client = OpenAIClient(config_path)
+    with open(os.path.join(os.path.dirname(config_path), "checklist.txt")) as f:
+        checklist = f.read()
+    return ReportGenerator(openai_client.get_client(), openai_client.get_deployment(), checklist)
+
+def statuses(report: dict) -> dict:
+    return {item["id"]: item["status"] for item in report.get("items", [])}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quality", action="store_true", help="Also compare quality-check results")
+    parser.add_argument("--config", help="Config of a real deployment (default: local fake LLM)")
+    parser.add_argument("--min-agreement", type=float, default=0.9)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    count, method = token_counter()
+    root = tempfile.mkdtemp(prefix="qc_compress_")
+    server = None
+    generator = None
+    results = []
+    try:
+        if args.quality:
+            config_path = args.config
+            if config_path is None:
+                from benchmarks.fake_openai import FakeChatCompletionsServer
+                from benchmarks.run_benchmarks import make_workspace
+                os.environ.setdefault("AZURE_OPENAI_KEY", "benchmark")
+                server = FakeChatCompletionsServer(latency=0.0, tokens_per_second=1e6).start()
+                config_path = make_workspace(root, "workspace", server.endpoint)
+            generator = make_generator(config_path)
+
+        for i, (seconds, filler_rate) in enumerate(FIXTURES):
+            path = make_transcript(os.path.join(root, f"fixture_{i}.txt"), seconds, filler_rate, seed=i)
+            with open(path, encoding="utf-8") as f:
+                raw = f.read()
+            compact, stats = render_transcript(raw, {"FORMAT": "compact"})
+            row = {
+                "seconds": seconds,
+                "filler_rate": filler_rate,
+                "raw_chars": len(raw),
+                "compact_chars": len(compact),
+                "raw_tokens": count(raw),
+                "compact_tokens": count(compact),
+                "fillers": stats["fillers"]
+            }
+            row["token_reduction"] = round(1 - row["compact_tokens"] / row["raw_tokens"], 4)
+            if generator is not None:
+                raw_status = statuses(generator.quality_check(raw, "", ""))
+                compact_status = statuses(generator.quality_check(compact, "", ""))
+                shared = [item for item in raw_status if item in compact_status]
+                agree = sum(1 for item in shared if raw_status[item] == compact_status[item])
+                row["agreement"] = round(agree / len(raw_status), 4) if raw_status else 0.0
+                row["raw_failed"] = sorted(item for item, status in raw_status.items() if status == "fail")
+                row["compact_failed"] = sorted(item for item, status in compact_status.items() if status == "fail")
+            logger.info(f"{seconds}s @ {filler_rate:.0%} fillers: {row['raw_tokens']} -> "
+                        f"{row['compact_tokens']} tokens ({row['token_reduction']:.1%} less)")
+            results.append(row)
+    finally:
+        if server is not None:
+            server.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+    raw_total = sum(row["raw_tokens"] for row in results)
+    compact_total = sum(row["compact_tokens"] for row in results)
+    output = {
+        "token_count": method,
+        "token_reduction": round(1 - compact_total / raw_total, 4),
+        "fixtures": results
+    }
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if not args.quality:
+        return 0
+    regressions = []
+    for row in results:
+        if row["agreement"] < args.min_agreement:
+            regressions.append(f"{row['seconds']}s fixture: agreement {row['agreement']:.0%}")
+        if len(row["compact_failed"]) < len(row["raw_failed"]):
+            missed = sorted(set(row["raw_failed"]) - set(row["compact_failed"]))
+            regressions.append(f"{row['seconds']}s fixture: compact transcript no longer fails {missed}")
+    for regression in regressions:
+        logger.error(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# src/cli.py
+"""Headless entry point: python -m src.cli {submit,plan,worker,status,usage,cancel} ..."""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+from dotenv import load_dotenv
+from src.monitoring.logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = "config/config.json"
+
+def _job_queue(config_path: str):
+    from src.state.job_queue import JobQueue
+    with open(config_path) as f:
+        state_dir = json.load(f)["PATHS"]["STATE"]
+    return JobQueue(os.path.join(state_dir, "qc_bot.db")), state_dir
+
+def stage_mentor_files(state_dir: str, job_id: str, mentor_files: dict) -> dict:
+    """Copy mentor materials into the job's upload dir so any worker can read them later."""
+    upload_dir = os.path.join(state_dir, "uploads", job_id)
+    os.makedirs(upload_dir, exist_ok=True)
+    staged = {}
+    for file_type, path in mentor_files.items():
+        if not path:
+            continue
+        staged_path = os.path.join(upload_dir, os.path.basename(path))
+        shutil.copyfile(path, staged_path)
+        staged[file_type] = os.path.abspath(staged_path)
+    return staged
+
+def cmd_submit(args):
+    import uuid
+    queue, state_dir = _job_queue(args.config)
+    job_id = uuid.uuid4().hex
+    mentor_files = stage_mentor_files(state_dir, job_id, {"slides": args.slides, "notebook": args.notebook})
+    queue.submit(args.url, args.video_type, mentor_files, user=args.user, job_id=job_id,
+                 token_budget=args.token_budget)
+    print(job_id)
+
+def print_plan(plan: dict, indent: str = ""):
+    from src.preprocessing.preflight import format_eta
+    print(f"{indent}{plan['accepted']}/{plan['videos']} video(s), {plan['audio_seconds'] / 60:.0f} min of audio, "
+          f"ETA {format_eta(plan['eta_seconds'])}")
+    if "tokens" in plan:
+        print(f"{indent}~{plan['tokens']} report tokens, ~{plan['cost']:.2f} {plan.get('currency', '')}")
+    for rejected in plan["rejected"]:
+        print(f"{indent}    rejected  {rejected['name']}: {rejected['reason']}")
+
+def cmd_plan(args):
+    from src.main_flow import MainFlow
+    plan = MainFlow(args.config).plan_folder(args.url)
+    for entry in plan["entries"]:
+        duration = f"{entry['duration'] / 60:.1f} min" if entry["duration"] else "?"
+        estimate = sum(entry["estimate"].values()) if entry["estimate"] else 0
+        print(f"{entry['status']:<9} {entry['name']:<40} {duration:>10}  ~{estimate:.0f}s")
+    print_plan(plan)
+
+def cmd_worker(args):
+    from src.jobs.worker import Worker
+    from src.monitoring.metrics import start_exporters
+    worker = Worker(args.config, poll_interval=args.poll_interval, lease_seconds=args.lease)
+    start_exporters(worker.main_flow.config.get("METRICS"))
+    if args.once:
+        worker.run_once()
+    else:
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            worker.stop()
+
+def cmd_status(args):
+    queue, _ = _job_queue(args.config)
+    jobs = [queue.get(args.job_id)] if args.job_id else queue.list_jobs(limit=args.limit)
+    for job in jobs:
+        if job is None:
+            print(f"No such job: {args.job_id}", file=sys.stderr)
+            return 1
+        print(f"{job['id']}  {job['status']:<10} {int(job['progress'] * 100):>3}%  {job['folder_url']}  {job['message']}")
+        if args.job_id:
+            if job["plan"]:
+                print_plan(job["plan"], indent="    ")
+            for result in job["results"]:
+                print(f"    {result['status']:<9} {result['video']}  ({int(result['elapsed'])}s)")
+                for stage, value in sorted((result.get("stages") or {}).items()):
+                    print(f"        {stage:<28} {value}")
+            if job["error"]:
+                print(f"    error: {job['error']}")
+    return 0
+
+def cmd_usage(args):
+    from src.state.usage_ledger import UsageLedger
+    with open(args.config) as f:
+        state_dir = json.load(f)["PATHS"]["STATE"]
+    ledger = UsageLedger(os.path.join(state_dir, "qc_bot.db"))
+    if args.run:
+        rows = ledger.by_video(args.run)
+        for row in rows:
+            print(f"{row['base_name'] or row['video_id']:<40} {row['prompt_tokens']:>9} {row['completion_tokens']:>9}"
+                  f"  {row['cost']:.4f}")
+        totals = ledger.totals(run_id=args.run)
+        print(f"{'total':<40} {totals['prompt_tokens']:>9} {totals['completion_tokens']:>9}  {totals['cost']:.4f}")
+        return 0
+    print(f"{'day':<12} {'calls':>6} {'prompt':>10} {'completion':>10}  cost")
+    for row in ledger.by_day(args.days):
+        print(f"{row['day']:<12} {row['calls']:>6} {row['prompt_tokens']:>10} {row['completion_tokens']:>10}"
+              f"  {row['cost']:.4f}")
+    return 0
+
+def cmd_cancel(args):
+    queue, _ = _job_queue(args.config)
+    if not queue.cancel(args.job_id):
+        print(f"Job {args.job_id} is not queued or running", file=sys.stderr)
+        return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="QC Report Generator batch runner")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit = subparsers.add_parser("submit", help="Queue a Drive folder for processing")
+    submit.add_argument("url", help="Google Drive videos folder URL")
+    submit.add_argument("--video-type", choices=["conceptual", "hands-on", "both"], default="conceptual")
+    submit.add_argument("--slides", help="Presentation (PPTX) for the recordings")
+    submit.add_argument("--notebook", help="Notebook (IPYNB) for the recordings")
+    submit.add_argument("--user", default="cli")
+    submit.add_argument("--token-budget", type=int, help="Max LLM tokens the run may spend on reports")
+    submit.set_defaults(func=cmd_submit)
+
+    plan = subparsers.add_parser("plan", help="Preflight a folder: durations, rejected files, ETA and cost")
+    plan.add_argument("url", help="Google Drive videos folder URL")
+    plan.set_defaults(func=cmd_plan)
+
+    worker = subparsers.add_parser("worker", help="Process queued jobs")
+    worker.add_argument("--once", action="store_true", help="Run at most one job and exit")
+    worker.add_argument("--poll-interval", type=float, default=2.0)
+    worker.add_argument("--lease", type=float, default=300.0, help="Job lease in seconds")
+    worker.set_defaults(func=cmd_worker)
+
+    status = subparsers.add_parser("status", help="Show job state")
+    status.add_argument("job_id", nargs="?")
+    status.add_argument("--limit", type=int, default=20)
+    status.set_defaults(func=cmd_status)
+
+    usage = subparsers.add_parser("usage", help="LLM tokens and cost per day, or per video for one run")
+    usage.add_argument("--run", help="Job id to break down per video")
+    usage.add_argument("--days", type=int, default=14)
+    usage.set_defaults(func=cmd_usage)
+
+    cancel = subparsers.add_parser("cancel", help="Cancel a queued or running job")
+    cancel.add_argument("job_id")
+    cancel.set_defaults(func=cmd_cancel)
+
+    args = parser.parse_args(argv)
+    # LOGGING settings come from the config the command runs with (a no-op if already configured)
+    configure_logging(args.config)
+    return args.func(args) or 0
+
+if __name__ == "__main__":
+    load_dotenv()
+    sys.exit(main())
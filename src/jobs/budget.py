@@ -0,0 +1,67 @@
+# src/jobs/budget.py
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "PROMPT_PRICE_PER_1K": 0.00015,
+    "COMPLETION_PRICE_PER_1K": 0.0006,
+    "CURRENCY": "USD",
+    "RUN_TOKEN_BUDGET": None,
+    # Projection until the usage ledger has enough history to fit its own
+    "PROMPT_TOKENS_BASE": 2500,
+    "PROMPT_TOKENS_PER_AUDIO_SECOND": 2.5,
+    "COMPLETION_TOKENS": 1500
+}
+
+def usage_settings(config: dict = None) -> Dict:
+    return dict(DEFAULTS, **((config or {}).get("USAGE") or {}))
+
+def price(settings: Dict, prompt_tokens: float, completion_tokens: float) -> float:
+    return (prompt_tokens * settings["PROMPT_PRICE_PER_1K"]
+            + completion_tokens * settings["COMPLETION_PRICE_PER_1K"]) / 1000
+
+def project_tokens(settings: Dict, audio_seconds: Optional[float], model: Optional[Dict] = None) -> Dict:
+    """Expected prompt/completion tokens for one report, from the ledger's fit or the configured defaults."""
+    if model is None:
+        model = {
+            "prompt_base": settings["PROMPT_TOKENS_BASE"],
+            "prompt_per_audio_second": settings["PROMPT_TOKENS_PER_AUDIO_SECOND"],
+            "completion": settings["COMPLETION_TOKENS"]
+        }
+    prompt = model["prompt_base"] + model["prompt_per_audio_second"] * (audio_seconds or 0.0)
+    return {"prompt": int(prompt), "completion": int(model["completion"])}
+
+class TokenBudget:
+    """Admission control for one run's LLM tokens.
+
+    A report reserves its projected tokens before the call and settles to the
+    actual usage afterwards. A report whose projection does not fit in what is
+    left (spent plus reservations of calls in flight) is skipped rather than
+    sent, so a run finishes within its budget instead of overshooting it.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = int(limit)
+        self.spent = 0
+        self.reserved = 0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, tokens: int) -> bool:
+        with self._lock:
+            if self.spent + self.reserved + tokens > self.limit:
+                return False
+            self.reserved += tokens
+            return True
+
+    def settle(self, reserved: int, actual: int):
+        with self._lock:
+            self.reserved = max(0, self.reserved - reserved)
+            self.spent += actual
+
+    @property
+    def remaining(self) -> int:
+        with self._lock:
+            return max(0, self.limit - self.spent - self.reserved)
@@ -0,0 +1,30 @@
+# src/jobs/cancellation.py
+import threading
+import contextvars
+from contextlib import contextmanager
+
+class JobCancelled(BaseException):
+    """The running job was cancelled, or its lease was lost to another worker.
+
+    A BaseException, like KeyboardInterrupt, so the pipeline's per-video
+    `except Exception` handlers let it through: it stops the whole run instead
+    of being recorded as one failed video after another.
+    """
+
+# Set by the worker around run_job; video and upload threads inherit it with the context
+_cancel_event: contextvars.ContextVar = contextvars.ContextVar("qc_cancel_event", default=None)
+
+@contextmanager
+def cancel_scope(event: threading.Event, message: str):
+    """Make check_cancelled() inside the block raise JobCancelled(message) once event is set."""
+    token = _cancel_event.set((event, message))
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+def check_cancelled():
+    """Raise JobCancelled if the current job has been cancelled; cheap enough to call per chunk."""
+    scope = _cancel_event.get()
+    if scope is not None and scope[0].is_set():
+        raise JobCancelled(scope[1])
@@ -0,0 +1,101 @@
+# src/jobs/scheduler.py
+import time
+import logging
+import itertools
+import threading
+from contextlib import contextmanager
+from src.monitoring.metrics import SCHEDULER_WAIT_SECONDS, TRANSCRIBE_SLOTS_BUSY, TRANSCRIBE_WAITING, record_stage
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionScheduler:
+    """Process-wide admission control for the CPU-bound transcription stage.
+
+    Every worker thread in the process (embedded app workers, CLI workers) asks
+    for a slot before running Whisper, so concurrent jobs share a fixed number
+    of transcription slots instead of oversubscribing the CPU. When a slot frees
+    up it goes to the waiter whose user currently holds the fewest slots, then
+    to the shortest recording (shortest-job-first keeps average turnaround low).
+    A waiter older than starvation_seconds is served in arrival order so long
+    recordings still make progress under a steady stream of short ones.
+    """
+
+    def __init__(self, slots: int = 1, starvation_seconds: float = 1800.0):
+        self.slots = max(1, int(slots))
+        self.starvation_seconds = starvation_seconds
+        self._cond = threading.Condition()
+        self._running = 0
+        self._active = {}
+        self._waiting = []
+        self._seq = itertools.count()
+
+    def _priority(self, waiter: dict, now: float):
+        starved = now - waiter["since"] >= self.starvation_seconds
+        if starved:
+            return (0, 0, 0.0, waiter["seq"])
+        return (1, self._active.get(waiter["user"], 0), waiter["duration"], waiter["seq"])
+
+    def _next_waiter(self) -> dict:
+        now = time.time()
+        return min(self._waiting, key=lambda waiter: self._priority(waiter, now))
+
+    @contextmanager
+    def slot(self, user: str = "", duration: float = None, on_wait=None, wait_interval: float = 5.0):
+        """Hold a transcription slot for the duration of the block.
+
+        duration is the recording length in seconds (None sorts last). on_wait is
+        called every wait_interval seconds while queued; an exception it raises
+        (e.g. the job was cancelled) withdraws the request.
+        """
+        waiter = {
+            "user": user or "",
+            "duration": duration if duration is not None else float("inf"),
+            "since": time.time(),
+            "seq": next(self._seq)
+        }
+        start = time.perf_counter()
+        last_notice = start
+        with self._cond:
+            self._waiting.append(waiter)
+            TRANSCRIBE_WAITING.set(len(self._waiting))
+        try:
+            while True:
+                with self._cond:
+                    if self._running < self.slots and self._next_waiter() is waiter:
+                        self._waiting.remove(waiter)
+                        self._running += 1
+                        self._active[waiter["user"]] = self._active.get(waiter["user"], 0) + 1
+                        TRANSCRIBE_WAITING.set(len(self._waiting))
+                        TRANSCRIBE_SLOTS_BUSY.set(self._running)
+                        break
+                    self._cond.wait(wait_interval)
+                if on_wait and time.perf_counter() - last_notice >= wait_interval:
+                    last_notice = time.perf_counter()
+                    on_wait()
+        except BaseException:
+            with self._cond:
+                if waiter in self._waiting:
+                    self._waiting.remove(waiter)
+                    TRANSCRIBE_WAITING.set(len(self._waiting))
+                self._cond.notify_all()
+            raise
+
+        waited = time.perf_counter() - start
+        SCHEDULER_WAIT_SECONDS.observe(waited)
+        record_stage("transcribe_wait", waited)
+        if waited >= 1:
+            logger.info(f"Transcription slot granted to user {waiter['user'] or '-'} after {waited:.1f}s")
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._active[waiter["user"]] -= 1
+                if not self._active[waiter["user"]]:
+                    del self._active[waiter["user"]]
+                TRANSCRIBE_SLOTS_BUSY.set(self._running)
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"slots": self.slots, "running": self._running, "waiting": len(self._waiting)}
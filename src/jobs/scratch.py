@@ -0,0 +1,149 @@
+# src/jobs/scratch.py
+import os
+import time
+import shutil
+import logging
+import threading
+from src.monitoring.metrics import SCRATCH_RESERVED_BYTES, SCRATCH_WAIT_SECONDS, record_stage
+
+logger = logging.getLogger(__name__)
+
+class Reservation:
+    """Bytes of scratch space held for one video; released in parts as files are deleted."""
+
+    def __init__(self, manager: "ScratchManager", nbytes: int, label: str):
+        self.manager = manager
+        self.remaining = nbytes
+        self.label = label
+
+    def release(self, nbytes: int = None):
+        nbytes = self.remaining if nbytes is None else min(nbytes, self.remaining)
+        if nbytes > 0:
+            self.remaining -= nbytes
+            self.manager._release(nbytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+class JobScratch:
+    """A job attempt's private working directory (videos, audio, mentor materials) under the scratch root.
+
+    Each attempt gets its own directory (<job_id>.<attempt>): a worker that lost
+    its lease may still be winding down while the job's next attempt runs, and
+    must never share or remove the new attempt's files. A retry still reuses
+    earlier attempts' files through the absolute paths in the video manifest.
+    """
+
+    def __init__(self, manager: "ScratchManager", job_id: str, attempt: int = None):
+        self.manager = manager
+        self.job_id = job_id
+        self.attempt = attempt
+        name = job_id if attempt is None else f"{job_id}.{attempt}"
+        self.path = os.path.join(manager.root, name)
+        os.makedirs(self.path, exist_ok=True)
+
+    def dir(self, name: str) -> str:
+        path = os.path.join(self.path, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def reserve(self, nbytes: int, label: str = "", on_wait=None) -> Reservation:
+        return self.manager.reserve(nbytes, label=label or self.job_id, on_wait=on_wait)
+
+    def cleanup(self):
+        """Remove this attempt's directory, and those of the job's earlier (abandoned) attempts."""
+        paths = [self.path]
+        if self.attempt is not None:
+            paths += [os.path.join(self.manager.root, f"{self.job_id}.{attempt}") for attempt in range(1, self.attempt)]
+        for path in paths:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Removed scratch directory {path}")
+
+class ScratchManager:
+    """Process-wide accounting of local disk used by in-flight videos.
+
+    Each job works in its own directory (so concurrent jobs never delete each
+    other's files), and each video reserves its expected footprint (source video
+    plus extracted WAV) before downloading. A reservation blocks while the
+    reserved total would exceed the quota, or leave less than min_free_bytes on
+    the volume; a single request larger than the quota is admitted when nothing
+    else is reserved so it cannot wait forever. Space is handed back as soon as
+    each file is deleted, not at the end of the job.
+    """
+
+    def __init__(self, root: str, quota_bytes: int, min_free_bytes: int = 0, max_age_seconds: float = 86400):
+        self.root = os.path.abspath(root)
+        self.quota_bytes = quota_bytes
+        self.min_free_bytes = min_free_bytes
+        self.max_age_seconds = max_age_seconds
+        self._cond = threading.Condition()
+        self._reserved = 0
+        os.makedirs(self.root, exist_ok=True)
+        self.sweep()
+
+    def job(self, job_id: str, attempt: int = None) -> JobScratch:
+        return JobScratch(self, job_id, attempt)
+
+    def _fits(self, nbytes: int) -> bool:
+        if self._reserved == 0:
+            return True
+        if self._reserved + nbytes > self.quota_bytes:
+            return False
+        # Bytes already reserved may not be on disk yet, so count them against free space too
+        free = shutil.disk_usage(self.root).free
+        return free - (self._reserved + nbytes) >= self.min_free_bytes
+
+    def reserve(self, nbytes: int, label: str = "", on_wait=None, wait_interval: float = 5.0) -> Reservation:
+        """Block until nbytes of scratch space can be reserved.
+
+        on_wait is called every wait_interval seconds while blocked; an exception
+        it raises (e.g. the job was cancelled) abandons the request.
+        """
+        nbytes = max(0, int(nbytes))
+        start = time.perf_counter()
+        with self._cond:
+            if not self._fits(nbytes):
+                logger.info(f"Waiting for {nbytes / 2**20:.0f} MB of scratch space for {label} "
+                            f"({self._reserved / 2**20:.0f} MB reserved)")
+            while not self._fits(nbytes):
+                if not self._cond.wait(wait_interval) and on_wait:
+                    on_wait()
+            self._reserved += nbytes
+            SCRATCH_RESERVED_BYTES.set(self._reserved)
+        waited = time.perf_counter() - start
+        SCRATCH_WAIT_SECONDS.observe(waited)
+        if waited >= 1:
+            record_stage("scratch_wait", waited)
+        return Reservation(self, nbytes, label)
+
+    def _release(self, nbytes: int):
+        with self._cond:
+            self._reserved = max(0, self._reserved - nbytes)
+            SCRATCH_RESERVED_BYTES.set(self._reserved)
+            self._cond.notify_all()
+
+    def sweep(self):
+        """Remove job directories left behind by crashed or cancelled jobs (untouched for max_age_seconds)."""
+        now = time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path):
+                continue
+            newest = os.path.getmtime(path)
+            for dirpath, _, filenames in os.walk(path):
+                for filename in filenames:
+                    try:
+                        newest = max(newest, os.path.getmtime(os.path.join(dirpath, filename)))
+                    except OSError:
+                        pass
+            if now - newest > self.max_age_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Swept stale scratch directory {path}")
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"reserved_bytes": self._reserved, "quota_bytes": self.quota_bytes}
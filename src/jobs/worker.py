@@ -0,0 +1,91 @@
+# src/jobs/worker.py
+import os
+import socket
+import logging
+import threading
+from src.main_flow import MainFlow
+from src.state.job_queue import JobQueue
+from src.monitoring.logging_setup import log_context
+from src.monitoring.events import get_bus
+from src.jobs.cancellation import JobCancelled, cancel_scope
+
+logger = logging.getLogger(__name__)
+
+class Worker:
+    """Pulls jobs from the shared JobQueue and runs them through MainFlow.run_job."""
+
+    def __init__(self, config_path: str, worker_id: str = None, poll_interval: float = 2.0,
+                 lease_seconds: float = 300.0):
+        self.main_flow = MainFlow(config_path)
+        self.queue = JobQueue(os.path.join(self.main_flow.paths["STATE"], "qc_bot.db"))
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        logger.info(f"Worker {self.worker_id} started")
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._stop.wait(self.poll_interval)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def run_once(self) -> bool:
+        """Claim and run a single job; returns False when the queue was empty."""
+        job = self.queue.claim(self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        job_id = job["id"]
+        logger.info(f"Worker {self.worker_id} running job {job_id} ({job['folder_url']})")
+        state = {"progress": job["progress"], "message": "Starting..."}
+        lost = threading.Event()
+
+        # Keep the lease alive while long stages (download, transcription) block this thread
+        def keep_alive():
+            while not lost.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                    lost.set()
+
+        heartbeat_thread = threading.Thread(target=keep_alive, name=f"heartbeat-{job_id}", daemon=True)
+        heartbeat_thread.start()
+
+        cancelled_message = f"Job {job_id} was cancelled or reclaimed"
+
+        def progress(fraction, message):
+            state["progress"], state["message"] = fraction, message
+            if lost.is_set() or not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds,
+                                                         progress=fraction, message=message):
+                lost.set()
+                raise JobCancelled(cancelled_message)
+
+        try:
+            # Once the lease is lost, every video thread of the run stops at its next check_cancelled()
+            with log_context(job_id=job_id, user=job["user"]), cancel_scope(lost, cancelled_message):
+                self.main_flow.run_job(
+                    job["folder_url"],
+                    job["mentor_files"],
+                    progress_cb=progress,
+                    result_cb=lambda result: self.queue.add_result(job_id, result),
+                    user=job["user"],
+                    plan_cb=lambda plan: self.queue.set_plan(job_id, plan),
+                    job_id=job_id,
+                    token_budget=job["token_budget"],
+                    attempt=job["attempts"]
+                )
+            self.queue.complete(job_id, self.worker_id)
+            logger.info(f"Job {job_id} finished")
+        except JobCancelled as e:
+            logger.warning(str(e))
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed at '{state['message']}'")
+            self.queue.fail(job_id, self.worker_id, str(e))
+        finally:
+            lost.set()
+            heartbeat_thread.join()
+            # Final state is in the queue (results); live progress is no longer needed
+            get_bus().clear(job_id)
+        return True
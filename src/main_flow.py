@@ -1,176 +1,670 @@
 # src/main_flow.py
-from src.preprocessing.gdrive_manager import GoogleDriveManager
+# Whisper, OpenAI, python-pptx and ijson are imported where first used so
+# that importing this module (every Streamlit rerun, every CLI call) stays cheap.
 from src.preprocessing.download_manager import GoogleDriveDownloader
 from src.preprocessing.video_processor import VideoProcessor
-from src.preprocessing.transcript_generator import TranscriptGenerator
-from src.preprocessing.file_processor import FileProcessor
-from src.report_generation.openai_client import OpenAIClient
-from src.report_generation.report_generator import ReportGenerator
+from src.preprocessing.preflight import Preflight, format_eta
+from src.preprocessing.material_cache import MaterialCache
+from src.report_generation.report_generator import ReportError, ReportGenerator
+from src.state.report_index import ReportIndex
+from src import resources
+from src.monitoring.metrics import collect_stages
+from src.monitoring.logging_setup import log_context
+from src.storage.base import StorageError, StoragePermissionError
+from src.storage.factory import create_storage
+from src.storage.uploader import Uploader
+from src.state.manifest import VideoManifest, artifact_ok, file_checksum, stage_reached
+from src.state.usage_ledger import UsageLedger, usage_labels
+from src.jobs.budget import TokenBudget, price, project_tokens, usage_settings
+from src.jobs.cancellation import JobCancelled
 import json
 import os
+import uuid
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import glob
-import asyncio
+import time
 import logging
-import tempfile
 import shutil
-import googleapiclient.errors
 
 logger = logging.getLogger(__name__)
 
 class MainFlow:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, storage=None):
         logger.info("Initializing MainFlow with config: %s", config_path)
+        self.config_path = config_path
+        self.checklist_path = os.path.join(os.path.dirname(config_path), "checklist.txt")
         with open(config_path) as f:
             self.config = json.load(f)
         self.paths = self.config["PATHS"]
-        self.drive_folders = {
-            "VIDEOS": "1angHYyiE_sPTKpRsrHyPAJkYF7b78iPf",
-            "AUDIOS": "1bLbSXaO3AS-EuBg_o7sGc8AonkHt7SdG",
-            "TRANSCRIPTS": "1TbqLgYXOguxYivMiy17s1UVqUKxpGtt3",
-            "REPORTS": "1JgwDdQVc1YsyKNhag5l1PdD607vMjy1H",
-            "MENTOR_MATERIALS": "1OVhmzLD5NHmrHknSSWwAYC_NVlD39-sh"
-        }
+        # Drive or local filesystem, selected by config["STORAGE"]
+        self.storage = storage or create_storage(self.config)
         self._create_directories()
+        self.report_index = ReportIndex(os.path.join(self.paths["STATE"], "qc_bot.db"))
+        self.manifest = VideoManifest(os.path.join(self.paths["STATE"], "qc_bot.db"))
+        # LLM tokens/cost per call, priced and budgeted by config["USAGE"]
+        self.usage = UsageLedger(os.path.join(self.paths["STATE"], "qc_bot.db"))
+        self.usage_settings = usage_settings(self.config)
+        self._transcript_generator = None
+        self._report_generator = None
+        # Shared by every MainFlow in the process: bounds concurrent Whisper runs across jobs and users
+        self.scheduler = resources.get_transcription_scheduler(self.config)
+        # Per-job working directories and the disk quota they share
+        self.scratch = resources.get_scratch_manager(self.config)
+        # Background uploads (audio overlaps transcription; report files go up together)
+        upload_settings = self.config.get("STORAGE", {}).get("UPLOAD", {})
+        self.uploader = Uploader(self.storage, max_workers=upload_settings.get("WORKERS", 4),
+                                 max_pending=upload_settings.get("MAX_PENDING", 16))
         
     def _create_directories(self):
         for path in self.paths.values():
             os.makedirs(path, exist_ok=True)
 
+    def _get_transcript_generator(self):
+        if self._transcript_generator is None:
+            settings = self.config.get("TRANSCRIPTION", {})
+            self._transcript_generator = resources.get_transcript_generator(
+                settings.get("MODEL", "base.en"),
+                settings.get("COMPUTE_TYPE", "int8"),
+                beam_size=settings.get("BEAM_SIZE", 5),
+                refine=settings.get("REFINE"),
+                window_seconds=settings.get("WINDOW_SECONDS", 600)
+            )
+        return self._transcript_generator
+
+    def _get_report_generator(self) -> ReportGenerator:
+        if self._report_generator is None:
+            with open(self.checklist_path, "r") as f:
+                checklist = f.read()
+            openai_client = resources.get_openai_client(self.config_path)
+            self._report_generator = ReportGenerator(
+                openai_client.get_client(),
+                openai_client.get_deployment(),
+                checklist,
+                self.report_index,
+                storage=self.storage,
+                uploader=self.uploader,
+                transcript_settings=self.config.get("REPORT", {}).get("TRANSCRIPT"),
+                ledger=self.usage,
+                usage=self.usage_settings,
+                stream=self.config.get("REPORT", {}).get("STREAM", False),
+                max_material_chars=self.config.get("REPORT", {}).get("MAX_MATERIAL_CHARS")
+            )
+        return self._report_generator
+
+    def _downloader(self) -> GoogleDriveDownloader:
+        return GoogleDriveDownloader(self.paths["VIDEOS"], self.storage, self.config.get("CRAWL"))
+
     async def process_drive_url(self, folder_url: str):
-        logger.info("Processing Google Drive folder: %s", folder_url)
-        VideoProcessor.clean_directory(self.paths["VIDEOS"])
-        VideoProcessor.clean_directory(self.paths["AUDIOS"])
-        download_manager = GoogleDriveDownloader(self.paths["VIDEOS"], self.drive_folders)
-        gdrive = download_manager.gdrive
+        logger.info("Processing videos folder: %s", folder_url)
+        download_manager = self._downloader()
 
-        # Get all video files in Drive
-        video_files = download_manager.list_all_videos(folder_url)
+        video_files = self._videos_to_process(download_manager, folder_url)
         if not video_files:
             logger.warning("No videos to process in folder: %s", folder_url)
             return
+        self._adopt_existing_transcripts(video_files)
+
+        for video in video_files:
+            if stage_reached(self.manifest.get(video['id']), "UPLOADED"):
+                logger.info(f"Transcript for {video['name']} already exists. Skipping video.")
+                continue
+            self.transcribe_video(download_manager, video)
+
+    def _videos_to_process(self, download_manager: GoogleDriveDownloader, folder_url: str) -> list:
+        """Videos listed in the folder plus unfinished ones from earlier runs.
+
+        A video is deleted from storage once its audio is extracted, so an interrupted
+        run's videos would otherwise never be listed (and resumed) again.
+        """
+        folder_id = self.storage.resolve_folder(folder_url)
+        video_files = download_manager.list_all_videos(folder_url)
+        listed_ids = {video['id'] for video in video_files}
+        for record in self.manifest.unfinished(folder_id):
+            if record["video_id"] not in listed_ids:
+                logger.info(f"Resuming {record['name']} from stage {record['stage']}")
+                video_files.append({"id": record["video_id"], "name": record["name"]})
+        for video in video_files:
+            self.manifest.discover(video, folder_id)
+        return video_files
 
-        # Get all transcript files in Drive Transcripts folder
-        transcript_drive_files = gdrive.list_txt_files(self.drive_folders["TRANSCRIPTS"])
-        transcript_names = {os.path.splitext(f['name'])[0] for f in transcript_drive_files}
+    def _adopt_existing_transcripts(self, video_files: list):
+        """Mark newly discovered videos whose transcript already exists as UPLOADED.
 
+        The manifest is consulted first; storage is only listed if some video is still unknown.
+        """
+        unknown = []
         for video in video_files:
-            base_name = os.path.splitext(video['name'])[0]
-            if base_name in transcript_names:
-                logger.info(f"Transcript for {base_name} already exists in Drive. Skipping video.")
+            record = self.manifest.get(video['id'])
+            if record["stage"] != "DISCOVERED":
                 continue
+            known = self.manifest.find_by_base_name(record["base_name"])
+            if stage_reached(known, "UPLOADED"):
+                self.manifest.advance(
+                    video['id'], "UPLOADED",
+                    transcript_path=known["transcript_path"],
+                    transcript_md5=known["transcript_md5"],
+                    transcript_drive_id=known["transcript_drive_id"]
+                )
+            else:
+                unknown.append(record)
+        if not unknown:
+            return
 
-            # Download and process this video
-            local_video_path = os.path.join(self.paths["VIDEOS"], video['name'])
-            gdrive.download_file(video['id'], local_video_path)
-            logger.info(f"Downloaded: {video['name']}")
-            video_id = video['id']
-            video_name = video['name']
-            video_path = local_video_path
-            audio_path = os.path.join(self.paths["AUDIOS"], f"{base_name}.wav")
-            transcript_path = os.path.join(self.paths["TRANSCRIPTS"], f"{base_name}.txt")
-
-            video_processor = VideoProcessor()
-            # transcript_generator = TranscriptGenerator(
-            #     os.getenv("AZURE_SPEECH_KEY"),
-            #     os.getenv("AZURE_SPEECH_REGION")
-            # )
-            from src.preprocessing.transcript_generator import TranscriptGenerator
-            transcript_generator = TranscriptGenerator(model_size="base.en", compute_type="int8")
-            try:
-                # Convert video to audio
-                if video_processor.convert_mp4_to_wav(video_path, audio_path):
-                    logger.info("Converted video to audio: %s", audio_path)
-                    # Upload audio to Drive
-                    download_manager.upload_to_drive(audio_path, "AUDIOS", "audio/wav")
-                    # Delete video from Drive and local
-                    try:
-                        download_manager.delete_drive_file(video_id)
-                    except googleapiclient.errors.HttpError as e:
-                        if e.resp.status == 403:
-                            logger.warning(f"Skipping delete for {video_name} due to insufficient permissions.")
-                        else:
-                            logger.error(f"Error deleting video from Drive: {e}")
-                    try:
-                        os.remove(video_path)
-                    except Exception as e:
-                        logger.warning(f"Could not delete local video file: {e}")
+        transcript_drive_files = {
+            os.path.splitext(f['name'])[0]: f
+            for f in self.storage.list(self.storage.folder("TRANSCRIPTS"), "text/plain")
+        }
+        for record in unknown:
+            drive_file = transcript_drive_files.get(record["base_name"])
+            if drive_file:
+                self.manifest.advance(
+                    record["video_id"], "UPLOADED",
+                    transcript_path=os.path.join(self.paths["TRANSCRIPTS"], f"{record['base_name']}.txt"),
+                    transcript_drive_id=drive_file["id"]
+                )
+
+    def _preflight(self, video_files: list, persist: bool = True) -> dict:
+        """Probe new videos without downloading them and cost the remaining work.
+
+        Videos already part-way through the pipeline are costed from their manifest
+        record. Report tokens and cost are projected from the usage ledger's history
+        (configured defaults until there is enough). With persist, probed durations
+        and rejections are written to the manifest.
+        """
+        preflight = Preflight(self.storage, self.config)
+        rates = preflight.rates()
+        token_model = self.usage.token_model()
+        records = {video['id']: self.manifest.get(video['id']) for video in video_files}
+        fresh = [v for v in video_files if records[v['id']] is None or records[v['id']]["stage"] == "DISCOVERED"]
+        inspected = {entry["id"]: entry for entry in preflight.inspect_all(fresh)}
+
+        entries = []
+        for video in video_files:
+            record = records[video['id']]
+            entry = inspected.get(video['id'])
+            if entry is None:
+                entry = {
+                    "id": video['id'],
+                    "name": video['name'],
+                    "base_name": record["base_name"],
+                    "size": int(video.get("size") or 0),
+                    "duration": record["duration"],
+                    "has_audio": True,
+                    "status": "resume",
+                    "reason": None
+                }
+            if entry["status"] == "rejected":
+                entry["estimate"] = {}
+                if persist:
+                    self.manifest.record_error(video['id'], f"Rejected by preflight: {entry['reason']}")
+            else:
+                entry["estimate"] = preflight.estimate(
+                    entry, rates,
+                    skip_download=stage_reached(record, "AUDIO_EXTRACTED"),
+                    skip_transcription=stage_reached(record, "UPLOADED"),
+                    skip_report=stage_reached(record, "REPORTED")
+                )
+                if stage_reached(record, "REPORTED"):
+                    entry["tokens"] = {"prompt": 0, "completion": 0}
+                else:
+                    entry["tokens"] = project_tokens(self.usage_settings, entry["duration"], token_model)
+                entry["cost"] = round(price(self.usage_settings, entry["tokens"]["prompt"],
+                                            entry["tokens"]["completion"]), 4)
+                if persist and entry["duration"] is not None and record and record["duration"] is None:
+                    self.manifest.set_duration(video['id'], entry["duration"])
+            entries.append(entry)
+
+        scheduler = self.config.get("SCHEDULER", {})
+        plan = Preflight.summarize(
+            entries,
+            concurrency=scheduler.get("VIDEO_CONCURRENCY", 1),
+            transcription_slots=scheduler.get("TRANSCRIPTION_SLOTS", 1)
+        )
+        plan["currency"] = self.usage_settings["CURRENCY"]
+        return plan
+
+    def plan_folder(self, folder_url: str) -> dict:
+        """Preflight plan for a folder (durations, rejections, ETA) without downloading or queueing anything."""
+        download_manager = self._downloader()
+        return self._preflight(download_manager.list_all_videos(folder_url), persist=False)
+
+    def _delete_stored(self, download_manager: GoogleDriveDownloader, file_id: str, label: str):
+        try:
+            download_manager.delete_drive_file(file_id)
+        except StoragePermissionError:
+            logger.warning(f"Skipping delete for {label} due to insufficient permissions.")
+        except StorageError as e:
+            logger.error(f"Error deleting {label} from storage: {e}")
+
+    def _ensure_audio(self, download_manager: GoogleDriveDownloader, record: dict, progress, scratch, reservation=None):
+        """Make the record's audio available locally, doing only the stages that are missing.
+
+        Files go to the job's scratch directory; the video's share of the reservation
+        is released as soon as the video is deleted. Returns (record, audio upload
+        future or None): a freshly extracted WAV is uploaded in the background, and
+        the caller hands the future to _finish_audio_upload once transcription is done.
+        """
+        video_id = record["video_id"]
+        video_name = record["name"]
+        # Named after the base name: same-named files from different subfolders can be in flight together
+        video_path = os.path.join(scratch.dir("videos"), record["base_name"] + os.path.splitext(video_name)[1])
+        audio_path = os.path.join(scratch.dir("audios"), f"{record['base_name']}.wav")
+
+        if stage_reached(record, "AUDIO_EXTRACTED"):
+            if artifact_ok(record["audio_path"], record["audio_md5"]):
+                return record, None
+            if record["audio_drive_id"]:
+                progress("Restoring audio from storage...")
+                download_manager.download(record["audio_drive_id"], audio_path)
+                if file_checksum(audio_path) == record["audio_md5"]:
+                    return self.manifest.advance(video_id, "AUDIO_EXTRACTED", audio_path=audio_path), None
+            logger.warning(f"Audio for {video_name} is missing; extracting it again")
+
+        if not (stage_reached(record, "DOWNLOADED") and artifact_ok(record["video_path"], record["video_md5"])):
+            progress("Downloading video...")
+            download_manager.download(video_id, video_path)
+            video_md5 = file_checksum(video_path)
+            if record["source_md5"] and video_md5 != record["source_md5"]:
+                raise ValueError(f"Checksum mismatch for downloaded {video_name}")
+            logger.info(f"Downloaded: {video_name}")
+            record = self.manifest.advance(
+                video_id, "DOWNLOADED",
+                video_path=video_path,
+                video_md5=video_md5,
+                duration=VideoProcessor.probe_duration(video_path)
+            )
+
+        # Convert video to audio
+        progress("Converting to audio...")
+        if not VideoProcessor.convert_mp4_to_wav(video_path, audio_path):
+            logger.error(f"Failed to convert video: {video_name}")
+            self.manifest.record_error(video_id, "Failed to convert video")
+            return None, None
+        logger.info("Converted video to audio: %s", audio_path)
+
+        # Upload the audio while it is being transcribed; the local video can go now,
+        # the stored one only once the audio upload has finished
+        audio_upload = self.uploader.submit(audio_path, self.storage.folder("AUDIOS"), "audio/wav")
+        record = self.manifest.advance(
+            video_id, "AUDIO_EXTRACTED",
+            audio_path=audio_path,
+            audio_md5=file_checksum(audio_path),
+            audio_drive_id=None
+        )
+        try:
+            video_bytes = os.path.getsize(video_path)
+            os.remove(video_path)
+            if reservation is not None:
+                reservation.release(video_bytes)
+        except Exception as e:
+            logger.warning(f"Could not delete local video file: {e}")
+        return record, audio_upload
+
+    def _finish_audio_upload(self, download_manager: GoogleDriveDownloader, record: dict, audio_upload) -> dict:
+        """Wait for the background audio upload, record its id, then drop the video from storage."""
+        if audio_upload is None:
+            return record
+        audio_drive_id = audio_upload.result()
+        record = self.manifest.set_artifacts(record["video_id"], audio_drive_id=audio_drive_id)
+        self._delete_stored(download_manager, record["video_id"], record["name"])
+        return record
+
+    @staticmethod
+    def _scratch_needed(record: dict, video: dict) -> int:
+        """Expected local footprint of a video that still needs transcribing: source plus 16 kHz mono WAV."""
+        size = int(video.get("size") or 0)
+        duration = record["duration"]
+        audio_bytes = duration * 16000 * 2 if duration else size
+        video_bytes = 0 if stage_reached(record, "AUDIO_EXTRACTED") else size
+        return int(video_bytes + audio_bytes)
+
+    def _ensure_transcript(self, download_manager: GoogleDriveDownloader, record: dict):
+        """Local transcript path for an UPLOADED video, fetching it from storage if needed."""
+        transcript_path = record["transcript_path"] or os.path.join(
+            self.paths["TRANSCRIPTS"], f"{record['base_name']}.txt"
+        )
+        if artifact_ok(transcript_path, record["transcript_md5"]):
+            return transcript_path
+        if not record["transcript_drive_id"]:
+            return None
+        download_manager.download(record["transcript_drive_id"], transcript_path)
+        return transcript_path
+
+    def transcribe_video(self, download_manager: GoogleDriveDownloader, video: dict, progress=None, user: str = "",
+                         scratch=None):
+        """Bring one video up to UPLOADED, resuming from its last completed stage.
 
-                    # Generate transcript
-                    if transcript_generator.transcribe_audio(audio_path, transcript_path):
+        Local files live in the job's scratch directory and count against the scratch
+        quota until deleted. Transcription waits for a slot from the process-wide
+        scheduler, which shares slots fairly between users and serves shorter
+        recordings first. Returns the local transcript path or None.
+        """
+        progress = progress or (lambda message: None)
+        scratch = scratch or self.scratch.job("shared")
+        record = self.manifest.get(video['id']) or self.manifest.discover(video)
+        video_id = record["video_id"]
+        video_name = record["name"]
+        base_name = record["base_name"]
+        transcript_path = os.path.join(self.paths["TRANSCRIPTS"], f"{base_name}.txt")
+
+        try:
+            if not stage_reached(record, "UPLOADED"):
+                with scratch.reserve(
+                    self._scratch_needed(record, video), label=video_name,
+                    on_wait=lambda: progress("Waiting for disk space...")
+                ) as reservation:
+                    if not (stage_reached(record, "TRANSCRIBED")
+                            and artifact_ok(record["transcript_path"], record["transcript_md5"])):
+                        record, audio_upload = self._ensure_audio(download_manager, record, progress, scratch, reservation)
+                        if record is None:
+                            return None
+
+                        duration = record["duration"]
+                        if duration is None:
+                            duration = VideoProcessor.probe_duration(record["audio_path"])
+                            if duration is not None:
+                                self.manifest.set_duration(video_id, duration)
+
+                        # Generate transcript once the scheduler hands out a slot
+                        progress("Waiting for a transcription slot...")
+                        try:
+                            with self.scheduler.slot(user, duration, on_wait=lambda: progress("Waiting for a transcription slot...")):
+                                progress("Generating transcript...")
+                                transcribed = self._get_transcript_generator().transcribe_audio(record["audio_path"], transcript_path)
+                        except JobCancelled:
+                            # Leave the upload to finish on its own; the next attempt resumes from the manifest
+                            raise
+                        except Exception:
+                            self._finish_audio_upload(download_manager, record, audio_upload)
+                            raise
+                        record = self._finish_audio_upload(download_manager, record, audio_upload)
+                        if not transcribed:
+                            logger.error(f"Failed to generate transcript for {video_name}")
+                            self.manifest.record_error(video_id, "Failed to generate transcript")
+                            return None
                         logger.info(f"Generated transcript: {transcript_path}")
-                        # Upload transcript to Drive
-                        download_manager.upload_to_drive(transcript_path, "TRANSCRIPTS", "text/plain")
-                        # Delete audio from Drive and local
-                        audio_drive_id = gdrive.find_file_by_name(self.drive_folders["AUDIOS"], f"{base_name}.wav")
-                        if audio_drive_id:
-                            try:
-                                download_manager.delete_drive_file(audio_drive_id)
-                            except googleapiclient.errors.HttpError as e:
-                                if e.resp.status == 403:
-                                    logger.warning(f"Skipping delete for audio {base_name}.wav due to insufficient permissions.")
-                                else:
-                                    logger.error(f"Error deleting audio from Drive: {e}")
+                        record = self.manifest.advance(
+                            video_id, "TRANSCRIBED",
+                            transcript_path=transcript_path,
+                            transcript_md5=file_checksum(transcript_path)
+                        )
+
+                    # Upload transcript to storage, then drop the audio from storage and local disk
+                    progress("Uploading transcript...")
+                    transcript_drive_id = download_manager.upload_to_drive(transcript_path, "TRANSCRIPTS", "text/plain")
+                    record = self.manifest.advance(video_id, "UPLOADED", transcript_drive_id=transcript_drive_id)
+                    if record["audio_drive_id"]:
+                        self._delete_stored(download_manager, record["audio_drive_id"], f"audio {base_name}.wav")
+                    if record["audio_path"] and os.path.exists(record["audio_path"]):
                         try:
-                            os.remove(audio_path)
+                            os.remove(record["audio_path"])
                         except Exception as e:
                             logger.warning(f"Could not delete local audio file: {e}")
+            return self._ensure_transcript(download_manager, record)
+        except StoragePermissionError as e:
+            logger.warning(f"Skipping file {video_name} due to insufficient permissions.")
+            self.manifest.record_error(video_id, str(e))
+        except StorageError as e:
+            logger.error(f"Storage error: {e}")
+            self.manifest.record_error(video_id, str(e))
+        except Exception as e:
+            logger.error(f"Unexpected error processing {video_name}: {e}")
+            self.manifest.record_error(video_id, str(e))
+        return None
+
+    def generate_report(self, base_name: str, mentor_dir: str = None, material_name: str = None):
+        """Generate (and upload) the report for one transcript; returns the local report path or None.
+
+        material_name is the video's own file stem, used to find its mentor material when
+        base_name carries a subfolder prefix. Raises ReportError if the quality check failed.
+        """
+        failures = self._get_report_generator().generate_reports(
+            self.paths["TRANSCRIPTS"],
+            mentor_dir or self.paths["MENTOR_MATERIALS"],
+            self.paths["REPORTS"],
+            self.storage.folder("REPORTS"),
+            only_base_names=[base_name],
+            material_names={base_name: material_name} if material_name else None
+        )
+        if base_name in failures:
+            raise ReportError(failures[base_name])
+        report_path = os.path.join(self.paths["REPORTS"], f"report_{base_name}.txt")
+        return report_path if os.path.exists(report_path) else None
+
+    def run_job(self, folder_url: str, mentor_files: dict = None, progress_cb=None, result_cb=None,
+                user: str = "", plan_cb=None, job_id: str = None, token_budget: int = None,
+                attempt: int = None) -> list:
+        """Run the whole pipeline for a videos folder: mentor materials, transcripts, then a report per video.
+
+        Up to SCHEDULER.VIDEO_CONCURRENCY videos are in flight at once (smallest first), so
+        downloads, ffmpeg and report calls overlap while transcription is bounded by the
+        shared scheduler. progress_cb(fraction, message) is called as work advances,
+        plan_cb(plan) once with the preflight plan (ETA, rejected files) and result_cb(result)
+        once per video, so callers (worker, CLI) can persist progress.
+
+        Working files live in a scratch directory named after job_id and attempt, kept if
+        the job fails (a retry of the same job resumes from its files) and removed once
+        it finishes.
+        JobCancelled (from progress_cb or check_cancelled) stops every video thread
+        and leaves the directory and the manifest as they were.
+
+        With a token budget (argument or USAGE.RUN_TOKEN_BUDGET), videos are taken in
+        order of projected report tokens and a report is only requested while its
+        projection fits in what is left; the rest finish as "over_budget" with their
+        transcripts kept, so a later run can report them.
+        """
+        progress = progress_cb or (lambda fraction, message: None)
+        scratch = self.scratch.job(job_id or uuid.uuid4().hex, attempt)
+        token_budget = token_budget or self.usage_settings["RUN_TOKEN_BUDGET"]
+        budget = TokenBudget(token_budget) if token_budget else None
+
+        progress(0.0, "Step 1/2: Processing mentor materials...")
+        mentor_dir = scratch.dir("mentor_materials")
+        self.process_mentor_materials(mentor_files or {}, output_dir=mentor_dir)
+
+        progress(0.25, "Step 2/2: Downloading and processing videos...")
+        download_manager = self._downloader()
+        video_files = self._videos_to_process(download_manager, folder_url)
+        total_videos = len(video_files)
+        if not video_files:
+            logger.warning("No videos to process in folder: %s", folder_url)
+        self._adopt_existing_transcripts(video_files)
+
+        progress(0.25, "Step 2/2: Checking videos...")
+        plan = self._preflight(video_files)
+        if plan_cb:
+            plan_cb(plan)
+        logger.info(
+            f"Preflight: {plan['accepted']}/{plan['videos']} video(s), "
+            f"{plan['audio_seconds'] / 60:.0f} min of audio, ETA {format_eta(plan['eta_seconds'])}, "
+            f"~{plan['tokens']} report tokens (~{plan['cost']:.2f} {plan['currency']})"
+        )
+        if budget is not None and plan["tokens"] > budget.limit:
+            logger.warning(f"Projected {plan['tokens']} tokens exceed the run budget of {budget.limit}; "
+                           f"some reports will be skipped")
+
+        results = []
+        for entry in plan["entries"]:
+            if entry["status"] == "rejected":
+                result = {
+                    "video": entry["name"],
+                    "base_name": entry["base_name"],
+                    "status": "rejected",
+                    "error": entry["reason"],
+                    "report_path": None,
+                    "elapsed": 0.0,
+                    "stages": {}
+                }
+                results.append(result)
+                if result_cb:
+                    result_cb(result)
+
+        # Cheapest remaining work first keeps average turnaround low; under a token
+        # budget, fewest tokens first gets the most reports out of it
+        accepted = [entry for entry in plan["entries"] if entry["status"] != "rejected"]
+        tokens = {entry["id"]: sum(entry["tokens"].values()) for entry in accepted}
+        if budget is not None:
+            costs = tokens
+        else:
+            costs = {entry["id"]: sum(entry["estimate"].values()) for entry in accepted}
+        video_files = sorted((v for v in video_files if v['id'] in costs), key=lambda v: costs[v['id']])
+        concurrency = max(1, int(self.config.get("SCHEDULER", {}).get("VIDEO_CONCURRENCY", 1)))
+        done = [len(results)]
+
+        def video_progress(message):
+            progress(0.25 + 0.75 * done[0] / total_videos, message)
+
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="video")
+        try:
+            # Each task runs in a copy of this context so stage metrics stay per video
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self._process_video,
+                    download_manager, video, f"Video {idx}/{total_videos} ({video['name']})", video_progress,
+                    user, scratch, mentor_dir, budget, tokens[video['id']]
+                )
+                for idx, video in enumerate(video_files, 1)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                done[0] += 1
+                results.append(result)
+                if result_cb:
+                    result_cb(result)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        gdrive = getattr(self.storage, "gdrive", None)
+        if gdrive is not None:
+            gdrive.pool.log_stats()
+        # A job cancelled at the last moment keeps its scratch directory, like a failed one
+        progress(1.0, f"Processed {total_videos} video(s)")
+        scratch.cleanup()
+        return results
+
+    def _process_video(self, download_manager: GoogleDriveDownloader, video: dict, prefix: str,
+                       progress, user: str = "", scratch=None, mentor_dir: str = None, budget: TokenBudget = None,
+                       projected_tokens: int = 0) -> dict:
+        """Transcribe and report one video; returns its result row for the run summary."""
+        record = self.manifest.get(video['id'])
+        base_name = record["base_name"]
+        video_start = time.time()
+        status = None
+        labels = {
+            "run_id": scratch.job_id if scratch else None,
+            "folder_id": record["folder_id"],
+            "video_id": video['id'],
+            "base_name": base_name
+        }
+
+        with log_context(video_id=video['id'], base_name=base_name), collect_stages() as stages:
+            if stage_reached(record, "REPORTED") and record["report_path"] and os.path.exists(record["report_path"]):
+                progress(f"{prefix}: already reported")
+                report_path = record["report_path"]
+            else:
+                if stage_reached(record, "UPLOADED"):
+                    progress(f"{prefix}: transcript already exists. Generating report...")
+                transcript_path = self.transcribe_video(
+                    download_manager, video,
+                    progress=lambda message: progress(f"{prefix}: {message}"),
+                    user=user,
+                    scratch=scratch
+                )
+                report_path = None
+                if transcript_path and budget is not None and not budget.try_reserve(projected_tokens):
+                    logger.warning(f"Skipping report for {video['name']}: ~{projected_tokens} tokens "
+                                   f"exceed the {budget.remaining} left in the run budget")
+                    status = "over_budget"
+                elif transcript_path:
+                    progress(f"{prefix}: Generating report...")
+                    used_before = stages.get("prompt_tokens", 0) + stages.get("completion_tokens", 0)
+                    duration = self.manifest.get(video['id'])["duration"]
+                    report_error = "no report was written"
+                    try:
+                        with usage_labels(audio_seconds=duration, **labels):
+                            report_path = self.generate_report(base_name, mentor_dir,
+                                                               os.path.splitext(video['name'])[0])
+                    except ReportError as e:
+                        report_error = str(e)
+                    finally:
+                        if budget is not None:
+                            used = stages.get("prompt_tokens", 0) + stages.get("completion_tokens", 0) - used_before
+                            budget.settle(projected_tokens, int(used))
+                    if report_path:
+                        self.manifest.advance(video['id'], "REPORTED", report_path=report_path)
                     else:
-                        logger.error(f"Failed to generate transcript for {video_name}")
-                else:
-                    logger.error(f"Failed to convert video: {video_name}")
-            except googleapiclient.errors.HttpError as e:
-                if e.resp.status == 403:
-                    logger.warning(f"Skipping file {video_name} due to insufficient permissions.")
-                else:
-                    logger.error(f"Google API error: {e}")
-            except Exception as e:
-                logger.error(f"Unexpected error processing {video_name}: {e}")
+                        # The stage stays at UPLOADED, so the next run retries the report
+                        self.manifest.record_error(video['id'], f"Report failed: {report_error}")
 
-    def process_mentor_materials(self, files: dict):
-        """Process mentor materials (PPTX/IPYNB)"""
+        result = {
+            "video": video['name'],
+            "base_name": base_name,
+            "status": status or ("reported" if report_path else "failed"),
+            "report_path": report_path,
+            "elapsed": time.time() - video_start,
+            "stages": stages
+        }
+        with log_context(video_id=video['id'], base_name=base_name):
+            logger.info(
+                f"Finished {video['name']}: {result['status']}",
+                extra={"elapsed": round(result["elapsed"], 2), "stages": stages}
+            )
+        return result
+
+    def process_mentor_materials(self, files: dict, output_dir: str = None):
+        """Process mentor materials (PPTX/IPYNB) into output_dir; identical uploads reuse the cached parse"""
         logger.info("Processing mentor materials...")
+        from src.preprocessing.file_processor import FileProcessor, PARSER_VERSION
+        cache = MaterialCache(
+            os.path.join(self.paths["STATE"], "material_cache"),
+            self.storage,
+            self.storage.folder("MENTOR_MATERIALS"),
+            parser_version=PARSER_VERSION
+        )
+        # A job passes its own directory, so concurrent jobs never see each other's materials
+        output_dir = output_dir or self.paths["MENTOR_MATERIALS"]
+        os.makedirs(output_dir, exist_ok=True)
         processed_files = []
         
-        # Clean directory first
-        VideoProcessor.clean_directory(self.paths["MENTOR_MATERIALS"])
-        
         for file_type, file_data in files.items():
             if not file_data:
                 continue
                 
-            # Save uploaded file
-            file_path = os.path.join(self.paths["MENTOR_MATERIALS"], file_data.name)
-            with open(file_path, "wb") as f:
-                f.write(file_data.getbuffer())
+            # A path saved by the job submitter is read in place; a Streamlit upload is saved first
+            if isinstance(file_data, str):
+                file_name = os.path.basename(file_data)
+                file_path = file_data
+            else:
+                file_name = file_data.name
+                file_path = os.path.join(output_dir, file_name)
+                with open(file_path, "wb") as f:
+                    f.write(file_data.getbuffer())
             
             # Process based on file type
-            base_name = os.path.splitext(file_data.name)[0]
-            output_path = os.path.join(self.paths["MENTOR_MATERIALS"], f"{base_name}.txt")
+            base_name = os.path.splitext(file_name)[0]
+            output_path = os.path.join(output_dir, f"{base_name}.txt")
             
             if file_type == "slides" and file_path.lower().endswith(('.pptx', '.ppt')):
-                content = FileProcessor.process_slide_file(file_path)
+                parse = FileProcessor.process_slide_file
             elif file_type == "notebook" and file_path.lower().endswith('.ipynb'):
-                content = FileProcessor.process_notebook_file(file_path)
+                parse = FileProcessor.process_notebook_file
             else:
-                logger.error(f"Unsupported file type: {file_data.name}")
+                logger.error(f"Unsupported file type: {file_name}")
                 continue
+            content, key, remote = cache.load(file_path, parse)
                 
             # Save processed content
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(content)
             
-            # Remove original file
-            os.remove(file_path)
+            # Remove the saved upload
+            if not isinstance(file_data, str):
+                os.remove(file_path)
             
-            # Upload to Drive (overwrite if exists)
-            gdrive = GoogleDriveManager()
-            mentor_folder_id = self.drive_folders["MENTOR_MATERIALS"]
-            # Check and delete duplicate in Drive
-            drive_file_id = gdrive.find_file_by_name(mentor_folder_id, os.path.basename(output_path))
-            if drive_file_id:
-                gdrive.delete_file(drive_file_id)
-                logger.info(f"Deleted duplicate mentor material in Drive: {os.path.basename(output_path)}")
-            gdrive.upload_file(output_path, mentor_folder_id, "application/octet-stream")
+            # Upload to storage, tagged with the content key (skipped if already there)
+            if content:
+                cache.publish(output_path, key, remote)
             
             processed_files.append(output_path)
         
@@ -182,40 +676,27 @@ class MainFlow:
         # Remove duplicates first
         self.remove_drive_duplicates()
 
-        # List transcript files from Drive
-        gdrive = GoogleDriveManager()
-        transcript_drive_files = gdrive.list_txt_files(self.drive_folders["TRANSCRIPTS"])
+        # List transcript files in storage
+        transcript_files = self.storage.list(self.storage.folder("TRANSCRIPTS"), "text/plain")
 
-        # Download transcripts from Drive to local if not present
-        for file in transcript_drive_files:
+        # Download transcripts to local if not present
+        for file in transcript_files:
             local_path = os.path.join(self.paths["TRANSCRIPTS"], file["name"])
             if not os.path.exists(local_path):
-                gdrive.download_file(file["id"], local_path)
-
-        # Now generate reports from these local files (which mirror Drive)
-        # Load checklist
-        with open("config/checklist.txt", "r") as f:
-            checklist = f.read()
-
-        # Initialize OpenAI client
-        openai_client = OpenAIClient("config/config.json")
-        client = openai_client.get_client()
-        deployment = openai_client.get_deployment()
+                self.storage.download(file["id"], local_path)
 
-        report_generator = ReportGenerator(client, deployment, checklist)
-        report_generator.generate_reports(
+        # Now generate reports from these local files (which mirror storage)
+        # Reports (text + structured JSON) are uploaded to storage as they are generated
+        failures = self._get_report_generator().generate_reports(
             self.paths["TRANSCRIPTS"],
             self.paths["MENTOR_MATERIALS"],
-            self.paths["REPORTS"]
+            self.paths["REPORTS"],
+            self.storage.folder("REPORTS")
         )
-        # Upload reports to Drive
-        gdrive = GoogleDriveManager()
-        for report_file in os.listdir(self.paths["REPORTS"]):
-            if report_file.endswith(".txt"):
-                local_path = os.path.join(self.paths["REPORTS"], report_file)
-                gdrive.upload_file(local_path, self.drive_folders["REPORTS"], "text/plain")
+        if failures:
+            logger.warning(f"{len(failures)} report(s) failed and will be retried on the next run: "
+                           f"{', '.join(sorted(failures))}")
 
     def remove_drive_duplicates(self):
-        gdrive = GoogleDriveManager()
         for key in ["REPORTS", "TRANSCRIPTS", "MENTOR_MATERIALS"]:
-            gdrive.remove_duplicates_by_name(self.drive_folders[key])
\ No newline at end of file
+            self.storage.remove_duplicates_by_name(self.storage.folder(key))
\ No newline at end of file
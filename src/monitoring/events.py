@@ -0,0 +1,64 @@
+# src/monitoring/events.py
+import time
+import threading
+from typing import Dict
+from src import resources
+from src.monitoring.logging_setup import current_context
+
+class ProgressBus:
+    """In-process board of the latest fine-grained progress per job and video.
+
+    Pipeline threads publish (download bytes, audio transcribed, LLM tokens
+    streamed) without blocking: publishing only overwrites the latest event of
+    its kind under a lock. The UI polls snapshot() on its own schedule, so a
+    slow page never holds up a worker. Only workers running in the same process
+    (the app's embedded workers) are visible; other processes' jobs still report
+    coarse progress through the job queue.
+    """
+
+    # Streamed report text kept per video (the tail is what the UI shows)
+    MAX_TEXT = 16 * 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Dict]] = {}
+
+    def publish(self, kind: str, job_id: str = None, video: str = None, **data):
+        """Record the latest `kind` event; job/video default to the current log context."""
+        context = current_context()
+        job_id = job_id or context.get("job_id")
+        if job_id is None:
+            return
+        video = video or context.get("base_name") or ""
+        with self._lock:
+            events = self._jobs.setdefault(job_id, {}).setdefault(video, {})
+            events[kind] = dict(data, ts=time.time())
+
+    def append_text(self, kind: str, text: str, **data):
+        """Append streamed text to the current video's `kind` event (e.g. partial LLM output)."""
+        context = current_context()
+        job_id = context.get("job_id")
+        if job_id is None:
+            return
+        video = context.get("base_name") or ""
+        with self._lock:
+            events = self._jobs.setdefault(job_id, {}).setdefault(video, {})
+            previous = events.get(kind, {}).get("text", "")
+            events[kind] = dict(data, text=(previous + text)[-self.MAX_TEXT:], ts=time.time())
+
+    def snapshot(self, job_id: str) -> Dict[str, Dict]:
+        """{video: {kind: event}} for one job (a copy; safe to render)."""
+        with self._lock:
+            return {video: {kind: dict(event) for kind, event in events.items()}
+                    for video, events in self._jobs.get(job_id, {}).items()}
+
+    def clear(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+def get_bus() -> ProgressBus:
+    """The process's ProgressBus (shared by embedded workers and the UI)."""
+    return resources.get_or_create("progress_bus", ProgressBus)
+
+def publish(kind: str, **data):
+    get_bus().publish(kind, **data)
@@ -0,0 +1,169 @@
+# src/monitoring/logging_setup.py
+import os
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+import logging.handlers
+from contextlib import contextmanager
+from src.monitoring.metrics import LOG_RECORDS_DROPPED
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "LEVEL": "INFO",
+    "FILE": "qc_bot.log",
+    "MAX_BYTES": 10 * 1024 * 1024,
+    "BACKUP_COUNT": 5,
+    "JSON": True,
+    "QUEUE_SIZE": 10000
+}
+
+# Job/video identifiers attached to every record logged in this context
+_log_context: contextvars.ContextVar = contextvars.ContextVar("qc_log_context", default={})
+
+@contextmanager
+def log_context(**fields):
+    """Tag records logged inside the block (and in contexts copied from it) with fields."""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+def current_context() -> dict:
+    """Fields set by the enclosing log_context blocks (job_id, video_id, base_name, ...)."""
+    return dict(_log_context.get())
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "context"}
+
+class _ContextFilter(logging.Filter):
+    """Copies the log context onto the record in the calling thread, before it is queued."""
+
+    def filter(self, record):
+        record.context = _log_context.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, context ids and any extra fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        entry.update(getattr(record, "context", None) or {})
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        # Queued records carry the traceback already formatted (see _DroppingQueueHandler.prepare)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped and counted
+    (qc_log_records_dropped_total, and a warning when logging shuts down)."""
+    _exc_formatter = logging.Formatter()
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        """Merge the message arguments and keep the traceback as text in exc_text.
+
+        The stock prepare() folds the traceback into the message and clears it, so
+        formatters on the listener could not report it as a field of its own.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+def _stop_listener(listener, queue_handler: _DroppingQueueHandler):
+    """Drain the queue, then report dropped records straight to the handlers (the queue may be why)."""
+    listener.stop()
+    if queue_handler.dropped:
+        record = logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                   f"Dropped {queue_handler.dropped} log record(s): the logging queue was full",
+                                   None, None)
+        for handler in listener.handlers:
+            handler.handle(record)
+
+_listener = None
+_configure_lock = threading.Lock()
+
+def configure_logging(config_path: str = None, settings: dict = None):
+    """Route all logging through a queue drained by a background listener thread.
+
+    Pipeline threads only enqueue records; formatting and file I/O happen on the
+    listener. The file is size-rotated and, with LOGGING.JSON, holds one JSON
+    record per line tagged with the current job/video ids. Safe to call on every
+    Streamlit rerun: only the first call configures anything.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        if settings is None and config_path and os.path.exists(config_path):
+            with open(config_path) as f:
+                settings = json.load(f).get("LOGGING")
+        settings = dict(DEFAULTS, **(settings or {}))
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            settings["FILE"], maxBytes=settings["MAX_BYTES"], backupCount=settings["BACKUP_COUNT"], encoding="utf-8"
+        )
+        plain = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        file_handler.setFormatter(JsonFormatter() if settings["JSON"] else plain)
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(plain)
+
+        queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=settings["QUEUE_SIZE"]))
+        queue_handler.addFilter(_ContextFilter())
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(settings["LEVEL"])
+
+        _listener = logging.handlers.QueueListener(
+            queue_handler.queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_stop_listener, _listener, queue_handler)
+
+class ProgressLog:
+    """Logs a long transfer's progress at most once per interval instead of on every chunk."""
+
+    def __init__(self, log: logging.Logger, label: str, interval: float = 10.0):
+        self.log = log
+        self.label = label
+        self.interval = interval
+        self._last = time.monotonic()
+
+    def update(self, fraction: float, done: bool = False):
+        now = time.monotonic()
+        if done or now - self._last >= self.interval:
+            self._last = now
+            self.log.info(f"{self.label} {int(fraction * 100)}%")
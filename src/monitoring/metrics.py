@@ -0,0 +1,238 @@
+# src/monitoring/metrics.py
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _Metric:
+    TYPE = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    @staticmethod
+    def _key(labels: dict) -> Tuple:
+        return tuple(sorted(labels.items()))
+
+    @staticmethod
+    def _format_labels(key: Tuple, extra: dict = None) -> str:
+        pairs = list(key) + sorted((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        with self._lock:
+            return [f"{self.name}{self._format_labels(k)} {v}" for k, v in self._values.items()]
+
+    def snapshot(self):
+        with self._lock:
+            return [{"labels": dict(k), "value": v} for k, v in self._values.items()]
+
+class Gauge(Counter):
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Summary(_Metric):
+    """Count/sum/max of observations, e.g. call latency or real-time factor."""
+    TYPE = "summary"
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            count, total, peak = self._values.get(key, (0, 0.0, 0.0))
+            self._values[key] = (count + 1, total + value, max(peak, value))
+
+    def mean(self, default: float = None, **labels) -> Optional[float]:
+        """Average observation so far for these labels (default if nothing was observed)."""
+        with self._lock:
+            count, total, _ = self._values.get(self._key(labels), (0, 0.0, 0.0))
+        return total / count if count else default
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for key, (count, total, _) in self._values.items():
+                lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+            # Summaries only allow _count/_sum/quantiles, so the max is its own gauge family
+            lines.append(f"# TYPE {self.name}_max gauge")
+            for key, (_, _, peak) in self._values.items():
+                lines.append(f"{self.name}_max{self._format_labels(key)} {peak}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {"labels": dict(k), "count": c, "sum": s, "max": m, "avg": s / c if c else 0.0}
+                for k, (c, s, m) in self._values.items()
+            ]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text)
+            return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def summary(self, name: str, help_text: str = "") -> Summary:
+        return self._get_or_create(Summary, name, help_text)
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {"timestamp": time.time(), "metrics": {m.name: m.snapshot() for m in metrics}}
+
+REGISTRY = MetricsRegistry()
+
+DRIVE_CALL_SECONDS = REGISTRY.summary("qc_drive_call_seconds", "Google Drive API call latency by method")
+DRIVE_BYTES = REGISTRY.counter("qc_drive_bytes_total", "Bytes transferred to/from Google Drive")
+DRIVE_THROUGHPUT = REGISTRY.summary("qc_drive_throughput_bytes_per_second", "Per-transfer Drive throughput")
+FFMPEG_SECONDS = REGISTRY.summary("qc_ffmpeg_seconds", "ffmpeg audio extraction wall time")
+AUDIO_SECONDS = REGISTRY.counter("qc_audio_seconds_total", "Seconds of audio extracted")
+WHISPER_LOAD_SECONDS = REGISTRY.summary("qc_whisper_model_load_seconds", "Whisper model load time")
+TRANSCRIBE_SECONDS = REGISTRY.summary("qc_transcribe_seconds", "Transcription wall time")
+TRANSCRIBE_RTF = REGISTRY.summary("qc_transcribe_real_time_factor", "Transcription wall time / audio duration")
+TRANSCRIBE_REFINED_FRACTION = REGISTRY.summary("qc_transcribe_refined_fraction", "Share of audio re-transcribed by the refine model")
+LLM_SECONDS = REGISTRY.summary("qc_llm_call_seconds", "Azure OpenAI call latency")
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.summary("qc_llm_first_token_seconds", "Time to the first streamed completion token")
+LLM_TOKENS = REGISTRY.counter("qc_llm_tokens_total", "Azure OpenAI tokens by kind (prompt/completion)")
+SCHEDULER_WAIT_SECONDS = REGISTRY.summary("qc_transcribe_slot_wait_seconds", "Time spent waiting for a transcription slot")
+TRANSCRIBE_SLOTS_BUSY = REGISTRY.gauge("qc_transcribe_slots_busy", "Transcription slots currently in use")
+TRANSCRIBE_WAITING = REGISTRY.gauge("qc_transcribe_waiting", "Videos waiting for a transcription slot")
+SCRATCH_RESERVED_BYTES = REGISTRY.gauge("qc_scratch_reserved_bytes", "Local scratch space reserved by in-flight videos")
+SCRATCH_WAIT_SECONDS = REGISTRY.summary("qc_scratch_wait_seconds", "Time spent waiting for scratch space")
+UPLOAD_RETRIES = REGISTRY.counter("qc_upload_retries_total", "Upload requests/chunks retried after a transient error")
+TRANSCRIPT_TOKENS_SAVED = REGISTRY.counter("qc_transcript_tokens_saved_total", "Estimated prompt tokens saved by compact transcript rendering")
+LOG_RECORDS_DROPPED = REGISTRY.counter("qc_log_records_dropped_total", "Log records dropped because the logging queue was full")
+UPLOAD_QUEUE_SECONDS = REGISTRY.summary("qc_upload_queue_seconds", "Time an upload waited for a free upload worker")
+
+# Per-video stage accounting for the run summary shown in the UI
+_current_stages: contextvars.ContextVar = contextvars.ContextVar("qc_current_stages", default=None)
+
+@contextmanager
+def collect_stages():
+    """Collect record_stage() calls made (in this context) while the block runs."""
+    stages: Dict[str, float] = {}
+    token = _current_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _current_stages.reset(token)
+
+def record_stage(stage: str, value: float):
+    stages = _current_stages.get()
+    if stages is not None:
+        stages[stage] = round(stages.get(stage, 0.0) + value, 3)
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+def start_exporters(config: Optional[dict]):
+    """Start the Prometheus endpoint and/or periodic JSON snapshot described by config["METRICS"].
+
+    The endpoint is only served when PORT is set, and listens on HOST (default
+    127.0.0.1); it has no authentication, so expose it beyond the host deliberately.
+    """
+    global _exporters_started
+    config = config or {}
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    port = config.get("PORT")
+    host = config.get("HOST") or "127.0.0.1"
+    if port:
+        # Imported here: http.server is comparatively slow to import and only needed when exporting
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] == "/metrics.json":
+                    body, content_type = json.dumps(REGISTRY.snapshot()).encode(), "application/json"
+                else:
+                    body, content_type = REGISTRY.render_prometheus().encode(), "text/plain; version=0.0.4"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"Metrics endpoint not started on port {port}: {e}")
+        else:
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info(f"Serving metrics on {host}:{port}/metrics")
+
+    snapshot_path = config.get("SNAPSHOT_PATH")
+    if snapshot_path:
+        interval = config.get("SNAPSHOT_INTERVAL", 60)
+
+        def write_snapshots():
+            while True:
+                time.sleep(interval)
+                tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(REGISTRY.snapshot(), f)
+                    os.replace(tmp_path, snapshot_path)
+                except OSError as e:
+                    logger.warning(f"Could not write metrics snapshot: {e}")
+
+        threading.Thread(target=write_snapshots, name="metrics-snapshot", daemon=True).start()
@@ -1,39 +1,30 @@
 # src/preprocessing/download_manager.py
 import os
 import logging
-from .gdrive_manager import GoogleDriveManager
-import json
-from google.oauth2 import service_account
+from src.storage.crawler import FolderCrawler
 
 logger = logging.getLogger(__name__)
 
 class GoogleDriveDownloader:
-    SCOPES = ['https://www.googleapis.com/auth/drive']  # <-- Add this line
+    """Moves pipeline artifacts between the local work dirs and the configured storage
+    backend (Google Drive by default; see src/storage)."""
 
-    def __init__(self, download_path: str, drive_folders: dict):
+    def __init__(self, download_path: str, storage, crawl_settings: dict = None):
         self.download_path = download_path
         os.makedirs(download_path, exist_ok=True)
-        self.gdrive = GoogleDriveManager()
-        self.drive_folders = drive_folders  # Dict with keys: VIDEOS, AUDIOS, TRANSCRIPTS, REPORTS, MENTOR_MATERIALS
-
-        gcp_credentials = os.getenv("GCP_CREDENTIALS")
-        if gcp_credentials:
-            cred_data = json.loads(gcp_credentials)
-            self.creds = service_account.Credentials.from_service_account_info(
-                cred_data, scopes=self.SCOPES
-            )
+        self.storage = storage
+        self.crawl_settings = crawl_settings or {}
 
     def process_one_video(self, videos_folder_url: str):
-        videos_folder_id = self.gdrive.get_folder_id(videos_folder_url)
-        video_files = self.gdrive.list_files(videos_folder_id, 'video/mp4')
+        video_files = self.list_all_videos(videos_folder_url)
         if not video_files:
-            logger.info("No videos found in Drive folder.")
+            logger.info("No videos found in folder.")
             return None
 
         # Process only the first video
         video = video_files[0]
         local_video_path = os.path.join(self.download_path, video['name'])
-        self.gdrive.download_file(video['id'], local_video_path)
+        self.storage.download(video['id'], local_video_path)
         logger.info(f"Downloaded: {video['name']}")
         return {
             'id': video['id'],
@@ -41,13 +32,21 @@ class GoogleDriveDownloader:
             'path': local_video_path
         }
 
+    def download(self, file_id, destination):
+        return self.storage.download(file_id, destination)
+
     def delete_drive_file(self, file_id):
-        self.gdrive.delete_file(file_id)
+        return self.storage.delete(file_id)
 
     def upload_to_drive(self, local_path, folder_key, mime_type):
-        folder_id = self.drive_folders[folder_key]
-        return self.gdrive.upload_file(local_path, folder_id, mime_type)
+        return self.storage.upload(local_path, self.storage.folder(folder_key), mime_type)
 
     def list_all_videos(self, videos_folder_url: str):
-        videos_folder_id = self.gdrive.get_folder_id(videos_folder_url)
-        return self.gdrive.list_files(videos_folder_id, 'video/mp4')
\ No newline at end of file
+        """Every video (any video/* type) in the folder and, unless CRAWL.RECURSIVE is off, its subfolders."""
+        settings = self.crawl_settings
+        crawler = FolderCrawler(
+            self.storage,
+            max_workers=settings.get("MAX_WORKERS", 4),
+            max_depth=settings.get("MAX_DEPTH") if settings.get("RECURSIVE", True) else 0
+        )
+        return crawler.crawl(self.storage.resolve_folder(videos_folder_url), settings.get("MIME_TYPE", "video/*"))
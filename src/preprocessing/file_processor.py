@@ -1,52 +1,92 @@
 # src/preprocessing/file_processor.py
 from pptx import Presentation
-import nbformat
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+import ijson
 import re
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when extraction output changes so cached materials are re-parsed
+PARSER_VERSION = 2
+
 class FileProcessor:
+    @staticmethod
+    def _shape_text(shape, content: list):
+        """Append the text of one shape; recurses into groups and reads tables cell by cell."""
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            for child in shape.shapes:
+                FileProcessor._shape_text(child, content)
+        elif getattr(shape, "has_table", False) and shape.has_table:
+            for row in shape.table.rows:
+                cells = [re.sub(r'\s+', ' ', cell.text).strip() for cell in row.cells]
+                if any(cells):
+                    content.append(" | ".join(cells))
+        elif getattr(shape, "has_text_frame", False) and shape.has_text_frame:
+            text = shape.text_frame.text.strip()
+            if text:
+                content.append(re.sub(r'\s+', ' ', text))
+
     @staticmethod
     def process_slide_file(file_path: str) -> str:
+        """Slide text, tables, grouped shapes and speaker notes, in one pass over the deck."""
         try:
             prs = Presentation(file_path)
             content = []
             for i, slide in enumerate(prs.slides):
                 content.append(f"=== Slide {i+1} ===")
                 for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        cleaned_text = re.sub(r'\s+', ' ', shape.text.strip())
-                        content.append(cleaned_text)
+                    FileProcessor._shape_text(shape, content)
+                if slide.has_notes_slide:
+                    notes = slide.notes_slide.notes_text_frame
+                    notes_text = re.sub(r'\s+', ' ', notes.text.strip()) if notes is not None else ""
+                    if notes_text:
+                        content.append(f"Speaker notes: {notes_text}")
                 content.append("")
             return "\n".join(content)
         except Exception as e:
             logger.error(f"Error processing presentation: {str(e)}")
             return ""
 
+    @staticmethod
+    def _iter_notebook_cells(f):
+        """Yield (cell_type, source) from a notebook stream without building the document.
+
+        Cell outputs (often base64 images and large dataframes) are skipped event by
+        event, so memory stays bounded by the largest cell source, not the file size.
+        """
+        cell_type, source = None, []
+        for prefix, event, value in ijson.parse(f, buf_size=1024 * 1024):
+            if prefix == "cells.item" and event == "start_map":
+                cell_type, source = None, []
+            elif prefix == "cells.item.cell_type":
+                cell_type = value
+            elif prefix in ("cells.item.source", "cells.item.source.item") and event == "string":
+                source.append(value)
+            elif prefix == "cells.item" and event == "end_map":
+                yield cell_type, "".join(source)
+
     @staticmethod
     def process_notebook_file(file_path: str) -> str:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                nb = nbformat.read(f, as_version=4)
-
             content = []
-            for cell in nb.cells:
-                if cell.cell_type == 'code':
-                    content.append("## CODE CELL ##")
-                    content.append(cell.source.strip())
-                    content.append("----")
-                elif cell.cell_type == 'markdown':
-                    content.append("## MARKDOWN CELL ##")
-                    cleaned_text = cell.source.strip()
-                    cleaned_text = re.sub(r'#+\s*', '', cleaned_text)
-                    cleaned_text = re.sub(r'\*{1,2}(.*?)\*{1,2}', r'\1', cleaned_text)
-                    cleaned_text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', cleaned_text)
-                    content.append(cleaned_text)
-                    content.append("----")
+            with open(file_path, 'rb') as f:
+                for cell_type, source in FileProcessor._iter_notebook_cells(f):
+                    if cell_type == 'code':
+                        content.append("## CODE CELL ##")
+                        content.append(source.strip())
+                        content.append("----")
+                    elif cell_type == 'markdown':
+                        content.append("## MARKDOWN CELL ##")
+                        cleaned_text = source.strip()
+                        cleaned_text = re.sub(r'#+\s*', '', cleaned_text)
+                        cleaned_text = re.sub(r'\*{1,2}(.*?)\*{1,2}', r'\1', cleaned_text)
+                        cleaned_text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', cleaned_text)
+                        content.append(cleaned_text)
+                        content.append("----")
 
             return "\n".join(content)
         except Exception as e:
             logger.error(f"Error processing notebook: {str(e)}")
-            return ""
\ No newline at end of file
+            return ""
@@ -1,32 +1,69 @@
 # src/gdrive_manager.py
 import os
 import io
-import json
+import time
+import random
 import logging
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
+import functools
+import httplib2
+from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload, MediaIoBaseUpload
 from googleapiclient.errors import HttpError
-from google.oauth2 import service_account
+from .drive_service_pool import DriveServicePool
+from src.monitoring.logging_setup import ProgressLog
+from src.monitoring.events import publish
+from src.jobs.cancellation import check_cancelled
+from src.monitoring.metrics import DRIVE_BYTES, DRIVE_CALL_SECONDS, DRIVE_THROUGHPUT, UPLOAD_RETRIES, record_stage
 
 logger = logging.getLogger(__name__)
 
+def _timed_call(method):
+    """Record call latency per Drive method (and against the current video's stages)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            DRIVE_CALL_SECONDS.observe(elapsed, method=method.__name__)
+            record_stage(f"drive.{method.__name__}", elapsed)
+    return wrapper
+
+def _record_transfer(direction: str, num_bytes: int, elapsed: float):
+    DRIVE_BYTES.inc(num_bytes, direction=direction)
+    if elapsed > 0:
+        DRIVE_THROUGHPUT.observe(num_bytes / elapsed, direction=direction)
+
+# Worth retrying: request timeout, rate limiting and server-side errors
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return getattr(error.resp, "status", None) in _RETRYABLE_STATUS
+    # Dropped connections, timeouts and TLS errors
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
 class GoogleDriveManager:
     SCOPES = ['https://www.googleapis.com/auth/drive']
+    FILE_FIELDS = "id, name, mimeType, size, md5Checksum, modifiedTime, videoMediaMetadata(durationMillis)"
+    API_URL = "https://www.googleapis.com/drive/v3/files"
+    FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+    PAGE_SIZE = 1000
+    # Resumable upload chunks must be a multiple of 256 KiB
+    CHUNK_ALIGN = 256 * 1024
 
-    def __init__(self):
-        # Try to load full credentials from environment variable
-        gcp_credentials = os.getenv("GCP_CREDENTIALS")
-        if gcp_credentials:
-            cred_data = json.loads(gcp_credentials)
-            creds = service_account.Credentials.from_service_account_info(
-                cred_data, scopes=self.SCOPES
-            )
-        else:
-            # Fallback to file-based credentials
-            creds = service_account.Credentials.from_service_account_file(
-                "credentials.json", scopes=self.SCOPES
-            )
-        self.service = build('drive', 'v3', credentials=creds)
+    def __init__(self, upload_settings: dict = None):
+        # Credentials and discovery are shared process-wide; constructing a manager is cheap
+        self.pool = DriveServicePool.instance()
+        settings = upload_settings or {}
+        chunk_size = int(settings.get("CHUNK_MB", 8) * 1024 * 1024)
+        self.chunk_size = max(self.CHUNK_ALIGN, chunk_size - chunk_size % self.CHUNK_ALIGN)
+        self.upload_retries = settings.get("RETRIES", 5)
+
+    @property
+    def service(self):
+        """Drive service for the calling thread (httplib2 connections are not thread-safe)."""
+        return self.pool.get_service()
 
     def get_folder_id(self, url):
         """Extract folder ID from Google Drive URL"""
@@ -36,43 +73,156 @@ class GoogleDriveManager:
             return url.split('id=')[-1].split('&')[0]
         return url
 
-    def list_files(self, folder_id, file_type='video/mp4'):
-        """List files in a Google Drive folder"""
-        query = f"'{folder_id}' in parents and mimeType='{file_type}' and trashed=false"
-        results = self.service.files().list(
-            q=query,
-            fields="files(id, name, mimeType)"
-        ).execute()
-        return results.get('files', [])
+    def _list_all(self, query, fields):
+        """Run a files().list query, following nextPageToken until every page is read"""
+        files = []
+        page_token = None
+        while True:
+            results = self.service.files().list(
+                q=query,
+                fields=f"nextPageToken, files({fields})",
+                pageSize=self.PAGE_SIZE,
+                pageToken=page_token
+            ).execute()
+            files.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return files
+
+    @_timed_call
+    def list_files(self, folder_id, file_type='video/mp4', modified_after=None):
+        """List files in a Google Drive folder ('video/*' matches any video type, None any file)"""
+        query = f"'{folder_id}' in parents and trashed=false"
+        if modified_after:
+            query += f" and modifiedTime > '{modified_after}'"
+        if file_type and file_type.endswith('/*'):
+            query += f" and mimeType contains '{file_type[:-1]}'"
+        elif file_type:
+            query += f" and mimeType='{file_type}'"
+        else:
+            query += f" and mimeType!='{self.FOLDER_MIME_TYPE}'"
+        return self._list_all(query, self.FILE_FIELDS)
+
+    @_timed_call
+    def list_folders(self, folder_id):
+        """List the direct subfolders of a Google Drive folder"""
+        query = f"'{folder_id}' in parents and mimeType='{self.FOLDER_MIME_TYPE}' and trashed=false"
+        return self._list_all(query, "id, name")
 
+    @_timed_call
+    def get_metadata(self, file_id):
+        """Metadata (including md5Checksum and modifiedTime) for one file"""
+        return self.service.files().get(fileId=file_id, fields=self.FILE_FIELDS).execute()
+
+    @_timed_call
     def download_file(self, file_id, destination):
         """Download a file from Google Drive"""
         logger.info("Downloading file %s to %s", file_id, destination)
+        start = time.perf_counter()
         request = self.service.files().get_media(fileId=file_id)
-        fh = io.FileIO(destination, 'wb')
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-            logger.info(f"Download {int(status.progress() * 100)}%")
+        progress = ProgressLog(logger, f"Download {os.path.basename(destination)}")
+        with io.FileIO(destination, 'wb') as fh:
+            downloader = MediaIoBaseDownload(fh, request)
+            done = False
+            while not done:
+                check_cancelled()
+                status, done = downloader.next_chunk()
+                progress.update(status.progress(), done)
+                publish("download", done=status.resumable_progress, total=status.total_size)
+        _record_transfer("download", os.path.getsize(destination), time.perf_counter() - start)
         logger.info("Download complete: %s", destination)
         return destination
 
-    def upload_file(self, local_path, drive_folder_id, mime_type):
-        """Upload a file to Google Drive"""
+    def iter_download(self, file_id, chunk_size=8 * 1024 * 1024):
+        """Yield a file's content chunk by chunk without staging it on disk"""
+        start = time.perf_counter()
+        request = self.service.files().get_media(fileId=file_id)
+        buffer = io.BytesIO()
+        downloader = MediaIoBaseDownload(buffer, request, chunksize=chunk_size)
+        total = 0
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            total += len(chunk)
+            yield chunk
+        _record_transfer("download", total, time.perf_counter() - start)
+
+    def _execute_upload(self, request, label):
+        """Run an upload request, retrying transient failures.
+
+        Resumable uploads are sent chunk by chunk; when a chunk fails, the next
+        attempt asks Drive how much it received and continues from there, so a
+        dropped connection near the end of a large WAV does not restart it from
+        zero. Single-request (small) uploads are simply resent.
+        """
+        progress = ProgressLog(logger, f"Upload {label}")
+        failures = 0
+        response = None
+        while response is None:
+            try:
+                if request.resumable is None:
+                    response = request.execute()
+                else:
+                    status, response = request.next_chunk()
+                    if status is not None:
+                        progress.update(status.progress())
+                        publish("upload", name=label, done=status.resumable_progress, total=status.total_size)
+                failures = 0
+            except Exception as e:
+                if not _retryable(e) or failures >= self.upload_retries:
+                    raise
+                failures += 1
+                UPLOAD_RETRIES.inc()
+                delay = min(60.0, 2 ** failures) * random.uniform(0.5, 1.0)
+                logger.warning(f"Upload {label} failed ({e}); retry {failures}/{self.upload_retries} in {delay:.1f}s")
+                time.sleep(delay)
+        return response
+
+    def _media(self, local_path, mime_type):
+        # Files that fit in one chunk go as a single multipart request: a resumable
+        # session would cost an extra round trip to open
+        resumable = os.path.getsize(local_path) > self.chunk_size
+        return MediaFileUpload(local_path, mimetype=mime_type, resumable=resumable, chunksize=self.chunk_size)
+
+    @_timed_call
+    def upload_stream(self, stream, name, drive_folder_id, mime_type):
+        """Upload the content of a readable binary stream as a new Drive file"""
+        start = time.perf_counter()
+        media = MediaIoBaseUpload(stream, mimetype=mime_type, chunksize=self.chunk_size, resumable=True)
+        request = self.service.files().create(
+            body={'name': name, 'parents': [drive_folder_id]},
+            media_body=media,
+            fields='id'
+        )
+        file = self._execute_upload(request, name)
+        _record_transfer("upload", stream.tell(), time.perf_counter() - start)
+        logger.info(f"Uploaded {name} to Drive folder {drive_folder_id}")
+        return file.get('id')
+
+    @_timed_call
+    def upload_file(self, local_path, drive_folder_id, mime_type, app_properties=None):
+        """Upload a file to Google Drive (app_properties: private key/value tags for lookups)"""
         file_metadata = {
             'name': os.path.basename(local_path),
             'parents': [drive_folder_id]
         }
-        media = MediaFileUpload(local_path, mimetype=mime_type)
-        file = self.service.files().create(
+        if app_properties:
+            file_metadata['appProperties'] = app_properties
+        start = time.perf_counter()
+        request = self.service.files().create(
             body=file_metadata,
-            media_body=media,
+            media_body=self._media(local_path, mime_type),
             fields='id'
-        ).execute()
+        )
+        file = self._execute_upload(request, os.path.basename(local_path))
+        _record_transfer("upload", os.path.getsize(local_path), time.perf_counter() - start)
         logger.info(f"Uploaded {local_path} to Drive folder {drive_folder_id}")
         return file.get('id')
 
+    @_timed_call
     def delete_file(self, file_id):
         """Delete a file from Google Drive"""
         try:
@@ -83,6 +233,7 @@ class GoogleDriveManager:
             logger.error(f"An error occurred: {error}")
             return False
 
+    @_timed_call
     def find_file_by_name(self, folder_id, filename):
         """Find a file by name in a folder"""
         query = f"'{folder_id}' in parents and name='{filename}' and trashed=false"
@@ -93,14 +244,20 @@ class GoogleDriveManager:
         files = results.get('files', [])
         return files[0]['id'] if files else None
 
+    @_timed_call
+    def find_file_by_property(self, folder_id, key, value):
+        """First file in a folder tagged with appProperties key=value, as {id, name}"""
+        query = (f"'{folder_id}' in parents and trashed=false "
+                 f"and appProperties has {{ key='{key}' and value='{value}' }}")
+        results = self.service.files().list(q=query, fields="files(id, name)", pageSize=1).execute()
+        files = results.get('files', [])
+        return files[0] if files else None
+
+    @_timed_call
     def list_txt_files(self, folder_id):
         """List all .txt files in a Google Drive folder"""
         query = f"'{folder_id}' in parents and mimeType='text/plain' and trashed=false"
-        results = self.service.files().list(
-            q=query,
-            fields="files(id, name)"
-        ).execute()
-        return results.get('files', [])
+        return self._list_all(query, self.FILE_FIELDS)
 
     def remove_duplicates_by_name(self, folder_id):
         """Remove duplicate files (by name) in a Drive folder, keeping only the latest."""
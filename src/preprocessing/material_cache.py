@@ -0,0 +1,71 @@
+# src/preprocessing/material_cache.py
+import os
+import hashlib
+import logging
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MaterialCache:
+    """Parsed mentor materials keyed by the uploaded file's content hash.
+
+    Parsed text is kept under cache_dir/<key>.txt. The copy uploaded to storage
+    is tagged with the same key (a Drive appProperty), so another host or a
+    fresh container can reuse it instead of re-parsing, and re-uploading the
+    same deck neither re-parses nor re-uploads anything.
+    """
+    PROPERTY = "qc_material_key"
+
+    def __init__(self, cache_dir: str, storage=None, location: str = None, parser_version: int = 1):
+        self.cache_dir = cache_dir
+        self.storage = storage
+        self.location = location
+        self.parser_version = parser_version
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, source_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(source_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        # The parser version is part of the key so improved extraction invalidates old entries
+        return f"v{self.parser_version}-{digest.hexdigest()}"
+
+    def _remote(self, key: str) -> Optional[dict]:
+        if self.storage is None:
+            return None
+        return self.storage.find_by_property(self.location, self.PROPERTY, key)
+
+    def load(self, source_path: str, parse: Callable[[str], str]) -> Tuple[str, str, Optional[dict]]:
+        """Parsed text for source_path: local cache, then storage, then parse(source_path).
+
+        Returns (text, key, remote) where remote is the tagged object in storage, if any.
+        """
+        key = self.key(source_path)
+        cache_path = os.path.join(self.cache_dir, f"{key}.txt")
+        remote = self._remote(key)
+        if os.path.exists(cache_path):
+            logger.info(f"Mentor material cache hit for {os.path.basename(source_path)}")
+        elif remote is not None:
+            logger.info(f"Reusing parsed {os.path.basename(source_path)} from storage ({remote['name']})")
+            self.storage.download(remote["id"], f"{cache_path}.partial")
+            os.replace(f"{cache_path}.partial", cache_path)
+        else:
+            text = parse(source_path)
+            if not text:
+                return text, key, None
+            with open(f"{cache_path}.partial", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(f"{cache_path}.partial", cache_path)
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read(), key, remote
+
+    def publish(self, output_path: str, key: str, remote: Optional[dict]):
+        """Upload output_path to storage unless the same content is already there under that name."""
+        if self.storage is None:
+            return
+        if remote is not None and remote["name"] == os.path.basename(output_path):
+            logger.info(f"{remote['name']} is already up to date in storage")
+            return
+        self.storage.replace(output_path, self.location, "application/octet-stream", properties={self.PROPERTY: key})
+
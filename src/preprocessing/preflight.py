@@ -0,0 +1,162 @@
+# src/preprocessing/preflight.py
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from src.monitoring.metrics import DRIVE_THROUGHPUT, FFMPEG_SECONDS, AUDIO_SECONDS, TRANSCRIBE_RTF, LLM_SECONDS
+from src.preprocessing.video_processor import VideoProcessor
+from src.storage.base import media_duration
+
+logger = logging.getLogger(__name__)
+
+class Preflight:
+    """Inspects listed videos before anything is downloaded.
+
+    Duration comes from Drive's videoMediaMetadata when the listing has it;
+    ffprobe then confirms the file parses and has an audio track. Local files
+    are probed in place; remote ones by piping their first PROBE_BYTES (one
+    ranged read) to ffprobe, so no credentials end up on its command line.
+    Files that would fail later (no audio, unreadable, too short) are rejected
+    up front, and the remaining work is costed so the UI can show an ETA for
+    the whole folder. A probe that fails for any other reason (network error,
+    timeout, a head too short to hold the container index) rejects nothing.
+
+    Per-stage rates start from config["PREFLIGHT"] defaults and switch to the
+    averages observed by this process once there are measurements.
+    """
+    DEFAULTS = {
+        "PROBE": "always",              # always | missing (only without Drive duration) | never
+        "PROBE_WORKERS": 4,
+        "PROBE_BYTES": 4 * 1024 * 1024,
+        "MIN_SECONDS": 5,
+        "MAX_SECONDS": None,
+        "DOWNLOAD_BYTES_PER_SECOND": 20 * 1024 * 1024,
+        "FFMPEG_REAL_TIME_FACTOR": 0.02,
+        "TRANSCRIBE_REAL_TIME_FACTOR": 0.3,
+        "REPORT_SECONDS": 30,
+        "VIDEO_BYTES_PER_SECOND": 40000  # ~2.4 MB/min, typical for Meet/Zoom screen recordings
+    }
+
+    def __init__(self, storage, config: dict = None):
+        self.storage = storage
+        self.settings = dict(self.DEFAULTS, **((config or {}).get("PREFLIGHT") or {}))
+
+    def rates(self) -> Dict[str, float]:
+        audio_seconds = sum(v["value"] for v in AUDIO_SECONDS.snapshot())
+        ffmpeg_seconds = sum(v["sum"] for v in FFMPEG_SECONDS.snapshot())
+        return {
+            "download_bytes_per_second": DRIVE_THROUGHPUT.mean(
+                self.settings["DOWNLOAD_BYTES_PER_SECOND"], direction="download"),
+            "ffmpeg_rtf": ffmpeg_seconds / audio_seconds if audio_seconds else self.settings["FFMPEG_REAL_TIME_FACTOR"],
+            "transcribe_rtf": TRANSCRIBE_RTF.mean(self.settings["TRANSCRIBE_REAL_TIME_FACTOR"]),
+            "report_seconds": LLM_SECONDS.mean(self.settings["REPORT_SECONDS"])
+        }
+
+    def inspect(self, video: dict) -> dict:
+        """Probe one listed video; returns its plan entry (status "ok" or "rejected")."""
+        entry = {
+            "id": video["id"],
+            "name": video["name"],
+            "base_name": video.get("base_name") or os.path.splitext(video["name"])[0],
+            "size": int(video.get("size") or 0),
+            "duration": media_duration(video),
+            "has_audio": None,
+            "status": "ok",
+            "reason": None
+        }
+        mode = self.settings["PROBE"]
+        if mode == "always" or (mode == "missing" and entry["duration"] is None):
+            info, complete = self._probe(video)
+            if info is not None and not info["readable"]:
+                if complete:
+                    return self._reject(entry, "unreadable or corrupt media")
+                # A head that ends before the container index (e.g. an MP4 with moov at the end)
+                logger.info(f"Preflight could not parse the head of {video['name']}; checking it after download")
+            elif info is not None:
+                entry["has_audio"] = info["has_audio"]
+                entry["duration"] = entry["duration"] or info["duration"]
+                if not info["has_audio"]:
+                    return self._reject(entry, "no audio track")
+
+        duration = entry["duration"]
+        if duration is not None:
+            if duration < self.settings["MIN_SECONDS"]:
+                return self._reject(entry, f"too short ({duration:.0f}s)")
+            if self.settings["MAX_SECONDS"] and duration > self.settings["MAX_SECONDS"]:
+                return self._reject(entry, f"too long ({duration / 3600:.1f}h)")
+        return entry
+
+    def _probe(self, video: dict):
+        """(probe_media result, whether ffprobe saw the whole file); (None, False) if it could not run."""
+        path = self.storage.media_source(video["id"])
+        if path is not None:
+            return VideoProcessor.probe_media(path), True
+        nbytes = int(self.settings["PROBE_BYTES"])
+        try:
+            head = self.storage.read_head(video["id"], nbytes)
+        except Exception as e:
+            logger.warning(f"Preflight could not read {video['name']}: {e}")
+            return None, False
+        return VideoProcessor.probe_media(video["name"], data=head), len(head) < nbytes
+
+    @staticmethod
+    def _reject(entry: dict, reason: str) -> dict:
+        logger.warning(f"Preflight rejected {entry['name']}: {reason}")
+        entry["status"], entry["reason"] = "rejected", reason
+        return entry
+
+    def estimate(self, entry: dict, rates: dict, skip_download: bool = False, skip_transcription: bool = False,
+                 skip_report: bool = False) -> dict:
+        """Seconds per stage for one video (an unknown duration is guessed from file size)."""
+        duration = entry["duration"]
+        if duration is None:
+            duration = entry["size"] / self.settings["VIDEO_BYTES_PER_SECOND"]
+        stages = {
+            "download": 0.0 if skip_download else entry["size"] / rates["download_bytes_per_second"],
+            "ffmpeg": 0.0 if skip_download else duration * rates["ffmpeg_rtf"],
+            "transcribe": 0.0 if skip_transcription else duration * rates["transcribe_rtf"],
+            "report": 0.0 if skip_report else rates["report_seconds"]
+        }
+        return {key: round(value, 1) for key, value in stages.items()}
+
+    def inspect_all(self, videos: List[dict]) -> List[dict]:
+        if not videos:
+            return []
+        workers = max(1, min(int(self.settings["PROBE_WORKERS"]), len(videos)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preflight") as executor:
+            return list(executor.map(self.inspect, videos))
+
+    @staticmethod
+    def summarize(entries: List[dict], concurrency: int = 1, transcription_slots: int = 1) -> dict:
+        """Folder-level plan: totals and an ETA.
+
+        Transcription is bounded by the scheduler's slots while the other stages
+        overlap across the videos in flight, so the ETA is whichever of the two
+        is the bottleneck.
+        """
+        accepted = [e for e in entries if e["status"] != "rejected"]
+        transcribe = sum(e["estimate"]["transcribe"] for e in accepted)
+        total = sum(sum(e["estimate"].values()) for e in accepted)
+        eta = max(transcribe / max(1, transcription_slots), total / max(1, concurrency)) if accepted else 0.0
+        return {
+            "created_at": time.time(),
+            "videos": len(entries),
+            "accepted": len(accepted),
+            "rejected": [{"name": e["name"], "reason": e["reason"]} for e in entries if e["status"] == "rejected"],
+            "audio_seconds": round(sum(e["duration"] or 0.0 for e in accepted), 1),
+            "bytes": sum(e["size"] for e in accepted),
+            "eta_seconds": round(eta, 1),
+            "tokens": sum(sum((e.get("tokens") or {}).values()) for e in accepted),
+            "cost": round(sum(e.get("cost") or 0.0 for e in accepted), 4),
+            "entries": entries
+        }
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    minutes, secs = divmod(int(max(seconds, 0)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s"
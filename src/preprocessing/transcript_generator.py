@@ -90,70 +90,318 @@
 import time
 import re
 import os
-from faster_whisper import WhisperModel
+import wave
+import logging
+import threading
+from collections import namedtuple
+from typing import Optional
+import numpy as np
+from src.monitoring.events import publish
+from src.jobs.cancellation import check_cancelled
+from src.monitoring.metrics import (TRANSCRIBE_REFINED_FRACTION, TRANSCRIBE_RTF, TRANSCRIBE_SECONDS,
+                                    WHISPER_LOAD_SECONDS, record_stage)
 
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
+logger = logging.getLogger(__name__)
+
+Word = namedtuple("Word", "start end word probability")
+
+# faster_whisper.WhisperModel, imported on the first model load so the audio helpers
+# (wav_duration, read_window) work without it; tests and benchmarks may set a stand-in
+WhisperModel = None
+
+def load_whisper_model(model_size: str, compute_type: str):
+    global WhisperModel
+    if WhisperModel is None:
+        from faster_whisper import WhisperModel
+    return WhisperModel(model_size, compute_type=compute_type)
+
+SAMPLE_RATE = 16000
+
+# Longer WAVs are decoded this many seconds at a time (~4 bytes of float32 per sample held per window)
+WINDOW_SECONDS = 600
+
+# Second pass: re-transcribe only the spans the fast pass was unsure about
+REFINE_DEFAULTS = {
+    "ENABLED": False,
+    "MODEL": "small.en",
+    "BEAM_SIZE": 5,
+    "MIN_WORD_PROBABILITY": 0.6,
+    "MIN_AVG_LOGPROB": -1.0,
+    "MAX_NO_SPEECH_PROBABILITY": 0.6,
+    "MAX_COMPRESSION_RATIO": 2.4,
+    "MERGE_GAP_SECONDS": 2.0,
+    "PADDING_SECONDS": 1.0,
+    # A span is refined (and its words released) once it reaches this length, so
+    # poor audio cannot grow one span, and the window decoded for it, to the whole file
+    "MAX_SPAN_SECONDS": 60.0,
+    # Past this share of the recording the second pass stops: refining more would cost
+    # about as much as decoding everything with the larger model
+    "MAX_REFINED_FRACTION": 0.3
+}
+
+def _segment_words(segment, offset: float = 0.0) -> list:
+    return [Word(w.start + offset, w.end + offset, w.word, w.probability) for w in (segment.words or [])]
+
+def is_low_confidence(segment, settings: dict) -> bool:
+    """Whether a fast-pass segment is worth a second opinion.
+
+    A segment is flagged when its words are on average unlikely, the decoder's own
+    log probability is low, it looks like a repetition loop (high compression
+    ratio), or it was decoded from what the model thinks is silence.
+    """
+    words = segment.words or []
+    mean_probability = sum(w.probability for w in words) / len(words) if words else 1.0
+    return bool(mean_probability < settings["MIN_WORD_PROBABILITY"]
+                or segment.avg_logprob < settings["MIN_AVG_LOGPROB"]
+                or segment.compression_ratio > settings["MAX_COMPRESSION_RATIO"]
+                or (words and segment.no_speech_prob > settings["MAX_NO_SPEECH_PROBABILITY"]))
+
+def splice_words(words: list, span: tuple, replacement: list) -> list:
+    """Words with those centred inside span swapped for the replacement's words centred inside it."""
+    start, end = span
+    inside = lambda w: start <= (w.start + w.end) / 2 <= end
+    kept = [w for w in words if not inside(w)]
+    return sorted(kept + [w for w in replacement if inside(w)], key=lambda w: w.start)
+
+def wav_duration(audio_file_path: str) -> Optional[float]:
+    """Seconds of audio in a 16 kHz mono 16-bit WAV (from its header), or None for any other file."""
+    try:
+        with wave.open(audio_file_path, "rb") as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                return None
+            return wav.getnframes() / SAMPLE_RATE
+    except (wave.Error, EOFError, OSError):
+        return None
+
+def read_window(audio_file_path: str, start: float, end: float):
+    """Float32 samples of [start, end) from a 16 kHz mono 16-bit WAV, without reading the rest."""
+    with wave.open(audio_file_path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            return None
+        first = max(0, int(start * SAMPLE_RATE))
+        wav.setpos(min(first, wav.getnframes()))
+        frames = wav.readframes(max(0, int(end * SAMPLE_RATE) - first))
+    audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
+    audio /= 32768.0  # in place: no second float32 copy of the window
+    return audio
+
+class SentenceWriter:
+    """Writes words to the TSV transcript as they arrive, one row per sentence.
+
+    A sentence ends at a gap of more than 1.5 s or at a lone punctuation token, so
+    only the current sentence is ever held in memory.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.words = 0
+        self._sentence = []
+        self._start = None
+        self._end = None
+        f.write("start_time\tend_time\tspeaker\ttranscript\n")
+
+    def add(self, word: Word):
+        text = word.word.strip()
+        self.words += 1
+        if self._sentence:
+            # Check sentence boundary
+            time_gap = word.start - self._end
+            if time_gap > 1.5 or re.match(r'^[.!?]+$', text):
+                self._flush()
+        if not self._sentence:
+            self._start = word.start
+        self._sentence.append(text)
+        self._end = word.end
+
+    def extend(self, words):
+        for word in words:
+            self.add(word)
+
+    def _flush(self):
+        self.f.write(f"{self._start:.2f}\t{self._end:.2f}\tSPEAKER\t{' '.join(self._sentence)}\n")
+        self._sentence = []
+
+    def close(self):
+        if self._sentence:
+            self._flush()
+
 class TranscriptGenerator:
-    def __init__(self, model_size="base.en", compute_type="int8"):
+    def __init__(self, model_size="base.en", compute_type="int8", beam_size: int = 5, refine: dict = None,
+                 window_seconds: float = WINDOW_SECONDS):
         start_load = time.time()
-        self.model = WhisperModel(model_size, compute_type=compute_type)
+        self.model = load_whisper_model(model_size, compute_type)
         self.model_load_time = time.time() - start_load
+        WHISPER_LOAD_SECONDS.observe(self.model_load_time, model=model_size)
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.refine = dict(REFINE_DEFAULTS, **(refine or {}))
+        self.window_seconds = window_seconds
+        # The larger model is loaded the first time a file actually needs refining
+        self._refine_model = None
+        self._refine_lock = threading.Lock()
+
+    def _get_refine_model(self):
+        with self._refine_lock:
+            if self._refine_model is None:
+                start_load = time.time()
+                self._refine_model = load_whisper_model(self.refine["MODEL"], self.compute_type)
+                WHISPER_LOAD_SECONDS.observe(time.time() - start_load, model=self.refine["MODEL"])
+        return self._refine_model
+
+    def _fast_pass(self, audio_file_path: str):
+        """Lazy (offset, segment) pairs of the fast pass, in order, and the audio's duration."""
+        duration = wav_duration(audio_file_path)
+        if duration is None or not self.window_seconds or duration <= self.window_seconds:
+            segments, info = self.model.transcribe(audio_file_path, word_timestamps=True, beam_size=self.beam_size)
+            return ((0.0, segment) for segment in segments), info.duration
+        return self._windowed_segments(audio_file_path, duration), duration
+
+    def _windowed_segments(self, audio_file_path: str, duration: float):
+        """Fast-pass (offset, segment) pairs of a long WAV, decoded window by window.
+
+        faster-whisper decodes its whole input into memory first (~230 MB of float32
+        per hour), so a WAV longer than window_seconds is fed to it one window at a
+        time. A window's last segment may be cut off mid-word, so it is dropped and
+        the next window starts where it started; the text before it is passed on as
+        the prompt, as Whisper does between its own 30 s chunks.
+        """
+        start, previous_text = 0.0, None
+        while start < duration:
+            end = min(duration, start + self.window_seconds)
+            audio = read_window(audio_file_path, start, end)
+            segments, _ = self.model.transcribe(audio, word_timestamps=True, beam_size=self.beam_size,
+                                                initial_prompt=previous_text)
+            del audio
+            last, resume = None, end
+            for segment in segments:
+                if last is not None:
+                    yield start, last
+                    previous_text = last.text
+                last = segment
+            if last is not None:
+                if end < duration and last.start > 0:
+                    resume = start + last.start
+                else:
+                    yield start, last
+                    previous_text = last.text
+            start = resume
+
+    def _refine_span(self, audio_file_path: str, words: list, span: tuple, duration: float) -> Optional[list]:
+        """Re-transcribe span (plus padding for context) with the refine model and splice it into words.
+
+        None if the file cannot be read by window.
+        """
+        check_cancelled()
+        padding = self.refine["PADDING_SECONDS"]
+        window_start = max(0.0, span[0] - padding)
+        window_end = min(duration or span[1] + padding, span[1] + padding)
+        audio = read_window(audio_file_path, window_start, window_end)
+        if audio is None:
+            return None
+        segments, _ = self._get_refine_model().transcribe(audio, word_timestamps=True,
+                                                          beam_size=self.refine["BEAM_SIZE"])
+        replacement = [w for segment in segments for w in _segment_words(segment, window_start)]
+        publish("refine", seconds=round(span[1], 1), total=duration)
+        return splice_words(words, span, replacement)
 
     def transcribe_audio(self, audio_file_path: str, output_text_file: str):
-        print(os.path.abspath(audio_file_path))
-        start_transcribe = time.time()
-        segments, info = self.model.transcribe(audio_file_path, word_timestamps=True, beam_size=5)
-        transcription_time = time.time() - start_transcribe
+        """Transcribe a WAV into the TSV transcript layout.
 
-        all_words = []
-        for segment in segments:
-            if segment.words:
-                all_words.extend(segment.words)
+        With refinement enabled (TRANSCRIPTION.REFINE), the fast model decodes the
+        whole file and only its low-confidence spans are decoded again by the
+        larger model, so most of the audio is paid for at the fast model's cost.
+
+        Memory does not grow with the recording: audio is decoded by window,
+        sentences are written as soon as they end, and only the words of a
+        low-confidence span still open for refinement (at most MAX_SPAN_SECONDS
+        plus the merge gap) are held back.
+        """
+        logger.info(f"Transcribing {os.path.abspath(audio_file_path)}")
+        start_transcribe = time.time()
+        segments, duration = self._fast_pass(audio_file_path)
+        refining = self.refine["ENABLED"]
+        merge_gap = self.refine["MERGE_GAP_SECONDS"]
+        max_span = self.refine["MAX_SPAN_SECONDS"]
+        refine_limit = self.refine["MAX_REFINED_FRACTION"] * duration if duration else None
+        refined_spans, refine_time = [], 0.0
+        span, pending = None, []
 
         with open(output_text_file, "w", encoding="utf-8") as f:
-            f.write("start_time\tend_time\tspeaker\ttranscript\n")
-
-            current_sentence = []
-            current_start = None
-            current_end = None
-
-            for word in all_words:
-                word_start = word.start
-                word_end = word.end
-                word_text = word.word.strip()
-
-                if not current_sentence:
-                    current_sentence.append(word_text)
-                    current_start = word_start
-                    current_end = word_end
-                    continue
-
-                # Check sentence boundary
-                time_gap = word_start - current_end
-                is_punctuation = re.match(r'^[.!?]+$', word_text)
-
-                if time_gap > 1.5 or is_punctuation:
-                    sentence = " ".join(current_sentence)
-                    f.write(f"{current_start:.2f}\t{current_end:.2f}\tSPEAKER\t{sentence}\n")
-                    current_sentence = [word_text]
-                    current_start = word_start
-                    current_end = word_end
+            writer = SentenceWriter(f)
+
+            def close_span():
+                nonlocal refining, refine_time
+                refined_seconds = sum(end - start for start, end in refined_spans)
+                if refine_limit is not None and refined_seconds + span[1] - span[0] > refine_limit:
+                    logger.warning(f"Over {self.refine['MAX_REFINED_FRACTION']:.0%} of {audio_file_path} is low "
+                                   f"confidence; keeping the fast pass for the rest")
+                    refining = False
+                    writer.extend(pending)
+                    return
+                start_refine = time.time()
+                words = self._refine_span(audio_file_path, pending, span, duration)
+                refine_time += time.time() - start_refine
+                if words is None:
+                    logger.warning(f"Cannot window {audio_file_path} (not 16 kHz mono PCM); skipping refinement")
+                    refining = False
+                    words = pending
                 else:
-                    current_sentence.append(word_text)
-                    current_end = word_end
+                    refined_spans.append(span)
+                writer.extend(words)
 
-            if current_sentence:
-                sentence = " ".join(current_sentence)
-                f.write(f"{current_start:.2f}\t{current_end:.2f}\tSPEAKER\t{sentence}\n")
+            # Segments are decoded lazily, so the work happens while iterating
+            for offset, segment in segments:
+                check_cancelled()
+                words = _segment_words(segment, offset)
+                start, end = segment.start + offset, segment.end + offset
+                publish("transcribe", seconds=round(end, 1), total=duration)
+                # A span is refined once no later segment can be merged into it
+                if span is not None and start - span[1] > merge_gap:
+                    close_span()
+                    span, pending = None, []
+                if refining and is_low_confidence(segment, self.refine):
+                    span = (span[0], max(span[1], end)) if span else (start, end)
+                if span is not None:
+                    pending.extend(words)
+                    if span[1] - span[0] >= max_span:
+                        close_span()
+                        span, pending = None, []
+                else:
+                    writer.extend(words)
+            if span is not None:
+                close_span()
+            writer.close()
+        word_count = writer.words
+
+        if refined_spans:
+            refined_seconds = sum(end - start for start, end in refined_spans)
+            record_stage("transcribe_refine", refine_time)
+            if duration:
+                TRANSCRIBE_REFINED_FRACTION.observe(refined_seconds / duration)
+            logger.info(f"Refined {len(refined_spans)} low-confidence span(s), {refined_seconds:.0f}s of audio, "
+                        f"in {refine_time:.1f}s")
+        elif refining and duration:
+            TRANSCRIBE_REFINED_FRACTION.observe(0.0)
+
+        transcription_time = time.time() - start_transcribe
+        TRANSCRIBE_SECONDS.observe(transcription_time)
+        record_stage("transcribe", transcription_time)
+        if duration:
+            TRANSCRIBE_RTF.observe(transcription_time / duration)
+            record_stage("transcribe_rtf", transcription_time / duration)
 
         file_written = os.path.exists(output_text_file) and os.path.getsize(output_text_file) > 100  # >100 bytes means not just header
 
-        if not all_words:
-            print(" No words recognized by the model.")
+        if not word_count:
+            logger.warning("No words recognized by the model.")
         if file_written:
-            print(f" Transcript saved to {output_text_file}")
+            logger.info(
+                f"Transcript saved to {output_text_file}",
+                extra={"transcribe_seconds": round(transcription_time, 2), "words": word_count}
+            )
         else:
-            print(f" Transcript file is empty or only contains header: {output_text_file}")
+            logger.warning(f"Transcript file is empty or only contains header: {output_text_file}")
 
         return file_written
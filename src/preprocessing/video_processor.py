@@ -1,7 +1,11 @@
 # src/preprocessing/video_processor.py
 import os
+import json
+import time
 import subprocess
 import logging
+from typing import Optional
+from src.monitoring.metrics import AUDIO_SECONDS, FFMPEG_SECONDS, record_stage
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +20,51 @@ class VideoProcessor:
             except Exception as e:
                 logger.error(f"Error deleting {file_path}: {e}")
 
+    @staticmethod
+    def probe_media(source: str, data: bytes = None, timeout: float = 60) -> Optional[dict]:
+        """Duration and stream layout via ffprobe.
+
+        source is a local path; with data, ffprobe reads those bytes from stdin
+        instead (source is then only a label). A file ffprobe rejects comes back
+        with readable False; None means it could not be probed at all (ffprobe
+        missing, timed out or gave no usable output), which says nothing about the file.
+        """
+        command = ["ffprobe", "-v", "error", "-show_entries", "format=duration:stream=codec_type,codec_name",
+                   "-of", "json", "pipe:0" if data is not None else source]
+        try:
+            result = subprocess.run(command, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Could not probe {source}: {e}")
+            return None
+        if result.returncode != 0:
+            error = result.stderr.decode("utf-8", "replace").strip()
+            logger.warning(f"ffprobe failed for {source}: {error}")
+            return {"readable": False, "error": error, "duration": None, "has_audio": None,
+                    "audio_codec": None, "has_video": None}
+        try:
+            probed = json.loads(result.stdout)
+        except ValueError as e:
+            logger.warning(f"Could not parse ffprobe output for {source}: {e}")
+            return None
+        streams = probed.get("streams", [])
+        audio = [s for s in streams if s.get("codec_type") == "audio"]
+        duration = probed.get("format", {}).get("duration")
+        return {
+            "readable": True,
+            "error": None,
+            "duration": float(duration) if duration not in (None, "N/A") else None,
+            "has_audio": bool(audio),
+            "audio_codec": audio[0].get("codec_name") if audio else None,
+            "has_video": any(s.get("codec_type") == "video" for s in streams)
+        }
+
+    @staticmethod
+    def probe_duration(media_path: str) -> Optional[float]:
+        """Container duration in seconds via ffprobe (reads headers only), or None."""
+        info = VideoProcessor.probe_media(media_path)
+        return info["duration"] if info else None
+
     @staticmethod
     def convert_mp4_to_wav(mp4_file_path: str, wav_file_path: str) -> bool:
         try:
@@ -25,6 +74,7 @@ class VideoProcessor:
                 
             command = [
                 "ffmpeg",
+                "-nostats",  # stderr is captured; progress lines would grow with the recording
                 "-i", mp4_file_path,
                 "-vn",
                 "-acodec", "pcm_s16le",
@@ -34,17 +84,26 @@ class VideoProcessor:
                 wav_file_path
             ]
             
+            start = time.perf_counter()
             result = subprocess.run(
                 command, 
                 stdout=subprocess.PIPE, 
                 stderr=subprocess.PIPE,
                 text=True
             )
+            elapsed = time.perf_counter() - start
+            FFMPEG_SECONDS.observe(elapsed)
+            record_stage("ffmpeg", elapsed)
             
             if result.returncode != 0:
                 logger.error(f"FFmpeg error: {result.stderr}")
                 return False
-                
+
+            # 16 kHz mono 16-bit PCM after the 44-byte WAV header
+            audio_seconds = max(os.path.getsize(wav_file_path) - 44, 0) / (16000 * 2)
+            AUDIO_SECONDS.inc(audio_seconds)
+            record_stage("audio_seconds", audio_seconds)
+            logger.info(f"Extracted {audio_seconds:.0f}s of audio in {elapsed:.1f}s")
             return True
         except Exception as e:
             logger.error(f"Conversion error: {str(e)}")
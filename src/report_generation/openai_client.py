@@ -14,7 +14,9 @@ class OpenAIClient:
         self.client = AzureOpenAI(
             azure_endpoint=config["AZURE_OPENAI_ENDPOINT"],
             api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version=config["AZURE_OPENAI_APIVERSION"]
+            api_version=config["AZURE_OPENAI_APIVERSION"],
+            # Rate-limited (429) and 5xx calls are retried with backoff, honouring Retry-After
+            max_retries=config.get("AZURE_OPENAI_MAX_RETRIES", 5)
         )
         self.deployment_name = config["CHATGPT_MODEL"]
         
@@ -1,21 +1,65 @@
 # src/report_generation/report_generator.py
 import os
+import re
 import glob
+import json
 import time
 import logging
-from typing import Dict
-from src.preprocessing.gdrive_manager import GoogleDriveManager  # Add this import if not present
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from src.monitoring.events import get_bus
+from src.jobs.cancellation import check_cancelled
+from src.monitoring.metrics import LLM_FIRST_TOKEN_SECONDS, LLM_SECONDS, LLM_TOKENS, TRANSCRIPT_TOKENS_SAVED, record_stage
+from src.report_generation.report_schema import REPORT_SCHEMA, empty_report, normalize_report, render_report_text
+from src.report_generation.transcript_renderer import estimate_tokens, render_transcript_file
+from src.state.usage_ledger import current_labels
+from src.jobs.budget import price, usage_settings
 
 logger = logging.getLogger(__name__)
 
+class ReportError(Exception):
+    """The quality check failed (e.g. the LLM call errored); no report was written."""
+
+def checklist_item_ids(checklist: str) -> List[str]:
+    """Sub-item ids ("1a", "1b", ... "8a") in checklist order, from its "N." / "a." outline."""
+    ids, section = [], None
+    for line in checklist.splitlines():
+        numbered = re.match(r"\s*(\d+)\.", line)
+        if numbered:
+            section = numbered.group(1)
+            continue
+        lettered = re.match(r"\s+([a-z])\.", line)
+        if lettered and section:
+            ids.append(f"{section}{lettered.group(1)}")
+    return ids
+
 class ReportGenerator:
-    def __init__(self, openai_client, deployment_name: str, checklist: str):
+    def __init__(self, openai_client, deployment_name: str, checklist: str, report_index=None, storage=None,
+                 uploader=None, transcript_settings: Dict = None, ledger=None, usage: Dict = None,
+                 stream: bool = False, max_material_chars: int = None):
         self.client = openai_client
         self.deployment_name = deployment_name
         self.checklist = checklist
+        item_ids = checklist_item_ids(checklist)
+        # Named in the prompt so the model reports every sub-item of this checklist
+        self.item_range = f"{item_ids[0]} ... {item_ids[-1]}" if item_ids else "1a, 1b, ..."
+        self.report_index = report_index
+        self.storage = storage
+        # Optional src.storage.uploader.Uploader; without one, reports are uploaded inline
+        self.uploader = uploader
+        # REPORT.TRANSCRIPT: how the stored TSV is rendered into the prompt
+        self.transcript_settings = transcript_settings
+        # Every call's tokens, latency and cost go to the UsageLedger (if given), priced by config USAGE
+        self.ledger = ledger
+        self.usage_settings = usage or usage_settings()
+        # Stream completions so the UI can show a report while it is being written
+        self.stream = stream
+        # Longer mentor materials are cut to this many characters (None: no limit)
+        self.max_material_chars = max_material_chars
 
     # Updated quality_check method with enhanced prompt
-    def quality_check(self, transcript_content: str, material_type: str, material_content: str = None) -> str:
+    def quality_check(self, transcript_content: str, material_type: str, material_content: str = None) -> Dict:
+        """Evaluate a transcript against the checklist and return the structured report."""
         material_context = ""
         if material_content:
             if material_type == "slides":
@@ -72,33 +116,30 @@ class ReportGenerator:
             - Expected Outcome: [Quality improvement]
 
     ### REQUIRED OUTPUT FORMAT ###
-    [Checklist Evaluation]
-    1a: [✅/❌/N/A] [Precise justification (25 words max)]
-    1b: [✅/❌/N/A] [Precise justification (25 words max)]
-    ...
-    8b: [✅/❌/N/A] [Precise justification (25 words max)]
-
-    What Went Wrong:
-    - 1b: Missing logical progression between concepts
-    Evidence: "First we discuss X... then suddenly jump to Z" (Transcript 2:15)
-    Impact: Learners lose conceptual thread
-    - 3c: Mispronounced technical terms
-    Evidence: "Pandas pronounced as /pændæs/ instead of /'pændæz/" (0:45, 1:30)
-    Impact: Reduces content credibility
-
-    How to Improve:
-    - 1b: Implement concept bridging
-    Implementation: Add transition statements - "Now that we understand X, let's see how it connects to Z..."
-    Outcome: Smoother learning progression
-    - 3c: Technical term pronunciation guide
-    Implementation: Create glossary with IPA transcriptions, practice before recording
-    Outcome: Professional delivery of technical content
+    Respond with a JSON object matching the provided schema:
+    - "items": one entry per checklist sub-item ({self.item_range}) with
+        * "id": the sub-item id, e.g. "1b"
+        * "status": "pass" (✅), "fail" (❌) or "na" (N/A)
+        * "justification": precise justification (25 words max)
+        * "evidence": direct quote/reference supporting the status
+        * "timestamps": transcript timestamps of the evidence as "M:SS" strings
+    - "what_went_wrong": one entry per failed item with "id", "description",
+      "evidence", "timestamps" and "impact", e.g.
+        {{"id": "1b", "description": "Missing logical progression between concepts",
+          "evidence": "First we discuss X... then suddenly jump to Z", "timestamps": ["2:15"],
+          "impact": "Learners lose conceptual thread"}}
+    - "how_to_improve": one entry per failed item with "id", "solution",
+      "implementation" and "expected_outcome", e.g.
+        {{"id": "3c", "solution": "Technical term pronunciation guide",
+          "implementation": "Create glossary with IPA transcriptions, practice before recording",
+          "expected_outcome": "Professional delivery of technical content"}}
     """
 
         try:
             logger.info("Calling Azure OpenAI API for quality check...")
             logger.info(f"Transcript length: {len(transcript_content)}")
             logger.info(f"Checklist length: {len(self.checklist)}")
+            start = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.deployment_name,
                 messages=[
@@ -112,49 +153,143 @@ class ReportGenerator:
                 temperature=0.1,  # Lowered for more deterministic output
                 max_tokens=4096,
                 top_p=0.9,
-                frequency_penalty=0.3  # Discourage repetition
+                frequency_penalty=0.3,  # Discourage repetition
+                response_format={"type": "json_schema", "json_schema": REPORT_SCHEMA},
+                **({"stream": True, "stream_options": {"include_usage": True}} if self.stream else {})
             )
-            logger.info("Received response from Azure OpenAI API.")
-            return response.choices[0].message.content.strip()
+            if self.stream:
+                content, usage = self._consume_stream(response, start)
+                if usage is None:
+                    # API versions without stream usage: estimate so budgets and the ledger still count the call
+                    usage = SimpleNamespace(prompt_tokens=estimate_tokens(user_input),
+                                            completion_tokens=estimate_tokens(content))
+            else:
+                content, usage = response.choices[0].message.content, getattr(response, "usage", None)
+            latency = time.perf_counter() - start
+            LLM_SECONDS.observe(latency, model=self.deployment_name)
+            record_stage("llm", latency)
+            if usage is not None:
+                LLM_TOKENS.inc(usage.prompt_tokens, kind="prompt")
+                LLM_TOKENS.inc(usage.completion_tokens, kind="completion")
+                record_stage("prompt_tokens", usage.prompt_tokens)
+                record_stage("completion_tokens", usage.completion_tokens)
+                if self.ledger is not None:
+                    self.ledger.record(
+                        self.deployment_name, usage.prompt_tokens, usage.completion_tokens, latency,
+                        price(self.usage_settings, usage.prompt_tokens, usage.completion_tokens),
+                        **current_labels()
+                    )
+            logger.info(f"Received response from Azure OpenAI API in {latency:.1f}s.")
+            return normalize_report(json.loads(content))
         except Exception as e:
             logger.error(f"Azure OpenAI error: {str(e)}")
-            return f"Error in quality check: {str(e)}"
-    def generate_reports(self, transcript_path: str, mentor_materials_path: str, reports_dir: str, drive_folder_id: str, only_base_names=None):
+            return empty_report(error=str(e))
+
+    def _consume_stream(self, response, start: float):
+        """Collect a streamed completion, publishing the text to the progress bus as it arrives.
+
+        Returns (content, usage); usage comes in the final chunk (stream_options.include_usage).
+        """
+        bus = get_bus()
+        parts, usage = [], None
+        for chunk in response:
+            check_cancelled()
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            # Azure sends a leading chunk with only content-filter results and no choices
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if not parts:
+                first_token = time.perf_counter() - start
+                LLM_FIRST_TOKEN_SECONDS.observe(first_token, model=self.deployment_name)
+                record_stage("llm_first_token", first_token)
+            parts.append(delta)
+            bus.append_text("report", delta, chunks=len(parts))
+        return "".join(parts), usage
+
+    def save_report(self, base_name: str, report: Dict, reports_dir: str, material_type: str = "") -> Optional[str]:
+        """Write report_{base_name}.json and the rendered .txt, and index the result.
+
+        A failed quality check (report["error"]) writes nothing and returns None, so
+        an earlier good report is kept and the video is not taken as reported.
+        """
+        if report.get("error"):
+            return None
+        text_path = os.path.join(reports_dir, f"report_{base_name}.txt")
+        json_path = os.path.join(reports_dir, f"report_{base_name}.json")
+        generated_at = time.time()
+
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(render_report_text(report))
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "base_name": base_name,
+                "material_type": material_type,
+                "model": self.deployment_name,
+                "generated_at": generated_at,
+                "report": report
+            }, f, ensure_ascii=False, indent=2)
+        if self.report_index is not None:
+            self.report_index.upsert(
+                base_name, report,
+                json_path=json_path,
+                text_path=text_path,
+                material_type=material_type,
+                model=self.deployment_name,
+                generated_at=generated_at
+            )
+        return text_path
+    def _read_material(self, path: str) -> str:
+        """A video's mentor material text ("" if there is none), cut to max_material_chars."""
+        if not os.path.exists(path):
+            return ""
+        with open(path, 'r', encoding='utf-8') as f:
+            if self.max_material_chars is None:
+                return f.read()
+            content = f.read(self.max_material_chars + 1)
+        if len(content) > self.max_material_chars:
+            logger.warning(f"Mentor material {os.path.basename(path)} cut to {self.max_material_chars} characters")
+            content = content[:self.max_material_chars]
+        return content
+
+    def generate_reports(self, transcript_path: str, mentor_materials_path: str, reports_dir: str, reports_location: str, only_base_names=None,
+                         material_names: Dict[str, str] = None) -> Dict[str, str]:
+        """Report every transcript in transcript_path (or only_base_names).
+
+        Returns {base_name: error} for the transcripts whose quality check failed;
+        those get no report file and nothing is uploaded for them.
+        A video's mentor material is {base_name}.txt; material_names maps a base name to
+        a fallback, the video's own file stem, for nested videos whose base name carries
+        a folder prefix ("module-1__lecture") that the uploaded material's name does not.
+        """
         os.makedirs(reports_dir, exist_ok=True)
+        material_names = material_names or {}
         
-        # Get all transcript files
+        # Get all transcript files (each is read only while its report is generated)
         video_transcripts = []
         for file_path in glob.glob(os.path.join(transcript_path, "*.txt")):
             base_name = os.path.splitext(os.path.basename(file_path))[0]
             if only_base_names and base_name not in only_base_names:
                 continue
-            with open(file_path, 'r', encoding='utf-8') as f:
-                video_transcripts.append({
-                    "path": file_path,
-                    "content": f.read(),
-                    "base_name": base_name
-                })
+            video_transcripts.append({"path": file_path, "base_name": base_name})
 
         if not video_transcripts:
             logger.error("No video transcripts found!")
-            return
-
-        # Get mentor materials
-        mentor_contents: Dict[str, str] = {}
-        for file_path in glob.glob(os.path.join(mentor_materials_path, "*.txt")):
-            base_name = os.path.splitext(os.path.basename(file_path))[0]
-            with open(file_path, 'r', encoding='utf-8') as f:
-                mentor_contents[base_name] = f.read()
-
-        # Prepare Drive manager for report uploads
-        gdrive = GoogleDriveManager()
+            return {}
 
         # Generate reports
+        uploads, failures = [], {}
         for video in video_transcripts:
             base_name = video["base_name"]
             logger.info(f"Generating report for: {base_name}")
             
-            material_content = mentor_contents.get(base_name, "")
+            material_path = os.path.join(mentor_materials_path, f"{base_name}.txt")
+            if not os.path.exists(material_path) and base_name in material_names:
+                material_path = os.path.join(mentor_materials_path, f"{material_names[base_name]}.txt")
+            material_content = self._read_material(material_path)
             material_type = ""
             
             if "slide" in base_name.lower():
@@ -162,28 +297,38 @@ class ReportGenerator:
             elif "notebook" in base_name.lower():
                 material_type = "notebook"
             
+            transcript, stats = render_transcript_file(video["path"], self.transcript_settings)
+            TRANSCRIPT_TOKENS_SAVED.inc(stats["raw_tokens"] - stats["compact_tokens"])
+            logger.info(
+                f"Transcript {base_name}: ~{stats['compact_tokens']} tokens (raw ~{stats['raw_tokens']})",
+                extra=stats
+            )
             report = self.quality_check(
-                video["content"], 
+                transcript, 
                 material_type, 
                 material_content
             )
 
-            report_file = os.path.join(reports_dir, f"report_{base_name}.txt")
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write(report)
+            report_file = self.save_report(base_name, report, reports_dir, material_type)
+            if report_file is None:
+                logger.error(f"No report for {base_name}: {report['error']}")
+                failures[base_name] = report["error"]
+                continue
             logger.info(f"Report saved to {report_file}")
 
-            # --- Ensure no duplicate in Drive: delete if exists, then upload ---
-            # drive_folder_id is now passed as an argument
-
-            # Find and delete duplicate in Drive
-            drive_file_id = gdrive.find_file_by_name(drive_folder_id, f"report_{base_name}.txt")
-            if drive_file_id:
-                gdrive.delete_file(drive_file_id)
-                logger.info(f"Deleted duplicate report in Drive: report_{base_name}.txt")
-
-            # Upload new report
-            gdrive.upload_file(report_file, drive_folder_id, "text/plain")
-            logger.info(f"Uploaded report to Drive: report_{base_name}.txt")
+            # Replace any previous copy in storage (report text and structured JSON)
+            if self.storage is not None:
+                files = [(report_file, "text/plain"),
+                         (os.path.join(reports_dir, f"report_{base_name}.json"), "application/json")]
+                for path, mime_type in files:
+                    if self.uploader is not None:
+                        uploads.append(self.uploader.submit(path, reports_location, mime_type, replace=True))
+                    else:
+                        self.storage.replace(path, reports_location, mime_type)
+                        logger.info(f"Uploaded report: {os.path.basename(path)}")
 
-            time.sleep(2)  # Avoid rate limiting
\ No newline at end of file
+        # Uploads overlap the following reports; all are stored before returning
+        if uploads:
+            self.uploader.wait(uploads)
+            logger.info(f"Uploaded {len(uploads)} report file(s)")
+        return failures
\ No newline at end of file
@@ -0,0 +1,133 @@
+# src/report_generation/report_schema.py
+import re
+from typing import Dict, Optional
+
+STATUS_SYMBOLS = {"pass": "✅", "fail": "❌", "na": "N/A"}
+
+# JSON schema sent to Azure OpenAI as a strict structured-output format
+REPORT_SCHEMA = {
+    "name": "qc_report",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["items", "what_went_wrong", "how_to_improve"],
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["id", "status", "justification", "evidence", "timestamps"],
+                    "properties": {
+                        "id": {"type": "string", "description": "Checklist sub-item id, e.g. 1a"},
+                        "status": {"type": "string", "enum": ["pass", "fail", "na"]},
+                        "justification": {"type": "string"},
+                        "evidence": {"type": "string"},
+                        "timestamps": {"type": "array", "items": {"type": "string"}}
+                    }
+                }
+            },
+            "what_went_wrong": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["id", "description", "evidence", "timestamps", "impact"],
+                    "properties": {
+                        "id": {"type": "string"},
+                        "description": {"type": "string"},
+                        "evidence": {"type": "string"},
+                        "timestamps": {"type": "array", "items": {"type": "string"}},
+                        "impact": {"type": "string"}
+                    }
+                }
+            },
+            "how_to_improve": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["id", "solution", "implementation", "expected_outcome"],
+                    "properties": {
+                        "id": {"type": "string"},
+                        "solution": {"type": "string"},
+                        "implementation": {"type": "string"},
+                        "expected_outcome": {"type": "string"}
+                    }
+                }
+            }
+        }
+    }
+}
+
+def empty_report(error: Optional[str] = None) -> Dict:
+    report = {"items": [], "what_went_wrong": [], "how_to_improve": []}
+    if error:
+        report["error"] = error
+    return report
+
+def normalize_report(data: Dict) -> Dict:
+    """Coerce a parsed model response into the report shape, dropping unknown fields."""
+    report = empty_report()
+    for item in data.get("items", []):
+        status = str(item.get("status", "")).strip().lower()
+        if status not in STATUS_SYMBOLS:
+            status = "na"
+        report["items"].append({
+            "id": str(item.get("id", "")).strip().lower(),
+            "status": status,
+            "justification": item.get("justification", ""),
+            "evidence": item.get("evidence", ""),
+            "timestamps": list(item.get("timestamps", []))
+        })
+    for issue in data.get("what_went_wrong", []):
+        report["what_went_wrong"].append({
+            "id": str(issue.get("id", "")).strip().lower(),
+            "description": issue.get("description", ""),
+            "evidence": issue.get("evidence", ""),
+            "timestamps": list(issue.get("timestamps", [])),
+            "impact": issue.get("impact", "")
+        })
+    for fix in data.get("how_to_improve", []):
+        report["how_to_improve"].append({
+            "id": str(fix.get("id", "")).strip().lower(),
+            "solution": fix.get("solution", ""),
+            "implementation": fix.get("implementation", ""),
+            "expected_outcome": fix.get("expected_outcome", "")
+        })
+    report["items"].sort(key=lambda i: _item_sort_key(i["id"]))
+    return report
+
+def _item_sort_key(item_id: str):
+    match = re.match(r"(\d+)([a-z]*)", item_id)
+    if not match:
+        return (10 ** 6, item_id)
+    return (int(match.group(1)), match.group(2))
+
+def render_report_text(report: Dict) -> str:
+    """Render a structured report in the plain-text layout the UI and Drive copies use."""
+    if report.get("error"):
+        return f"Error in quality check: {report['error']}"
+
+    lines = ["[Checklist Evaluation]"]
+    for item in report["items"]:
+        lines.append(f"{item['id']}: {STATUS_SYMBOLS[item['status']]} {item['justification']}")
+
+    lines.append("")
+    lines.append("What Went Wrong:")
+    for issue in report["what_went_wrong"]:
+        lines.append(f"- {issue['id']}: {issue['description']}")
+        evidence = issue["evidence"]
+        if issue["timestamps"]:
+            evidence = f"{evidence} ({', '.join(issue['timestamps'])})"
+        lines.append(f"Evidence: {evidence}")
+        lines.append(f"Impact: {issue['impact']}")
+
+    lines.append("")
+    lines.append("How to Improve:")
+    for fix in report["how_to_improve"]:
+        lines.append(f"- {fix['id']}: {fix['solution']}")
+        lines.append(f"Implementation: {fix['implementation']}")
+        lines.append(f"Outcome: {fix['expected_outcome']}")
+    return "\n".join(lines)
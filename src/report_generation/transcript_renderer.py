@@ -0,0 +1,132 @@
+# src/report_generation/transcript_renderer.py
+import re
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "FORMAT": "compact",
+    "PARAGRAPH_SECONDS": 60,
+    "PAUSE_SECONDS": 3.0,
+    "STRIP_FILLERS": True
+}
+
+# Hesitation sounds only; words like "so" or "basically" carry meaning often enough to keep
+FILLER_PATTERN = re.compile(r"\b(u+m+|u+h+m*|h+m+|a+h+|e+r+m+|e+r|m{2,})\b[,.]?\s*", re.IGNORECASE)
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+def format_timestamp(seconds: float) -> str:
+    """M:SS, the form the report schema asks for."""
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+def iter_tsv(lines: Iterable[str]) -> Iterator[Tuple[float, float, str]]:
+    """(start, end, text) rows from lines of the TSV TranscriptGenerator writes, as they are read.
+
+    Text with no TSV rows at all is yielded as one row (only then are its lines kept).
+    """
+    plain = []
+    seen_rows = False
+    for line in lines:
+        parts = line.split("\t")
+        try:
+            if len(parts) < 4:
+                raise ValueError(line)
+            row = (float(parts[0]), float(parts[1]), parts[3].strip())
+        except ValueError:
+            if not seen_rows:
+                plain.append(line)  # header, or not a TSV transcript
+            continue
+        seen_rows, plain = True, None
+        yield row
+    if not seen_rows and "".join(plain).strip():
+        yield 0.0, 0.0, "".join(plain).strip()
+
+def parse_tsv(tsv: str) -> List[Tuple[float, float, str]]:
+    """(start, end, text) rows from the TSV TranscriptGenerator writes; non-TSV text is one row."""
+    return list(iter_tsv(tsv.splitlines(keepends=True)))
+
+def render_compact(tsv: Union[str, Iterable[str]], settings: Dict = None) -> Tuple[str, Dict]:
+    """Token-lean transcript for the quality-check prompt, and stats on what was saved.
+
+    The stored TSV repeats start/end times and a constant speaker label on every
+    sentence. Here sentences are merged into paragraphs, each opened by a single
+    [M:SS] timestamp; a paragraph ends after PARAGRAPH_SECONDS or at a pause of
+    PAUSE_SECONDS. With STRIP_FILLERS, hesitation sounds are counted into a
+    header line (checklist item 3b needs the count, not every occurrence) and
+    removed from the text.
+
+    tsv may be the whole text or an iterable of its lines (e.g. an open file), in
+    which case rows are rendered as they are read and the raw text is never held.
+    """
+    settings = dict(DEFAULTS, **(settings or {}))
+    if isinstance(tsv, str):
+        tsv = tsv.splitlines(keepends=True)
+    raw_chars = [0]
+
+    def counted(lines):
+        for line in lines:
+            raw_chars[0] += len(line)
+            yield line
+
+    lines = []
+    fillers = Counter()
+    paragraph, paragraph_start, last_end = [], None, None
+    final_end = 0.0
+    for start, end, text in iter_tsv(counted(tsv)):
+        final_end = end
+        if settings["STRIP_FILLERS"]:
+            for match in FILLER_PATTERN.finditer(text):
+                fillers[match.group(1).lower()] += 1
+            text = FILLER_PATTERN.sub("", text).strip()
+        if not text:
+            continue
+        new_paragraph = (paragraph_start is None
+                         or start - paragraph_start >= settings["PARAGRAPH_SECONDS"]
+                         or start - last_end >= settings["PAUSE_SECONDS"])
+        if new_paragraph and paragraph:
+            lines.append(f"[{format_timestamp(paragraph_start)}] {' '.join(paragraph)}")
+            paragraph = []
+        if not paragraph:
+            paragraph_start = start
+        paragraph.append(text)
+        last_end = end
+    if paragraph:
+        lines.append(f"[{format_timestamp(paragraph_start)}] {' '.join(paragraph)}")
+    if fillers:
+        minutes = max(final_end / 60, 1 / 60)
+        total = sum(fillers.values())
+        breakdown = ", ".join(f"{word} {count}" for word, count in fillers.most_common())
+        lines.insert(0, f"Filler words (removed from the text below): {total} total, "
+                        f"{total / minutes:.1f} per minute ({breakdown})")
+
+    compact = "\n".join(lines)
+    stats = {
+        "raw_chars": raw_chars[0],
+        "compact_chars": len(compact),
+        "raw_tokens": max(1, raw_chars[0] // 4),
+        "compact_tokens": estimate_tokens(compact),
+        "fillers": sum(fillers.values())
+    }
+    return compact, stats
+
+def render_transcript(tsv: Union[str, Iterable[str]], settings: Dict = None) -> Tuple[str, Dict]:
+    """Transcript text for the prompt in the configured REPORT.TRANSCRIPT.FORMAT ("compact" or "raw")."""
+    settings = dict(DEFAULTS, **(settings or {}))
+    if not isinstance(tsv, str) and settings["FORMAT"] == "raw":
+        tsv = "".join(tsv)
+    if settings["FORMAT"] == "raw":
+        tokens = estimate_tokens(tsv)
+        return tsv, {"raw_chars": len(tsv), "compact_chars": len(tsv),
+                     "raw_tokens": tokens, "compact_tokens": tokens, "fillers": 0}
+    return render_compact(tsv, settings)
+
+def render_transcript_file(path: str, settings: Dict = None) -> Tuple[str, Dict]:
+    """render_transcript of a stored transcript, read line by line."""
+    with open(path, "r", encoding="utf-8") as f:
+        return render_transcript(f, settings)
@@ -0,0 +1,71 @@
+# src/resources.py
+"""Process-wide singletons for expensive objects (Whisper models, OpenAI clients).
+
+Streamlit reruns, embedded workers and CLI workers all share one instance
+per process instead of rebuilding it for every rerun, job or video. Heavy
+libraries are imported on first use, not when this module is imported.
+"""
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_instances = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+def get_or_create(key, factory):
+    """Return the instance cached under key, building it once (concurrent callers wait)."""
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    with _registry_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        instance = _instances.get(key)
+        if instance is None:
+            logger.info(f"Creating shared resource {key}")
+            instance = _instances[key] = factory()
+    return instance
+
+def get_transcript_generator(model_size: str = "base.en", compute_type: str = "int8", beam_size: int = 5,
+                             refine: dict = None, window_seconds: float = 600):
+    def build():
+        from src.preprocessing.transcript_generator import TranscriptGenerator
+        return TranscriptGenerator(model_size=model_size, compute_type=compute_type, beam_size=beam_size, refine=refine,
+                                   window_seconds=window_seconds)
+    key = ("transcript_generator", model_size, compute_type, beam_size, json.dumps(refine, sort_keys=True),
+           window_seconds)
+    return get_or_create(key, build)
+
+def get_openai_client(config_path: str):
+    def build():
+        from src.report_generation.openai_client import OpenAIClient
+        return OpenAIClient(config_path)
+    return get_or_create(("openai_client", os.path.abspath(config_path)), build)
+
+def get_transcription_scheduler(config: dict = None):
+    """The process's TranscriptionScheduler (sized by the first caller's config["SCHEDULER"])."""
+    def build():
+        from src.jobs.scheduler import TranscriptionScheduler
+        settings = (config or {}).get("SCHEDULER", {})
+        return TranscriptionScheduler(
+            slots=settings.get("TRANSCRIPTION_SLOTS", 1),
+            starvation_seconds=settings.get("STARVATION_SECONDS", 1800)
+        )
+    return get_or_create("transcription_scheduler", build)
+
+def get_scratch_manager(config: dict = None):
+    """The process's ScratchManager (configured by the first caller's config["SCRATCH"])."""
+    def build():
+        from src.jobs.scratch import ScratchManager
+        settings = (config or {}).get("SCRATCH", {})
+        return ScratchManager(
+            settings.get("ROOT", "scratch"),
+            quota_bytes=int(settings.get("QUOTA_GB", 20) * 1024 ** 3),
+            min_free_bytes=int(settings.get("MIN_FREE_GB", 2) * 1024 ** 3),
+            max_age_seconds=settings.get("MAX_AGE_HOURS", 24) * 3600
+        )
+    return get_or_create("scratch_manager", build)
@@ -0,0 +1,176 @@
+# src/state/job_queue.py
+import json
+import time
+import uuid
+import logging
+from typing import Dict, List, Optional
+from .store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class JobQueue(SQLiteStore):
+    """Durable job queue shared by the Streamlit app, the CLI and any number of workers.
+
+    Workers claim jobs under a lease that they renew with heartbeats; a job whose
+    lease expires (worker crashed or host went away) becomes claimable again.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        folder_url TEXT NOT NULL,
+        video_type TEXT NOT NULL,
+        mentor_files TEXT NOT NULL DEFAULT '{}',
+        user TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT 'queued',
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT NOT NULL DEFAULT '',
+        results TEXT NOT NULL DEFAULT '[]',
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker_id TEXT,
+        lease_expires REAL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at);
+    """
+    COLUMNS = {"jobs": {"plan": "TEXT", "token_budget": "INTEGER"}}
+    MAX_ATTEMPTS = 3
+
+    def submit(self, folder_url: str, video_type: str, mentor_files: Dict[str, str] = None,
+               user: str = "", job_id: str = None, token_budget: int = None) -> str:
+        """Queue a folder; token_budget caps the LLM tokens the run may spend on reports."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute(
+                """INSERT INTO jobs (id, folder_url, video_type, mentor_files, user, created_at, token_budget)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, folder_url, video_type, json.dumps(mentor_files or {}), user, time.time(),
+                 token_budget or None)
+            )
+        logger.info(f"Queued job {job_id} for {folder_url}")
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float = 300) -> Optional[Dict]:
+        """Atomically take the next queued job (or one whose lease has expired).
+
+        Jobs are shared fairly between users: the oldest job of the user with the
+        fewest running jobs goes first, so one user's batch cannot hold every worker.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # A lease that expired on the last allowed attempt will never be reclaimed: fail it
+            # here so it does not sit in 'running' forever
+            exhausted = conn.execute(
+                """UPDATE jobs SET status = 'failed', finished_at = ?, lease_expires = NULL,
+                   error = COALESCE(error, ?)
+                   WHERE status = 'running' AND lease_expires < ? AND attempts >= ?""",
+                (now, f"Worker lost its lease on the last of {self.MAX_ATTEMPTS} attempts", now, self.MAX_ATTEMPTS)
+            )
+            if exhausted.rowcount:
+                logger.warning(f"Failed {exhausted.rowcount} job(s) whose lease expired on their last attempt")
+            row = conn.execute(
+                """SELECT * FROM jobs
+                   WHERE (status = 'queued' OR (status = 'running' AND lease_expires < ?))
+                     AND attempts < ?
+                   ORDER BY (SELECT COUNT(*) FROM jobs AS running
+                             WHERE running.user = jobs.user AND running.status = 'running'
+                               AND running.lease_expires >= ?),
+                            created_at
+                   LIMIT 1""",
+                (now, self.MAX_ATTEMPTS, now)
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == "running":
+                logger.warning(f"Reclaiming job {row['id']} from expired worker {row['worker_id']}")
+            conn.execute(
+                """UPDATE jobs SET status = 'running', worker_id = ?, lease_expires = ?,
+                   attempts = attempts + 1, started_at = COALESCE(started_at, ?)
+                   WHERE id = ?""",
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = 300,
+                  progress: float = None, message: str = None) -> bool:
+        """Renew the lease and record progress; returns False if the job was taken away or cancelled."""
+        sets, params = ["lease_expires = ?"], [time.time() + lease_seconds]
+        if progress is not None:
+            sets.append("progress = ?")
+            params.append(progress)
+        if message is not None:
+            sets.append("message = ?")
+            params.append(message)
+        params.extend([job_id, worker_id])
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {', '.join(sets)} WHERE id = ? AND worker_id = ? AND status = 'running'",
+                params
+            )
+        return cursor.rowcount == 1
+
+    def add_result(self, job_id: str, result: Dict):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT results FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            results = json.loads(row["results"]) if row else []
+            results.append(result)
+            conn.execute("UPDATE jobs SET results = ? WHERE id = ?", (json.dumps(results), job_id))
+
+    def set_plan(self, job_id: str, plan: Dict):
+        """Preflight plan for the job (video count, rejections, ETA)."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET plan = ? WHERE id = ?", (json.dumps(plan), job_id))
+
+    def complete(self, job_id: str, worker_id: str):
+        self._finish(job_id, worker_id, "succeeded", None)
+
+    def fail(self, job_id: str, worker_id: str, error: str):
+        self._finish(job_id, worker_id, "failed", error)
+
+    def _finish(self, job_id: str, worker_id: str, status: str, error: Optional[str]):
+        with self._transaction() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires = NULL,
+                   progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END
+                   WHERE id = ? AND worker_id = ? AND status = 'running'""",
+                (status, error, time.time(), status, job_id, worker_id)
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = 'cancelled', finished_at = ?, lease_expires = NULL
+                   WHERE id = ? AND status IN ('queued', 'running')""",
+                (time.time(), job_id)
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._decode(rows[0]) if rows else None
+
+    def list_jobs(self, user: str = None, statuses=None, limit: int = 50) -> List[Dict]:
+        sql = "SELECT * FROM jobs"
+        clauses, params = [], []
+        if user is not None:
+            clauses.append("user = ?")
+            params.append(user)
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._decode(row) for row in self._query(sql, params)]
+
+    @staticmethod
+    def _decode(row: Dict) -> Dict:
+        row["mentor_files"] = json.loads(row["mentor_files"])
+        row["results"] = json.loads(row["results"])
+        row["plan"] = json.loads(row["plan"]) if row.get("plan") else None
+        return row
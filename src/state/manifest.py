@@ -0,0 +1,126 @@
+# src/state/manifest.py
+import os
+import time
+import hashlib
+import logging
+from typing import Dict, List, Optional
+from .store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in order; a video's stage is the last one it completed
+STAGES = ["DISCOVERED", "DOWNLOADED", "AUDIO_EXTRACTED", "TRANSCRIBED", "UPLOADED", "REPORTED"]
+
+def stage_reached(record: Optional[Dict], stage: str) -> bool:
+    return record is not None and STAGES.index(record["stage"]) >= STAGES.index(stage)
+
+def file_checksum(path: str, algorithm: str = "md5", chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def artifact_ok(path: Optional[str], checksum: Optional[str]) -> bool:
+    """True if a recorded local artifact is still on disk and unchanged."""
+    if not path or not os.path.exists(path):
+        return False
+    return checksum is None or file_checksum(path) == checksum
+
+class VideoManifest(SQLiteStore):
+    """Tracks each video through the pipeline stages with its artifacts and checksums."""
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS videos (
+        video_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        base_name TEXT NOT NULL,
+        folder_id TEXT,
+        stage TEXT NOT NULL DEFAULT 'DISCOVERED',
+        source_md5 TEXT,
+        video_path TEXT,
+        video_md5 TEXT,
+        audio_path TEXT,
+        audio_md5 TEXT,
+        audio_drive_id TEXT,
+        transcript_path TEXT,
+        transcript_md5 TEXT,
+        transcript_drive_id TEXT,
+        report_path TEXT,
+        error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_videos_base_name ON videos(base_name);
+    CREATE INDEX IF NOT EXISTS idx_videos_folder_stage ON videos(folder_id, stage);
+    """
+    COLUMNS = {"videos": {"duration": "REAL"}}
+    FIELDS = {
+        "duration", "video_path", "video_md5", "audio_path", "audio_md5", "audio_drive_id", "transcript_path",
+        "transcript_md5", "transcript_drive_id", "report_path", "source_md5", "error"
+    }
+
+    def set_duration(self, video_id: str, duration: float):
+        """Recording length in seconds, used to schedule shorter videos first."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE videos SET duration = ? WHERE video_id = ?", (duration, video_id))
+
+    def discover(self, video: Dict, folder_id: str = None) -> Dict:
+        """Register a listed video (no-op if already known) and return its record."""
+        base_name = video.get("base_name") or os.path.splitext(video["name"])[0]
+        with self._transaction() as conn:
+            conn.execute(
+                """INSERT OR IGNORE INTO videos (video_id, name, base_name, folder_id, source_md5, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (video["id"], video["name"], base_name, folder_id, video.get("md5Checksum"), time.time())
+            )
+        return self.get(video["id"])
+
+    def advance(self, video_id: str, stage: str, **artifacts) -> Dict:
+        """Record that a stage completed, along with the artifacts it produced."""
+        unknown = set(artifacts) - self.FIELDS
+        if unknown:
+            raise ValueError(f"Unknown manifest fields: {sorted(unknown)}")
+        sets = ["stage = ?", "updated_at = ?", "error = NULL"]
+        params = [stage, time.time()]
+        for key, value in artifacts.items():
+            sets.append(f"{key} = ?")
+            params.append(value)
+        params.append(video_id)
+        with self._transaction() as conn:
+            conn.execute(f"UPDATE videos SET {', '.join(sets)} WHERE video_id = ?", params)
+        logger.info(f"Video {video_id} reached {stage}")
+        return self.get(video_id)
+
+    def set_artifacts(self, video_id: str, **artifacts) -> Dict:
+        """Record artifacts produced after a stage completed (e.g. a background upload) without moving the stage."""
+        unknown = set(artifacts) - self.FIELDS
+        if unknown:
+            raise ValueError(f"Unknown manifest fields: {sorted(unknown)}")
+        sets = ["updated_at = ?"] + [f"{key} = ?" for key in artifacts]
+        params = [time.time(), *artifacts.values(), video_id]
+        with self._transaction() as conn:
+            conn.execute(f"UPDATE videos SET {', '.join(sets)} WHERE video_id = ?", params)
+        return self.get(video_id)
+
+    def record_error(self, video_id: str, error: str):
+        with self._transaction() as conn:
+            conn.execute("UPDATE videos SET error = ?, updated_at = ? WHERE video_id = ?",
+                         (error, time.time(), video_id))
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM videos WHERE video_id = ?", (video_id,))
+        return rows[0] if rows else None
+
+    def find_by_base_name(self, base_name: str) -> Optional[Dict]:
+        """Most advanced record for a base name (a re-uploaded video gets a new Drive id)."""
+        rows = self._query("SELECT * FROM videos WHERE base_name = ?", (base_name,))
+        if not rows:
+            return None
+        return max(rows, key=lambda r: (STAGES.index(r["stage"]), r["updated_at"]))
+
+    def unfinished(self, folder_id: str) -> List[Dict]:
+        """Videos from a folder that started but did not finish (their source may already be gone from Drive)."""
+        return self._query(
+            """SELECT * FROM videos WHERE folder_id = ? AND stage NOT IN ('DISCOVERED', 'REPORTED')
+               ORDER BY updated_at""",
+            (folder_id,)
+        )
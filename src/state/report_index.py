@@ -0,0 +1,153 @@
+# src/state/report_index.py
+import os
+import json
+import glob
+import time
+import logging
+from typing import Dict, List, Optional
+from .store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+class ReportIndex(SQLiteStore):
+    """Queryable index over every structured report produced by the pipeline."""
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS reports (
+        base_name TEXT PRIMARY KEY,
+        material_type TEXT,
+        model TEXT,
+        generated_at REAL NOT NULL,
+        json_path TEXT,
+        text_path TEXT,
+        passed INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        not_applicable INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS report_items (
+        base_name TEXT NOT NULL,
+        item_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        justification TEXT,
+        evidence TEXT,
+        timestamps TEXT,
+        PRIMARY KEY (base_name, item_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_report_items_item_status ON report_items(item_id, status);
+    CREATE INDEX IF NOT EXISTS idx_reports_generated_at ON reports(generated_at);
+    """
+
+    def upsert(self, base_name: str, report: Dict, json_path: str = None, text_path: str = None,
+               material_type: str = "", model: str = "", generated_at: float = None):
+        items = report.get("items", [])
+        counts = {"pass": 0, "fail": 0, "na": 0}
+        for item in items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM report_items WHERE base_name = ?", (base_name,))
+            conn.execute(
+                """INSERT OR REPLACE INTO reports
+                   (base_name, material_type, model, generated_at, json_path, text_path, passed, failed, not_applicable)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (base_name, material_type, model, generated_at or time.time(), json_path, text_path,
+                 counts["pass"], counts["fail"], counts["na"])
+            )
+            conn.executemany(
+                """INSERT OR REPLACE INTO report_items
+                   (base_name, item_id, status, justification, evidence, timestamps)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [(base_name, item["id"], item["status"], item.get("justification", ""),
+                  item.get("evidence", ""), json.dumps(item.get("timestamps", []))) for item in items]
+            )
+
+    def list_reports(self, since: float = None, until: float = None, failed_item: str = None,
+                     limit: int = 1000) -> List[Dict]:
+        """List reports, optionally only those generated in a window or failing a given item."""
+        sql = "SELECT r.* FROM reports r"
+        clauses, params = [], []
+        if failed_item:
+            sql += " JOIN report_items i ON i.base_name = r.base_name"
+            clauses.append("i.item_id = ? AND i.status = 'fail'")
+            params.append(failed_item.lower())
+        if since is not None:
+            clauses.append("r.generated_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.generated_at < ?")
+            params.append(until)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY r.generated_at DESC LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+    def query_items(self, item_id: Optional[str] = None, status: Optional[str] = None,
+                    since: float = None, until: float = None) -> List[Dict]:
+        sql = """SELECT i.*, r.generated_at FROM report_items i
+                 JOIN reports r ON r.base_name = i.base_name"""
+        clauses, params = [], []
+        if item_id:
+            clauses.append("i.item_id = ?")
+            params.append(item_id.lower())
+        if status:
+            clauses.append("i.status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("r.generated_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.generated_at < ?")
+            params.append(until)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY r.generated_at DESC"
+        rows = self._query(sql, params)
+        for row in rows:
+            row["timestamps"] = json.loads(row["timestamps"] or "[]")
+        return rows
+
+    def item_summary(self, since: float = None, until: float = None) -> List[Dict]:
+        """Per checklist item pass/fail/N/A counts across the indexed reports."""
+        sql = """SELECT i.item_id,
+                        SUM(i.status = 'pass') AS passed,
+                        SUM(i.status = 'fail') AS failed,
+                        SUM(i.status = 'na') AS not_applicable
+                 FROM report_items i JOIN reports r ON r.base_name = i.base_name"""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("r.generated_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.generated_at < ?")
+            params.append(until)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY i.item_id ORDER BY i.item_id"
+        return self._query(sql, params)
+
+    def index_file(self, json_path: str) -> bool:
+        """Index one report_<base_name>.json (e.g. just synced from Drive); False if it can't be read."""
+        base_name = os.path.splitext(os.path.basename(json_path))[0][len("report_"):]
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable report {json_path}: {e}")
+            return False
+        text_path = os.path.splitext(json_path)[0] + ".txt"
+        self.upsert(
+            base_name,
+            data.get("report", {}),
+            json_path=json_path,
+            text_path=text_path if os.path.exists(text_path) else None,
+            material_type=data.get("material_type", ""),
+            model=data.get("model", ""),
+            generated_at=data.get("generated_at") or os.path.getmtime(json_path)
+        )
+        return True
+
+    def rebuild(self, reports_dir: str) -> int:
+        """Index every report_*.json in reports_dir."""
+        indexed = sum(1 for json_path in glob.glob(os.path.join(reports_dir, "report_*.json"))
+                      if self.index_file(json_path))
+        logger.info(f"Indexed {indexed} reports from {reports_dir}")
+        return indexed
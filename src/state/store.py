@@ -0,0 +1,65 @@
+# src/state/store.py
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class SQLiteStore:
+    """Base class for the local SQLite-backed state stores.
+
+    Each thread gets its own connection; WAL mode lets readers (the UI) run
+    while a writer (the pipeline) is committing.
+    """
+    SCHEMA = ""
+    # Columns added after a table first shipped: {table: {column: declaration}}
+    COLUMNS = {}
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        if self.SCHEMA:
+            conn.executescript(self.SCHEMA)
+        self._add_missing_columns(conn)
+
+    def _add_missing_columns(self, conn: sqlite3.Connection):
+        """CREATE TABLE IF NOT EXISTS leaves old tables alone, so add newer columns explicitly."""
+        for table, columns in self.COLUMNS.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, declaration in columns.items():
+                if column not in existing:
+                    logger.info(f"Adding column {table}.{column}")
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run a block inside BEGIN IMMEDIATE so concurrent writers serialize."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            # Including JobCancelled and KeyboardInterrupt: an open transaction keeps the write lock
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def _query(self, sql: str, params=()):
+        return [dict(row) for row in self._connect().execute(sql, params).fetchall()]
@@ -0,0 +1,47 @@
+# src/state/sync_index.py
+import time
+from typing import Dict, Optional
+from .store import SQLiteStore
+
+class SyncIndex(SQLiteStore):
+    """Remote version (modifiedTime/md5Checksum) of every report copied to local disk."""
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS synced_reports (
+        name TEXT PRIMARY KEY,
+        object_id TEXT NOT NULL,
+        md5 TEXT,
+        modified_time TEXT,
+        local_path TEXT NOT NULL,
+        synced_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sync_state (
+        location TEXT PRIMARY KEY,
+        high_water_mark TEXT,
+        last_full_sync REAL
+    );
+    """
+
+    def entries(self) -> Dict[str, Dict]:
+        return {row["name"]: row for row in self._query("SELECT * FROM synced_reports")}
+
+    def record(self, remote: Dict, local_path: str):
+        with self._transaction() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO synced_reports (name, object_id, md5, modified_time, local_path, synced_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (remote["name"], remote["id"], remote.get("md5Checksum"), remote.get("modifiedTime"),
+                 local_path, time.time())
+            )
+
+    def state(self, location: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM sync_state WHERE location = ?", (location,))
+        return rows[0] if rows else None
+
+    def save_state(self, location: str, high_water_mark: Optional[str], full_sync: bool):
+        with self._transaction() as conn:
+            previous = conn.execute("SELECT last_full_sync FROM sync_state WHERE location = ?", (location,)).fetchone()
+            last_full_sync = time.time() if full_sync else (previous["last_full_sync"] if previous else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (location, high_water_mark, last_full_sync) VALUES (?, ?, ?)",
+                (location, high_water_mark, last_full_sync)
+            )
@@ -0,0 +1,109 @@
+# src/state/usage_ledger.py
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from .store import SQLiteStore
+
+# Run and video an LLM call is made for; set by MainFlow and inherited by its worker threads
+_usage_labels: contextvars.ContextVar = contextvars.ContextVar("qc_usage_labels", default={})
+
+LABELS = ("run_id", "folder_id", "video_id", "base_name", "audio_seconds")
+
+@contextmanager
+def usage_labels(**labels):
+    """Attribute LLM usage recorded inside the block to these labels (see LABELS)."""
+    token = _usage_labels.set({**_usage_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _usage_labels.reset(token)
+
+def current_labels() -> Dict:
+    return {key: value for key, value in _usage_labels.get().items() if key in LABELS}
+
+class UsageLedger(SQLiteStore):
+    """Tokens, latency and cost of every LLM call, queryable per video, per run and per day."""
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS llm_usage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at REAL NOT NULL,
+        day TEXT NOT NULL,
+        run_id TEXT,
+        folder_id TEXT,
+        video_id TEXT,
+        base_name TEXT,
+        audio_seconds REAL,
+        model TEXT,
+        prompt_tokens INTEGER NOT NULL DEFAULT 0,
+        completion_tokens INTEGER NOT NULL DEFAULT 0,
+        latency REAL,
+        cost REAL NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS llm_usage_run ON llm_usage (run_id);
+    CREATE INDEX IF NOT EXISTS llm_usage_day ON llm_usage (day);
+    CREATE INDEX IF NOT EXISTS llm_usage_video ON llm_usage (video_id);
+    """
+    TOTALS = """SELECT COUNT(*) AS calls,
+                       COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens,
+                       COALESCE(SUM(completion_tokens), 0) AS completion_tokens,
+                       COALESCE(SUM(cost), 0) AS cost,
+                       COALESCE(SUM(latency), 0) AS latency"""
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, latency: float, cost: float,
+               **labels):
+        now = time.time()
+        labels = {key: labels.get(key) for key in LABELS}
+        with self._transaction() as conn:
+            conn.execute(
+                f"""INSERT INTO llm_usage (created_at, day, {', '.join(LABELS)}, model, prompt_tokens,
+                                           completion_tokens, latency, cost)
+                    VALUES (?, ?, {', '.join('?' for _ in LABELS)}, ?, ?, ?, ?, ?)""",
+                (now, time.strftime("%Y-%m-%d", time.localtime(now)), *labels.values(), model,
+                 prompt_tokens, completion_tokens, latency, cost)
+            )
+
+    def totals(self, **filters) -> Dict:
+        """Summed usage, optionally restricted by run_id, folder_id, video_id and/or day."""
+        unknown = set(filters) - {"run_id", "folder_id", "video_id", "day"}
+        if unknown:
+            raise ValueError(f"Unknown usage filters: {sorted(unknown)}")
+        where = " AND ".join(f"{key} = ?" for key in filters) or "1"
+        row = self._query(f"{self.TOTALS} FROM llm_usage WHERE {where}", tuple(filters.values()))[0]
+        row["total_tokens"] = row["prompt_tokens"] + row["completion_tokens"]
+        return row
+
+    def by_day(self, days: int = 14) -> List[Dict]:
+        return self._query(f"{self.TOTALS}, day FROM llm_usage GROUP BY day ORDER BY day DESC LIMIT ?", (days,))
+
+    def by_video(self, run_id: str) -> List[Dict]:
+        return self._query(
+            f"{self.TOTALS}, video_id, base_name FROM llm_usage WHERE run_id = ? GROUP BY video_id ORDER BY base_name",
+            (run_id,)
+        )
+
+    def token_model(self, min_samples: int = 5, window: int = 200) -> Optional[Dict]:
+        """Fit of recent calls: prompt_tokens ~ base + per_second * audio_seconds, plus mean completion tokens.
+
+        None until there are min_samples calls with a known audio length.
+        """
+        rows = self._query(
+            """SELECT audio_seconds, prompt_tokens, completion_tokens FROM llm_usage
+               WHERE audio_seconds > 0 ORDER BY id DESC LIMIT ?""",
+            (window,)
+        )
+        if len(rows) < min_samples:
+            return None
+        n = len(rows)
+        mean_x = sum(r["audio_seconds"] for r in rows) / n
+        mean_y = sum(r["prompt_tokens"] for r in rows) / n
+        var_x = sum((r["audio_seconds"] - mean_x) ** 2 for r in rows)
+        per_second = (sum((r["audio_seconds"] - mean_x) * (r["prompt_tokens"] - mean_y) for r in rows) / var_x
+                      if var_x else 0.0)
+        per_second = max(0.0, per_second)
+        return {
+            "prompt_base": max(0.0, mean_y - per_second * mean_x),
+            "prompt_per_audio_second": per_second,
+            "completion": sum(r["completion_tokens"] for r in rows) / n,
+            "samples": n
+        }
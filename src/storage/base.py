@@ -0,0 +1,128 @@
+# src/storage/base.py
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from src.monitoring.events import publish
+from src.jobs.cancellation import check_cancelled
+
+logger = logging.getLogger(__name__)
+
+# Logical locations the pipeline reads and writes
+FOLDER_KEYS = ["VIDEOS", "AUDIOS", "TRANSCRIPTS", "REPORTS", "MENTOR_MATERIALS"]
+
+class StorageError(Exception):
+    pass
+
+class StoragePermissionError(StorageError):
+    pass
+
+class StorageNotFoundError(StorageError):
+    pass
+
+def mime_matches(mime_type: str, wanted: Optional[str]) -> bool:
+    """Exact match, or a prefix match for patterns like 'video/*'."""
+    if not wanted:
+        return True
+    if wanted.endswith("/*"):
+        return (mime_type or "").startswith(wanted[:-1])
+    return mime_type == wanted
+
+def media_duration(obj: Dict) -> Optional[float]:
+    """Duration in seconds from Drive's videoMediaMetadata, if the listing carried it."""
+    millis = (obj.get("videoMediaMetadata") or {}).get("durationMillis")
+    return int(millis) / 1000 if millis else None
+
+class StorageBackend(ABC):
+    """Where videos come from and where audio, transcripts, reports and mentor
+    materials are kept. Objects are described by dicts with the Drive field
+    names: id, name, mimeType, size, md5Checksum, modifiedTime.
+    """
+    name = ""
+    CHUNK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, folders: Dict[str, str]):
+        self.folders = folders
+
+    def folder(self, key: str) -> str:
+        """Location of one of the pipeline's logical folders (VIDEOS, REPORTS, ...)."""
+        return self.folders[key]
+
+    @abstractmethod
+    def resolve_folder(self, url: str) -> str:
+        """Location for a user-supplied folder URL or path."""
+
+    @abstractmethod
+    def list(self, location: str, mime_type: Optional[str] = None) -> List[Dict]:
+        pass
+
+    def list_folders(self, location: str) -> List[Dict]:
+        """Direct subfolders of a location as {"id", "name"} (flat backends have none)."""
+        return []
+
+    def list_modified_since(self, location: str, modified_time: str, mime_type: Optional[str] = None) -> List[Dict]:
+        """Objects modified after an RFC 3339 modifiedTime (backends may push this filter down)."""
+        return [f for f in self.list(location, mime_type) if (f.get("modifiedTime") or "") > modified_time]
+
+    @abstractmethod
+    def stat(self, object_id: str) -> Dict:
+        pass
+
+    @abstractmethod
+    def iter_read(self, object_id: str, chunk_size: int = None) -> Iterator[bytes]:
+        """Stream an object's content in chunks."""
+
+    @abstractmethod
+    def write_stream(self, stream: BinaryIO, location: str, name: str, mime_type: str) -> str:
+        """Store the content of a readable binary stream; returns the new object id."""
+
+    @abstractmethod
+    def delete(self, object_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def find(self, location: str, name: str) -> Optional[str]:
+        pass
+
+    def media_source(self, object_id: str) -> Optional[str]:
+        """Local path ffprobe can read in place, or None for remote objects (see read_head)."""
+        return None
+
+    def read_head(self, object_id: str, nbytes: int) -> bytes:
+        """The first nbytes of an object (fewer if it is smaller), fetched as a single chunk."""
+        for chunk in self.iter_read(object_id, nbytes):
+            return chunk[:nbytes]
+        return b""
+
+    def find_by_property(self, location: str, key: str, value: str) -> Optional[Dict]:
+        """Object tagged key=value by upload(properties=...), as {"id", "name"}.
+
+        Backends without custom properties never find anything.
+        """
+        return None
+
+    def download(self, object_id: str, destination: str) -> str:
+        done = 0
+        with open(destination, "wb") as f:
+            for chunk in self.iter_read(object_id):
+                check_cancelled()
+                f.write(chunk)
+                done += len(chunk)
+                publish("download", done=done, total=None)
+        return destination
+
+    def upload(self, local_path: str, location: str, mime_type: str, properties: Dict[str, str] = None) -> str:
+        """Store a local file; properties are tags for find_by_property (ignored if unsupported)."""
+        with open(local_path, "rb") as f:
+            return self.write_stream(f, location, os.path.basename(local_path), mime_type)
+
+    def replace(self, local_path: str, location: str, mime_type: str, properties: Dict[str, str] = None) -> str:
+        """Upload, removing any existing object with the same name first."""
+        existing = self.find(location, os.path.basename(local_path))
+        if existing:
+            self.delete(existing)
+            logger.info(f"Deleted previous copy of {os.path.basename(local_path)}")
+        return self.upload(local_path, location, mime_type, properties)
+
+    def remove_duplicates_by_name(self, location: str):
+        pass
@@ -0,0 +1,89 @@
+# src/storage/crawler.py
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional
+from .base import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+def nested_base_name(folder_path: str, name: str) -> str:
+    """Base name for a file found in a subfolder, unique across the tree.
+
+    Top-level files keep their plain name (so existing transcripts and reports
+    still match); nested ones are prefixed with their folder path, e.g.
+    "module-1__week-2__lecture".
+    """
+    stem = name.rsplit(".", 1)[0] if "." in name else name
+    if not folder_path:
+        return stem
+    parts = [re.sub(r"[^\w\-. ]+", "_", part).strip() for part in folder_path.split("/") if part]
+    return "__".join(parts + [stem])
+
+class FolderCrawler:
+    """Walks a folder tree on any StorageBackend and returns every matching file.
+
+    Folders are listed concurrently (bounded by max_workers) level after level,
+    each listing following pagination inside the backend. Folders reached twice
+    (Drive shortcuts, multiple parents) are listed once, and files with the same
+    checksum are kept once so a recording copied into two modules is processed
+    a single time.
+    """
+
+    def __init__(self, storage: StorageBackend, max_workers: int = 4, max_depth: Optional[int] = None):
+        self.storage = storage
+        self.max_workers = max(1, int(max_workers))
+        self.max_depth = max_depth
+
+    def _list_folder(self, folder_id: str, folder_path: str, depth: int, mime_type: str):
+        files = self.storage.list(folder_id, mime_type)
+        for f in files:
+            f["folder_path"] = folder_path
+            f["base_name"] = nested_base_name(folder_path, f["name"])
+        subfolders = []
+        if self.max_depth is None or depth < self.max_depth:
+            subfolders = self.storage.list_folders(folder_id)
+        return files, subfolders
+
+    def crawl(self, root: str, mime_type: str = "video/*") -> List[Dict]:
+        seen_folders = {root}
+        found: List[Dict] = []
+        folders_listed = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawl") as executor:
+            pending = {executor.submit(self._list_folder, root, "", 0, mime_type): ("", 0)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder_path, depth = pending.pop(future)
+                    files, subfolders = future.result()
+                    folders_listed += 1
+                    found.extend(files)
+                    for subfolder in subfolders:
+                        if subfolder["id"] in seen_folders:
+                            continue
+                        seen_folders.add(subfolder["id"])
+                        child_path = f"{folder_path}/{subfolder['name']}" if folder_path else subfolder["name"]
+                        pending[executor.submit(
+                            self._list_folder, subfolder["id"], child_path, depth + 1, mime_type
+                        )] = (child_path, depth + 1)
+
+        files = self._deduplicate(found)
+        logger.info(f"Crawled {folders_listed} folder(s): {len(files)} file(s), "
+                    f"{len(found) - len(files)} duplicate(s) skipped")
+        return files
+
+    @staticmethod
+    def _deduplicate(files: List[Dict]) -> List[Dict]:
+        """Keep one file per checksum (or name + size when the backend has no checksum),
+        preferring the shallowest, then alphabetically first, path."""
+        files = sorted(files, key=lambda f: (f["folder_path"].count("/") + bool(f["folder_path"]), f["folder_path"], f["name"]))
+        unique, seen = [], {}
+        for f in files:
+            key = f.get("md5Checksum") or (f["name"], f.get("size"))
+            if key in seen:
+                logger.info(f"Skipping duplicate {f['folder_path']}/{f['name']} (same content as {seen[key]})")
+                continue
+            seen[key] = f"{f['folder_path']}/{f['name']}".lstrip("/")
+            unique.append(f)
+        return unique
@@ -0,0 +1,92 @@
+# src/storage/drive_storage.py
+import logging
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from .base import StorageBackend, StorageError, StorageNotFoundError, StoragePermissionError
+
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def _translate_errors():
+    from googleapiclient.errors import HttpError
+    try:
+        yield
+    except HttpError as e:
+        status = getattr(e.resp, "status", None)
+        if status == 403:
+            raise StoragePermissionError(str(e)) from e
+        if status == 404:
+            raise StorageNotFoundError(str(e)) from e
+        raise StorageError(str(e)) from e
+
+class DriveStorage(StorageBackend):
+    """Google Drive backend; locations are folder ids and object ids are file ids."""
+    name = "drive"
+
+    def __init__(self, folders: Dict[str, str], gdrive=None, upload_settings: Dict = None):
+        super().__init__(folders)
+        # Anything implementing the GoogleDriveManager surface (the benchmarks pass a local fake)
+        self._gdrive = gdrive
+        # STORAGE.UPLOAD: chunk size and retries for resumable uploads
+        self.upload_settings = upload_settings
+
+    @property
+    def gdrive(self):
+        # Built on first use so constructing the backend doesn't import googleapiclient
+        if self._gdrive is None:
+            from src.preprocessing.gdrive_manager import GoogleDriveManager
+            self._gdrive = GoogleDriveManager(self.upload_settings)
+        return self._gdrive
+
+    def resolve_folder(self, url: str) -> str:
+        return self.gdrive.get_folder_id(url)
+
+    def list(self, location: str, mime_type: Optional[str] = None) -> List[Dict]:
+        with _translate_errors():
+            return self.gdrive.list_files(location, mime_type)
+
+    def list_folders(self, location: str) -> List[Dict]:
+        with _translate_errors():
+            return self.gdrive.list_folders(location)
+
+    def list_modified_since(self, location: str, modified_time: str, mime_type: Optional[str] = None) -> List[Dict]:
+        with _translate_errors():
+            return self.gdrive.list_files(location, mime_type, modified_after=modified_time)
+
+    def stat(self, object_id: str) -> Dict:
+        with _translate_errors():
+            return self.gdrive.get_metadata(object_id)
+
+    def iter_read(self, object_id: str, chunk_size: int = None) -> Iterator[bytes]:
+        with _translate_errors():
+            yield from self.gdrive.iter_download(object_id, chunk_size or self.CHUNK_SIZE)
+
+    def download(self, object_id: str, destination: str) -> str:
+        with _translate_errors():
+            return self.gdrive.download_file(object_id, destination)
+
+    def write_stream(self, stream: BinaryIO, location: str, name: str, mime_type: str) -> str:
+        with _translate_errors():
+            return self.gdrive.upload_stream(stream, name, location, mime_type)
+
+    def upload(self, local_path: str, location: str, mime_type: str, properties: Dict[str, str] = None) -> str:
+        with _translate_errors():
+            if properties:
+                return self.gdrive.upload_file(local_path, location, mime_type, app_properties=properties)
+            return self.gdrive.upload_file(local_path, location, mime_type)
+
+    def find_by_property(self, location: str, key: str, value: str) -> Optional[Dict]:
+        with _translate_errors():
+            return self.gdrive.find_file_by_property(location, key, value)
+
+    def delete(self, object_id: str) -> bool:
+        with _translate_errors():
+            return self.gdrive.delete_file(object_id)
+
+    def find(self, location: str, name: str) -> Optional[str]:
+        with _translate_errors():
+            return self.gdrive.find_file_by_name(location, name)
+
+    def remove_duplicates_by_name(self, location: str):
+        with _translate_errors():
+            self.gdrive.remove_duplicates_by_name(location)
@@ -0,0 +1,15 @@
+# src/storage/factory.py
+from .base import FOLDER_KEYS, StorageBackend
+
+def create_storage(config: dict, gdrive=None) -> StorageBackend:
+    """Build the backend selected by config["STORAGE"]["BACKEND"] ("drive" or "local")."""
+    storage_config = config.get("STORAGE", {})
+    backend = storage_config.get("BACKEND", "drive")
+    if backend == "drive":
+        from .drive_storage import DriveStorage
+        return DriveStorage(storage_config["DRIVE_FOLDERS"], gdrive=gdrive, upload_settings=storage_config.get("UPLOAD"))
+    if backend == "local":
+        from .local_storage import LocalStorage
+        folders = storage_config.get("LOCAL_FOLDERS") or {key: key.lower() for key in FOLDER_KEYS}
+        return LocalStorage(storage_config.get("LOCAL_ROOT", "storage"), folders)
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,126 @@
+# src/storage/local_storage.py
+import os
+import time
+import shutil
+import hashlib
+import logging
+import mimetypes
+import threading
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from .base import StorageBackend, StorageNotFoundError, StoragePermissionError, mime_matches
+
+logger = logging.getLogger(__name__)
+
+class LocalStorage(StorageBackend):
+    """Storage on a local or network (NFS) filesystem; object ids are absolute paths."""
+    name = "local"
+
+    def __init__(self, root: str, folders: Dict[str, str]):
+        self.root = os.path.abspath(root)
+        super().__init__({key: os.path.join(self.root, path) for key, path in folders.items()})
+        for path in self.folders.values():
+            os.makedirs(path, exist_ok=True)
+        # (path) -> (size, mtime, md5) so repeated listings don't re-hash large videos
+        self._checksums: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def resolve_folder(self, url: str) -> str:
+        path = url if os.path.isabs(url) else os.path.join(self.root, url)
+        if not os.path.isdir(path):
+            raise StorageNotFoundError(f"Folder not found: {path}")
+        return os.path.abspath(path)
+
+    def _md5(self, path: str, stat: os.stat_result) -> str:
+        with self._lock:
+            cached = self._checksums.get(path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime):
+            return cached[2]
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        with self._lock:
+            self._checksums[path] = (stat.st_size, stat.st_mtime, digest.hexdigest())
+        return digest.hexdigest()
+
+    def stat(self, object_id: str) -> Dict:
+        """Metadata for one file, md5Checksum included (hashed once per size and mtime)."""
+        try:
+            stat = os.stat(object_id)
+        except FileNotFoundError:
+            raise StorageNotFoundError(object_id)
+        except PermissionError as e:
+            raise StoragePermissionError(str(e))
+        return dict(self._describe(object_id, stat), md5Checksum=self._md5(object_id, stat))
+
+    @staticmethod
+    def _describe(path: str, stat: os.stat_result) -> Dict:
+        return {
+            "id": path,
+            "name": os.path.basename(path),
+            "mimeType": mimetypes.guess_type(path)[0] or "application/octet-stream",
+            "size": str(stat.st_size),
+            "modifiedTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(stat.st_mtime))
+        }
+
+    def list(self, location: str, mime_type: Optional[str] = None) -> List[Dict]:
+        """Files in a folder, without md5Checksum: hashing every video on each listing reads
+        the whole folder from disk. Callers that need the checksum stat() the object."""
+        if not os.path.isdir(location):
+            return []
+        files = []
+        for name in sorted(os.listdir(location)):
+            path = os.path.join(location, name)
+            if os.path.isfile(path) and mime_matches(mimetypes.guess_type(name)[0], mime_type):
+                files.append(self._describe(path, os.stat(path)))
+        return files
+
+    def list_folders(self, location: str) -> List[Dict]:
+        if not os.path.isdir(location):
+            return []
+        return [
+            {"id": os.path.join(location, name), "name": name}
+            for name in sorted(os.listdir(location))
+            if os.path.isdir(os.path.join(location, name))
+        ]
+
+    def iter_read(self, object_id: str, chunk_size: int = None) -> Iterator[bytes]:
+        try:
+            f = open(object_id, "rb")
+        except FileNotFoundError:
+            raise StorageNotFoundError(object_id)
+        with f:
+            for chunk in iter(lambda: f.read(chunk_size or self.CHUNK_SIZE), b""):
+                yield chunk
+
+    def media_source(self, object_id: str):
+        return object_id
+
+    def download(self, object_id: str, destination: str) -> str:
+        if os.path.abspath(destination) != object_id:
+            shutil.copyfile(object_id, destination)
+        return destination
+
+    def write_stream(self, stream: BinaryIO, location: str, name: str, mime_type: str) -> str:
+        os.makedirs(location, exist_ok=True)
+        path = os.path.join(location, name)
+        tmp_path = f"{path}.partial"
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(stream, f, self.CHUNK_SIZE)
+        os.replace(tmp_path, path)
+        logger.info(f"Stored {name} in {location}")
+        return path
+
+    def delete(self, object_id: str) -> bool:
+        try:
+            os.remove(object_id)
+            logger.info(f"Deleted {object_id}")
+            return True
+        except FileNotFoundError:
+            return False
+        except PermissionError as e:
+            raise StoragePermissionError(str(e))
+
+    def find(self, location: str, name: str) -> Optional[str]:
+        path = os.path.join(location, name)
+        return path if os.path.isfile(path) else None
@@ -0,0 +1,128 @@
+# src/storage/report_sync.py
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from src.state.sync_index import SyncIndex
+from src.state.manifest import file_checksum
+
+logger = logging.getLogger(__name__)
+
+class ReportSync:
+    """Incrementally mirrors the REPORTS storage folder into the local reports dir.
+
+    Only objects that are new or whose md5Checksum/modifiedTime changed since
+    they were last copied are downloaded, concurrently; an object whose content
+    already matches the local file (e.g. a report this process just uploaded,
+    which got a new id) is only recorded. After the first full
+    listing, syncs only ask storage for objects modified after the last seen
+    modifiedTime; a full listing is repeated every `full_sync_interval` seconds
+    to pick up anything the incremental queries missed.
+    """
+
+    def __init__(self, storage, reports_dir: str, db_path: str, report_index=None,
+                 max_workers: int = 4, min_interval: float = 60.0, full_sync_interval: float = 3600.0):
+        self.storage = storage
+        self.reports_dir = reports_dir
+        self.index = SyncIndex(db_path)
+        self.report_index = report_index
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.full_sync_interval = full_sync_interval
+        self.last_run = 0.0
+        self.last_result: Dict = {}
+        self._running = threading.Lock()
+
+    def trigger(self, force: bool = False) -> bool:
+        """Start a sync in a background thread unless one is running or ran recently."""
+        if not force and time.time() - self.last_run < self.min_interval:
+            return False
+        if not self._running.acquire(blocking=False):
+            return False
+        self.last_run = time.time()
+
+        def run():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Report sync failed: {e}")
+                self.last_result = {"error": str(e), "finished_at": time.time()}
+            finally:
+                self._running.release()
+
+        threading.Thread(target=run, name="report-sync", daemon=True).start()
+        return True
+
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+
+    def _changed(self, remote_files: List[Dict]) -> List[Dict]:
+        known = self.index.entries()
+        latest: Dict[str, Dict] = {}
+        for remote in remote_files:
+            # Keep the newest copy when a name appears more than once
+            current = latest.get(remote["name"])
+            if current is None or (remote.get("modifiedTime") or "") > (current.get("modifiedTime") or ""):
+                latest[remote["name"]] = remote
+        changed = []
+        for name, remote in latest.items():
+            entry = known.get(name)
+            if (entry is None
+                    or not os.path.exists(entry["local_path"])
+                    or entry["object_id"] != remote["id"]
+                    or entry["md5"] != remote.get("md5Checksum")
+                    or entry["modified_time"] != remote.get("modifiedTime")):
+                local_path = os.path.join(self.reports_dir, name)
+                if (remote.get("md5Checksum") and os.path.exists(local_path)
+                        and file_checksum(local_path) == remote["md5Checksum"]):
+                    self.index.record(remote, local_path)
+                    continue
+                changed.append(remote)
+        return changed
+
+    def _fetch(self, remote: Dict) -> str:
+        local_path = os.path.join(self.reports_dir, remote["name"])
+        tmp_path = f"{local_path}.sync"
+        self.storage.download(remote["id"], tmp_path)
+        os.replace(tmp_path, local_path)
+        self.index.record(remote, local_path)
+        return local_path
+
+    def sync(self) -> Dict:
+        start = time.time()
+        location = self.storage.folder("REPORTS")
+        state = self.index.state(location)
+        full = (state is None or not state["high_water_mark"]
+                or not state["last_full_sync"] or start - state["last_full_sync"] > self.full_sync_interval)
+        if full:
+            remote_files = self.storage.list(location)
+        else:
+            remote_files = self.storage.list_modified_since(location, state["high_water_mark"])
+
+        changed = self._changed(remote_files)
+        fetched = []
+        if changed:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                fetched = list(executor.map(self._fetch, changed))
+        if self.report_index is not None:
+            # Only the reports that changed; their .txt was fetched in the same batch
+            for path in fetched:
+                if path.endswith(".json"):
+                    self.report_index.index_file(path)
+
+        modified_times = [f.get("modifiedTime") for f in remote_files if f.get("modifiedTime")]
+        high_water_mark = max(modified_times + ([state["high_water_mark"]] if state and state["high_water_mark"] else []),
+                              default=None)
+        self.index.save_state(location, high_water_mark, full)
+        self.last_result = {
+            "full": full,
+            "listed": len(remote_files),
+            "fetched": len(fetched),
+            "seconds": round(time.time() - start, 2),
+            "finished_at": time.time()
+        }
+        logger.info(f"Report sync: {self.last_result}")
+        return self.last_result
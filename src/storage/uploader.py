@@ -0,0 +1,67 @@
+# src/storage/uploader.py
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+from src.monitoring.metrics import UPLOAD_QUEUE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class Uploader:
+    """Runs storage uploads on a small thread pool so the pipeline does not wait on them.
+
+    submit() returns a Future resolving to the new object id. Each upload runs in a
+    copy of the submitter's context, so Drive timings still count against the
+    submitting video's stages and log records keep its job/video ids.
+
+    At most max_pending uploads are queued or running; submit() blocks beyond
+    that, so a stalled Drive slows the pipeline down instead of piling up
+    finished files (and their scratch space) behind it.
+    """
+
+    def __init__(self, storage, max_workers: int = 4, max_pending: int = 16):
+        self.storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="upload")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending, max_workers))
+
+    def _upload(self, queued_at: float, local_path: str, location: str, mime_type: str,
+                replace: bool, properties: Dict[str, str]) -> str:
+        UPLOAD_QUEUE_SECONDS.observe(time.perf_counter() - queued_at)
+        if replace:
+            return self.storage.replace(local_path, location, mime_type, properties)
+        return self.storage.upload(local_path, location, mime_type, properties)
+
+    def submit(self, local_path: str, location: str, mime_type: str, replace: bool = False,
+               properties: Dict[str, str] = None) -> Future:
+        """Upload (or, with replace, overwrite by name) a local file in the background."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(
+                contextvars.copy_context().run, self._upload,
+                time.perf_counter(), local_path, location, mime_type, replace, properties
+            )
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    @staticmethod
+    def wait(futures: List[Future]) -> List[str]:
+        """Object ids of finished uploads, in order; the first failure is re-raised after all finish."""
+        ids, error = [], None
+        for future in futures:
+            try:
+                ids.append(future.result())
+            except Exception as e:
+                logger.error(f"Background upload failed: {e}")
+                ids.append(None)
+                error = error or e
+        if error is not None:
+            raise error
+        return ids
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
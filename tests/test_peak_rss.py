@@ -0,0 +1,53 @@
+# tests/test_peak_rss.py
+"""Peak-RSS regression checks: each benchmarks.peak_rss stage in its own process.
+
+Limits can be changed with QC_RSS_HOURS (length of the synthetic recording),
+QC_RSS_MAX_GROWTH_MB and QC_RSS_MAX_PEAK_MB; QC_RSS_WHISPER_MODEL (e.g. base.en)
+also runs the transcribe stage with a real model. The growth limit is below what
+holding a whole hour of 16 kHz float32 audio takes (~230 MB), so a stage that
+stops streaming fails here. Stages whose packages are missing are reported as
+skipped with the reason.
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+import pytest
+
+from tests.conftest import REPO_ROOT
+from benchmarks.peak_rss import STAGES, make_inputs
+
+HOURS = float(os.environ.get("QC_RSS_HOURS", 1.0))
+MAX_GROWTH_MB = float(os.environ.get("QC_RSS_MAX_GROWTH_MB", 128.0))
+MAX_PEAK_MB = float(os.environ.get("QC_RSS_MAX_PEAK_MB", 1024.0))
+WHISPER_MODEL = os.environ.get("QC_RSS_WHISPER_MODEL")
+
+@pytest.fixture(scope="module")
+def workdir():
+    path = tempfile.mkdtemp(prefix="qc_rss_test_")
+    make_inputs(path, HOURS * 3600, material_mb=5.0)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+def run_stage(name: str, workdir: str) -> dict:
+    command = [sys.executable, "-m", "benchmarks.peak_rss", "--stage", name, "--workdir", workdir]
+    if WHISPER_MODEL:
+        command += ["--whisper-model", WHISPER_MODEL]
+    completed = subprocess.run(
+        command, cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_stage_memory_stays_bounded(stage, workdir):
+    result = run_stage(stage, workdir)
+    if "skipped" in result:
+        pytest.skip(f"{stage}: {result['skipped']}")
+    assert result["growth_mb"] <= MAX_GROWTH_MB, f"{stage} grew {result['growth_mb']} MB over its imports"
+    assert result["peak_mb"] <= MAX_PEAK_MB, f"{stage} peaked at {result['peak_mb']} MB"
+    if "max_refine_window_seconds" in result:
+        assert result["max_refine_window_seconds"] <= result["max_allowed_window_seconds"]
@@ -0,0 +1,78 @@
+# tests/test_quality_prompt.py
+"""The compact transcript and the quality-check prompt keep what the report schema relies on."""
+import os
+import re
+import json
+from types import SimpleNamespace
+
+from tests.conftest import REPO_ROOT
+from benchmarks.fixtures import make_transcript
+from src.report_generation.report_generator import ReportGenerator, checklist_item_ids
+from src.report_generation.transcript_renderer import iter_tsv, render_transcript_file
+
+TIMESTAMP = re.compile(r"^\[(\d+):(\d{2})\] ", re.MULTILINE)
+
+class RecordingClient:
+    """OpenAI client stand-in that keeps the prompt and answers with an empty report."""
+
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        message = SimpleNamespace(content=json.dumps({"items": [], "what_went_wrong": [], "how_to_improve": []}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                               usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1))
+
+def read_checklist() -> str:
+    with open(os.path.join(REPO_ROOT, "config", "checklist.txt"), encoding="utf-8") as f:
+        return f.read()
+
+def report_settings() -> dict:
+    with open(os.path.join(REPO_ROOT, "config", "config.json")) as f:
+        return json.load(f)["REPORT"]["TRANSCRIPT"]
+
+def test_compact_rendering_keeps_timestamps(tmp_path):
+    path = str(tmp_path / "lecture.txt")
+    make_transcript(path, 900)
+    with open(path, encoding="utf-8") as f:
+        rows = list(iter_tsv(f))
+
+    transcript, stats = render_transcript_file(path, report_settings())
+
+    seconds = [int(m) * 60 + int(s) for m, s in TIMESTAMP.findall(transcript)]
+    assert seconds[0] == 0
+    assert seconds == sorted(seconds)
+    assert seconds[-1] <= rows[-1][0]
+    # A timestamp at least every PARAGRAPH_SECONDS (plus one sentence) of recording
+    gaps = [b - a for a, b in zip(seconds, seconds[1:])]
+    assert max(gaps) <= report_settings()["PARAGRAPH_SECONDS"] + 10
+    assert stats["compact_tokens"] < stats["raw_tokens"]
+
+def test_prompt_sub_item_range_matches_checklist(tmp_path):
+    path = str(tmp_path / "lecture.txt")
+    make_transcript(path, 300)
+    transcript, _ = render_transcript_file(path, report_settings())
+    checklist = read_checklist()
+    ids = checklist_item_ids(checklist)
+    client = RecordingClient()
+
+    ReportGenerator(client, "gpt-test", checklist).quality_check(transcript, "")
+
+    prompt = client.prompts[0]
+    assert f"one entry per checklist sub-item ({ids[0]} ... {ids[-1]})" in prompt
+    assert transcript in prompt
+    # One id per lettered line of the checklist, in checklist order
+    assert len(ids) == len(re.findall(r"^\s+[a-z]\. ", checklist, re.MULTILINE))
+    assert ids == sorted(ids, key=lambda i: (int(i[:-1]), i[-1]))
+
+def test_prompt_range_follows_a_changed_checklist():
+    checklist = read_checklist() + "\n9. Accessibility:\n   a. Captions: Key terms are spelled out.\n" \
+                                   "   b. Contrast: Slides are readable.\n"
+    client = RecordingClient()
+
+    ReportGenerator(client, "gpt-test", checklist).quality_check("[0:00] hello", "")
+
+    assert checklist_item_ids(checklist)[-1] == "9b"
+    assert "one entry per checklist sub-item (1a ... 9b)" in client.prompts[0]
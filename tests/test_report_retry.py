@@ -0,0 +1,72 @@
+# tests/test_report_retry.py
+"""A failed quality check must leave the video at UPLOADED so the next run retries its report."""
+import os
+import json
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from tests.conftest import REPO_ROOT
+from benchmarks.fixtures import make_transcript
+from src.main_flow import MainFlow
+from src.report_generation.report_generator import ReportGenerator
+from src.state.manifest import file_checksum
+
+class RateLimitedClient:
+    """OpenAI client stand-in whose every completion call fails like a 429."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        raise RuntimeError("Error code: 429 - rate limit exceeded")
+
+@pytest.fixture
+def flow(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    with open(os.path.join(REPO_ROOT, "config", "config.json")) as f:
+        config = json.load(f)
+    config["PATHS"] = {key: str(tmp_path / value) for key, value in config["PATHS"].items()}
+    config["STORAGE"] = dict(config["STORAGE"], BACKEND="local", LOCAL_ROOT=str(tmp_path / "storage"))
+    config["SCRATCH"] = dict(config.get("SCRATCH", {}), ROOT=str(tmp_path / "scratch"))
+    config.pop("METRICS", None)
+    shutil.copyfile(os.path.join(REPO_ROOT, "config", "checklist.txt"), config_dir / "checklist.txt")
+    config_path = config_dir / "config.json"
+    config_path.write_text(json.dumps(config))
+    flow = MainFlow(str(config_path))
+    yield flow
+    flow.uploader.shutdown()
+
+def uploaded_video(flow) -> dict:
+    """A video whose transcript is done and stored locally, ready for its report."""
+    video = {"id": "video-1", "name": "lecture.mp4"}
+    flow.manifest.discover(video)
+    transcript_path = os.path.join(flow.paths["TRANSCRIPTS"], "lecture.txt")
+    make_transcript(transcript_path, 120)
+    flow.manifest.advance(video["id"], "UPLOADED", transcript_path=transcript_path,
+                          transcript_md5=file_checksum(transcript_path))
+    return video
+
+def test_failed_llm_call_is_not_recorded_as_reported(flow):
+    client = RateLimitedClient()
+    flow._report_generator = ReportGenerator(client, "gpt-test", open(flow.checklist_path).read(),
+                                             flow.report_index)
+    video = uploaded_video(flow)
+
+    result = flow._process_video(None, video, "[1/1]", progress=lambda message: None)
+
+    assert client.calls == 1
+    assert result["status"] == "failed"
+    assert result["report_path"] is None
+    record = flow.manifest.get(video["id"])
+    assert record["stage"] == "UPLOADED"
+    assert "429" in record["error"]
+    assert not os.path.exists(os.path.join(flow.paths["REPORTS"], "report_lecture.txt"))
+
+    # The next run tries the report again instead of skipping the video
+    flow._process_video(None, video, "[1/1]", progress=lambda message: None)
+    assert client.calls == 2
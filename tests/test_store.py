@@ -0,0 +1,23 @@
+# tests/test_store.py
+import sqlite3
+
+import pytest
+
+from src.jobs.cancellation import JobCancelled
+from src.state.job_queue import JobQueue
+
+def test_transaction_rolls_back_on_base_exception(tmp_path):
+    db_path = str(tmp_path / "qc_bot.db")
+    queue = JobQueue(db_path)
+    job_id = queue.submit("folder", "conceptual")
+
+    with pytest.raises(JobCancelled):
+        with queue._transaction() as conn:
+            conn.execute("UPDATE jobs SET status = 'running' WHERE id = ?", (job_id,))
+            raise JobCancelled("cancelled")
+
+    assert queue.get(job_id)["status"] == "queued"
+    # The write lock was released: another connection can write without waiting
+    other = sqlite3.connect(db_path, timeout=0, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    other.execute("ROLLBACK")